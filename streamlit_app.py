@@ -1,22 +1,37 @@
+import os
 import streamlit as st
-import requests
-import re, time, pandas as pd
-from io import StringIO
-from datetime import datetime
-from tools.simulator import TX_PRESETS, GAS_SPEED_PRESET, simulate_fee_table
-from utils.fetchers import fetch_tx_raw, to_standard_row, CHAINIDS, fetch_tx_raw_any
-from web3 import Web3
-
-import streamlit as st
-from utils.fetchers import fetch_eth_idr_rate
-
-@st.cache_data(ttl=600)  # cache selama 10 menit
+from io import BytesIO
+from utils.fetchers import fetch_tx_raw, to_standard_row, CHAINIDS, fetch_tx_raw_any, fetch_many, parse_hashes, TxNotFound, TxPending
+from utils.metrics import METRICS
+from utils.rpc import RPC_URLS
+from utils.wei import payload_fee_wei, wei_to_eth, wei_to_gwei, wei_to_idr
+# Modul berat (pandas, simulator, analytics, price index, konversi CSV) di-import
+# di titik pemakaian supaya cold start cepat dan UI atas sudah tampil duluan.
+
+@st.cache_resource(show_spinner=False)
+def _rate_service():
+    from utils.rates import get_rate_service
+    return get_rate_service()
+
+@st.cache_resource(show_spinner=False)
+def _price_index():
+    from utils.price_index import get_price_index
+    return get_price_index()
+
+@st.cache_resource(show_spinner=False)
+def _metrics_endpoint():
+    """Endpoint Prometheus `/metrics` sekali per proses kalau GV_METRICS_PORT diset."""
+    port = os.getenv("GV_METRICS_PORT")
+    if not port:
+        return None
+    from utils.metrics import serve
+    return serve(int(port), os.getenv("GV_METRICS_HOST", "127.0.0.1"))
+
+_metrics_endpoint()
+
+@st.cache_data(ttl=600, show_spinner=False)  # cache selama 10 menit
 def get_eth_idr_rate_cached():
-    from utils.fetchers import fetch_eth_idr_rate
-    return fetch_eth_idr_rate()
-
-from utils.fetchers import fetch_tx_raw_any
-import os
+    return _rate_service().get()
 
 if st.query_params.get("ping") == "1":
     st.write("ok"); st.stop()
@@ -52,10 +67,17 @@ def _fill_demo_hashes():
         "0x4e90e2a3d73af50cc92860fd14431c4ce5c836e62ab825ef51eca4e660e01cac",
     ])
 
-@st.cache_data(ttl=300)
-def fetch_tx_cached(network: str, tx_hash: str):
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_tx_cached(network: str, tx_hash: str, _throttle=None, _rate=None, _tx=None):
     API = st.secrets.get("ETHERSCAN_API_KEY") or os.getenv("ETHERSCAN_API_KEY")
-    return fetch_tx_raw_any(tx_hash, API, network=network)
+    return fetch_tx_raw_any(tx_hash, API, network=network, eth_idr_rate=_rate, throttle=_throttle, tx=_tx)
+
+def _export(df, stem: str):
+    """(bytes, nama_file, mime) sesuai format unduhan pilihan di sidebar (CSV/Parquet)."""
+    if st.session_state.get("dl_format") == "Parquet":
+        from utils.dataset import to_parquet_bytes
+        return to_parquet_bytes(df), f"{stem}.parquet", "application/vnd.apache.parquet"
+    return df.to_csv(index=False).encode("utf-8"), f"{stem}.csv", "text/csv"
 
 def format_rupiah(val: float | None) -> str:
     if val is None:
@@ -67,17 +89,6 @@ def format_rupiah(val: float | None) -> str:
     # kalau >= 1, tampil bulat; kalau < 1, pakai 2 desimal biar tidak jadi 0.00
     return (f"Rp {x:,.0f}" if x >= 1 else f"Rp {x:,.2f}").replace(",", ".")
 
-HASH_RE = re.compile(r"^0x[a-fA-F0-9]{64}$")
-
-def parse_hashes(s: str) -> list[str]:
-    if not s: return []
-    toks = re.split(r"[\s,;]+", s.strip())
-    seen, out = set(), []
-    for t in toks:
-        if HASH_RE.fullmatch(t) and t not in seen:
-            out.append(t); seen.add(t)
-    return out
-
 def format_rupiah_id(val: float, dec_ge1=2, dec_lt1=4):
     try: x = float(val)
     except: return "—"
@@ -119,8 +130,36 @@ div[data-testid="stMetric"]{
 with st.sidebar:
     if st.button("♻️ Refresh kurs (clear cache)"):
         get_eth_idr_rate_cached.clear()
+        _rate_service().invalidate()
         st.success("Kurs akan di-refresh pada request berikutnya.")
 
+    st.radio("📦 Format unduhan", ["CSV", "Parquet"], key="dl_format", horizontal=True,
+             help="Parquet: kolumnar & bertipe, jauh lebih kecil untuk data besar.")
+
+    with st.expander("📈 Metrik API"):
+        if st.checkbox("Tampilkan", key="show_metrics",
+                       help="Latensi, retry, error dan hit cache per provider sejak proses jalan."):
+            snap = METRICS.snapshot()
+            st.caption(f"Sejak {snap['uptime_s'] / 60:,.0f} menit lalu (semua sesi di proses ini)")
+            if snap["providers"]:
+                st.dataframe(snap["providers"], hide_index=True, use_container_width=True,
+                             column_config={k: st.column_config.NumberColumn(format="%.1f")
+                                            for k in ("mean_ms", "p50_ms", "p95_ms")})
+            else:
+                st.caption("Belum ada call keluar.")
+            if snap["caches"]:
+                st.dataframe(snap["caches"], hide_index=True, use_container_width=True,
+                             column_config={"hit_ratio": st.column_config.ProgressColumn(
+                                 min_value=0.0, max_value=1.0, format="%.2f")})
+            coalesced = sum(f["coalesced"] for f in snap["flights"])
+            if coalesced:
+                st.caption(f"🔗 {coalesced:,} lookup menumpang call identik yang sedang berjalan")
+                st.dataframe(snap["flights"], hide_index=True, use_container_width=True)
+            if snap["errors"]:
+                st.dataframe(snap["errors"], hide_index=True, use_container_width=True)
+            st.download_button("⬇️ Prometheus (.prom)", METRICS.render(), file_name="gasvision.prom",
+                               mime="text/plain", use_container_width=True)
+
     st.sidebar.markdown("📘 **About**")
     st.sidebar.markdown("""
     STC GasVision memantau biaya gas transaksi di berbagai testnet (Sepolia, Goerli,
@@ -130,7 +169,7 @@ with st.sidebar:
     - 🔌 Realtime data jaringan: **Infura RPC**
     - 💱 Kurs ETH → IDR via **Infura**, dengan fallback ke provider lain
     - 🧠 Kurs dicache ±10 menit
-    - 📥 Export CSV untuk analisis
+    - 📥 Export CSV / Parquet untuk analisis
 
     🧾 Upload hasil CSV ke [**STC Analytics**](https://stc-analytics.streamlit.app)
     untuk eksplorasi lanjutan biaya transaksi.
@@ -153,62 +192,131 @@ with st.sidebar:
     Versi UI: v1.0 • Streamlit • Theme Dark
     """)
 
-# === Konversi format CSV ke format STC Analytics ===
-import pandas as pd
-from datetime import datetime
-
-COLUMNS_UPPER = [
-    'Timestamp','Network','Tx Hash','Contract','Function','Block',
-    'Gas Used','Gas Price (Gwei)','Estimated Fee (ETH)','Estimated Fee (Rp)','Status'
-]
-
-def convert_to_stc_format(df_raw: pd.DataFrame) -> pd.DataFrame:
-    df = df_raw.copy()
-
-    # Normalisasi nama kolom berbagai kemungkinan
-    rename_map = {
-        'timestamp':'Timestamp', 'Timestamp':'Timestamp',
-        'network':'Network', 'Network':'Network',
-        'tx_hash':'Tx Hash', 'Tx Hash':'Tx Hash', 'TxHash':'Tx Hash', 'Hash':'Tx Hash',
-        'contract':'Contract', 'Contract':'Contract', 'To':'Contract',
-        'function_name':'Function', 'Function':'Function',
-        'block_number':'Block', 'Block':'Block',
-        'gas_used':'Gas Used', 'Gas Used':'Gas Used',
-        'Gas Price (Gwei)':'Gas Price (Gwei)', 'gas_price_gwei':'Gas Price (Gwei)',
-        'gas_price_wei':'gas_price_wei',  # kita konversi di bawah jika ada
-        'cost_eth':'Estimated Fee (ETH)', 'Estimated Fee (ETH)':'Estimated Fee (ETH)',
-        'cost_idr':'Estimated Fee (Rp)', 'Estimated Fee (Rp)':'Estimated Fee (Rp)',
-        'status':'Status', 'Status':'Status'
-    }
-    df.rename(columns={k:v for k,v in rename_map.items() if k in df.columns}, inplace=True)
-
-    # Isi kolom wajib yang belum ada
-    if 'Timestamp' not in df.columns:
-        df['Timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    if 'Function' not in df.columns:
-        df['Function'] = 'manual-entry'
-    if 'Status' not in df.columns:
-        df['Status'] = 'Unknown'
-
-    # Gas Price: prioritas pakai kolom Gwei; kalau tidak ada tapi ada Wei -> konversi
-    if 'Gas Price (Gwei)' not in df.columns:
-        if 'gas_price_wei' in df.columns:
-            df['Gas Price (Gwei)'] = pd.to_numeric(df['gas_price_wei'], errors='coerce').fillna(0) / 1e9
-        else:
-            df['Gas Price (Gwei)'] = 0
-
-    # Pastikan numerik aman
-    for col in ['Block','Gas Used','Gas Price (Gwei)','Estimated Fee (ETH)','Estimated Fee (Rp)']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+def _multi_row(raw: dict, net: str, h: str, rate: float) -> dict:
+    """Payload fetcher → baris tabel multi-hash."""
+    from utils.analytics import GASLESS_MAX_WEI
+    row = to_standard_row(raw)  # ETH/Gwei diturunkan dari integer wei payload
+    row["Network"] = row["Network"] or net
+    row["Tx Hash"] = h
+    row["Estimated Fee (Rp)"] = wei_to_idr(payload_fee_wei(raw), rate)
+    row.pop("Wallet From", None)
+    row.pop("Wallet To", None)
+    # aturan gasless sama dengan mode single: < 0.001 Gwei
+    row["Gasless?"] = "Ya" if int(raw.get("gas_price_wei") or 0) < GASLESS_MAX_WEI else "Tidak"
+    return row
+
+def _show_multi_results(rows, fails, raws, agg, rate, save_dataset: bool, key: str = "dl_multi_csv",
+                        save_id: str | None = None):
+    """Tabel, ringkasan biaya, unduhan dan simpan-dataset untuk hasil multi-hash."""
+    import pandas as pd
+    if rows:
+        df = pd.DataFrame(rows)
+        price_index = _price_index()
+        if price_index is not None:
+            # Rupiah di kurs saat blok (index historis lokal), fallback kurs sekarang
+            price_index.apply(df, fallback_rate=rate)
+            st.caption("💱 Estimated Fee (Rp) memakai kurs ETH→IDR saat blok (index harga historis).")
+        st.success(f"Selesai: {len(rows)} baris.")
+        st.dataframe(df, use_container_width=True, height=320)
+
+        summary = agg.snapshot()
+        totals = agg.totals()
+        st.markdown("#### 📊 Ringkasan biaya")
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Total fee (ETH)", f"{totals['fee_eth']:.8f}")
+        # jumlah kolom tabel, jadi ikut kurs per baris (historis kalau ada index harga)
+        m2.metric("Total fee (Rp)", format_rupiah(pd.to_numeric(df["Estimated Fee (Rp)"], errors="coerce").sum()))
+        m3.metric("Gasless", f"{totals['gasless_ratio']:.0%}")
+        st.dataframe(summary["groups"].drop(columns=["fee_wei_sum"]), use_container_width=True, height=240)
+        if len(summary["hourly"]):
+            st.caption("Biaya per jam blok (UTC)")
+            st.bar_chart(summary["hourly"], x="hour", y="fee_eth_sum", color="network")
+
+        data_bytes, fname, mime = _export(df, "stc_gasvision_multi")
+        st.download_button(
+            f"📥 Unduh gabungan ({st.session_state.get('dl_format', 'CSV')})",
+            data=data_bytes,
+            file_name=fname,
+            mime=mime,
+            use_container_width=True,
+            key=key,
+        )
 
-    # Pastikan semua kolom ada, lalu urutkan sesuai target
-    for c in COLUMNS_UPPER:
-        if c not in df.columns:
-            df[c] = '' if c in ['Network','Tx Hash','Contract','Function','Timestamp','Status'] else 0
+        if save_dataset:
+            from utils.dataset import get_dataset_store
+            store = get_dataset_store()
+            # hasil job tampil ulang di tiap rerun (mis. klik unduh) → simpan sekali per job per sesi
+            saved = st.session_state.setdefault("dataset_saved", {})
+            if save_id is not None and save_id in saved:
+                n_saved = saved[save_id]
+            else:
+                n_saved = store.append(raws)
+                if save_id is not None:
+                    saved[save_id] = n_saved
+            st.caption(f"💾 {n_saved} baris disimpan ke dataset lokal `{store.root}`.")
+
+    if fails:
+        st.warning(f"{len(fails)} gagal diproses.")
+        st.dataframe(pd.DataFrame(fails), use_container_width=True, height=200)
+
+# --- job background (utils.jobs) ---
+
+def _ensure_job_workers():
+    """Jalankan worker yang kurang (mis. setelah server restart); worker berhenti sendiri saat idle."""
+    from utils.jobs import ensure_workers
+    API = st.secrets.get("ETHERSCAN_API_KEY") or os.getenv("ETHERSCAN_API_KEY")
+    ensure_workers(int(os.getenv("GV_JOB_WORKERS", "2")), api_key=API)
+
+def _forget_job():
+    st.session_state.pop("multi_job", None)
+    st.query_params.pop("job", None)
+
+@st.fragment(run_every=2)
+def _job_progress(job_id: str):
+    """Progres job; hanya fragment ini yang di-rerun tiap 2 detik sampai job selesai."""
+    from utils.jobs import get_job_queue
+    info = get_job_queue().progress(job_id)
+    if info is None or info["status"] not in ("queued", "running"):
+        st.rerun()
+    finished = info["done"] + info["failed"]
+    st.progress(finished / max(1, info["total"]),
+                text=f"Job `{job_id}`: {finished:,}/{info['total']:,} selesai · {info['failed']:,} gagal "
+                     f"· {info['running']:,} sedang diproses")
+    c1, c2 = st.columns(2)
+    if c1.button("⛔ Batalkan job", key="job_cancel", use_container_width=True):
+        get_job_queue().cancel(job_id)
+        st.rerun()
+    c2.button("Lepas (job tetap jalan)", key="job_detach", on_click=_forget_job, use_container_width=True)
+
+def _show_job(job_id: str, save_dataset: bool):
+    from utils.jobs import get_job_queue
+    q = get_job_queue()
+    info = q.progress(job_id)
+    if info is None:
+        _forget_job()
+        return
+    if info["status"] in ("queued", "running"):
+        _ensure_job_workers()
+        _job_progress(job_id)
+        return
+
+    from utils.analytics import FeeAggregator
+    from utils.resolver import AUTO_PREFIX
+    rate = get_eth_idr_rate_cached()
+    rows, fails, raws = [], [], []
+    agg = FeeAggregator()
+    for net, h, raw, err in q.results(job_id):
+        if raw is None:
+            fails.append({"Network": net.removeprefix(AUTO_PREFIX).replace(",", ", "), "Tx Hash": h, "Error": err})
+        else:
+            raws.append(raw)
+            agg.add(raw)
+            rows.append(_multi_row(raw, net, h, rate))
+    label = "dibatalkan" if info["status"] == "cancelled" else "selesai"
+    st.caption(f"Job `{job_id}` {label} · {info['done']:,} sukses · {info['failed']:,} gagal")
+    _show_multi_results(rows, fails, raws, agg, rate, save_dataset, key="dl_multi_job", save_id=job_id)
+    st.button("Tutup hasil job", key="job_close", on_click=_forget_job)
 
-    return df[COLUMNS_UPPER]
-    
 # === Logo dan Header ===
 LOGO_URL = "https://i.imgur.com/7j5aq4l.png"
 col1, col2 = st.columns([1, 4])
@@ -217,31 +325,17 @@ with col1:
 with col2:
     st.markdown("## STC GasVision")
 
-# === RPC URLs ===
-RPC_URLS = {
-    "Sepolia": "https://sepolia.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
-    "Goerli": "https://goerli.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
-    "Polygon Mumbai": "https://polygon-mumbai.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
-    "Arbitrum Sepolia": "https://arbitrum-sepolia.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206"
-}
-
 # === Input Tx Hash ===
 st.title("⛽ Gas Usage Tracker")
 
 network = st.selectbox("🧭 Pilih Jaringan Testnet", list(RPC_URLS.keys()))
-web3 = Web3(Web3.HTTPProvider(RPC_URLS[network]))
 
 # === ETH to IDR ===
-@st.cache_data(ttl=600)
 def get_eth_to_idr():
-    try:
-        response = requests.get("https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=idr")
-        return response.json()['ethereum']['idr']
-    except:
-        return 60000000
+    return get_eth_idr_rate_cached() or 60000000  # fallback
 
-ETH_TO_IDR = get_eth_to_idr()
-st.write(f"💱 Kurs saat ini (ETH to IDR): Rp {ETH_TO_IDR:,}")
+# kurs diisi paling akhir (bisa butuh network call) supaya tidak menahan render halaman
+rate_slot = st.empty()
 
 # --- SINGLE HASH (satu input + tombol hapus) ---
 c_inp, c_btn = st.columns([1, 0.18])
@@ -273,6 +367,7 @@ atau [PolygonScan](https://mumbai.polygonscan.com) untuk melihat estimasi biaya
 tx_hash = (st.session_state.get("tx_hash_input") or "").strip()
 
 if tx_hash:
+    import pandas as pd
     try:
         # Ambil data via Etherscan (sudah termasuk WIB + decode function via 4byte)
         raw = fetch_tx_raw(network, tx_hash)
@@ -295,12 +390,13 @@ if tx_hash:
         # === Ringkasan Biaya
         st.subheader("💰 Ringkasan Biaya")
         eth_idr_rate = get_eth_idr_rate_cached()
-        cost_eth = float(raw.get("cost_eth", 0.0))
-        cost_idr_val = (eth_idr_rate or 0) * cost_eth
+        fee_wei = payload_fee_wei(raw)
+        cost_eth = wei_to_eth(fee_wei)
+        cost_idr_val = wei_to_idr(fee_wei, eth_idr_rate)
         rupiah_str = format_rupiah(cost_idr_val)
 
-        gwei = float(raw.get("gas_price_gwei", 0) or 0.0)
         wei  = int(raw.get("gas_price_wei", 0)  or 0)
+        gwei = wei_to_gwei(wei)
 
         c1, c2, c3 = st.columns(3)
         with c1:
@@ -346,11 +442,12 @@ if tx_hash:
         # include_addr = st.checkbox("Sertakan alamat wallet di CSV standar", value=False)
 
         # === Download: CSV sesuai detail transaksi
+        data_bytes, fname, mime = _export(df_original, f"gas_tracker_{network.lower()}")
         st.download_button(
-            "⬇️ Unduh CSV sesuai detail transaksi",
-            data=df_original.to_csv(index=False).encode("utf-8"),
-            file_name=f"gas_tracker_{network.lower()}.csv",
-            mime="text/csv",
+            "⬇️ Unduh sesuai detail transaksi",
+            data=data_bytes,
+            file_name=fname,
+            mime=mime,
             use_container_width=True
         )
 
@@ -359,14 +456,19 @@ if tx_hash:
             'Timestamp','Network','Tx Hash','Contract','Function','Block',
             'Gas Used','Gas Price (Gwei)','Estimated Fee (ETH)','Estimated Fee (Rp)','Status'
         ]].copy()
+        data_bytes, fname, mime = _export(df_converted, "stc_analytics_ready")
         st.download_button(
             "⬇️ Unduh untuk analisa di STC Analytics",
-            data=df_converted.to_csv(index=False).encode("utf-8"),
-            file_name="stc_analytics_ready.csv",
-            mime="text/csv",
+            data=data_bytes,
+            file_name=fname,
+            mime=mime,
             use_container_width=True
         )
 
+    except TxPending as e:
+        st.info(f"⏳ Transaksi belum mined: {e}. Muat ulang halaman sebentar lagi.")
+    except TxNotFound as e:
+        st.warning(f"Transaksi tidak ditemukan: {e}. Pastikan hash dan network sudah benar.")
     except Exception as e:
         st.error(f"Gagal mengambil data transaksi: {e}")
 
@@ -383,16 +485,6 @@ Untuk melihat tren dan pola biaya:
 Semakin banyak hash, semakin akurat analisismu. 🚀
 """)
 
-HASH_RE = re.compile(r"^0x[a-fA-F0-9]{64}$")
-def parse_hashes(s: str) -> list[str]:
-    if not s: return []
-    toks = re.split(r"[\s,;]+", s.strip())
-    seen, out = set(), []
-    for t in toks:
-        if HASH_RE.fullmatch(t) and t not in seen:
-            out.append(t); seen.add(t)
-    return out
-
 with st.expander("🧰 Mode Multi-Hash / Multi-Chain", expanded=False):
 
     st.multiselect(
@@ -432,69 +524,116 @@ with st.expander("🧰 Mode Multi-Hash / Multi-Chain", expanded=False):
 
     st.caption(f"Terbaca: **{len(hashes)} hash** di **{len(nets)} chain**")
 
+    autodetect = len(nets) > 1 and st.checkbox(
+        "🔎 Deteksi chain otomatis (satu lookup penuh per hash)", value=True, key="multi_autochain",
+        help="Tiap hash diprobe murah di chain terpilih (paralel, urut hit rate), lalu di-fetch hanya di chain "
+             "tempat hash itu ada. Matikan untuk mencoba setiap hash di setiap chain.")
+
     run = st.button(
-        f"Proses ({len(hashes)}×{len(nets)})",
+        f"Proses ({len(hashes)}×{len(nets)})" if not autodetect else f"Proses ({len(hashes)} hash, auto-chain)",
         use_container_width=True,
         key="run_multi",
         disabled=(len(hashes) == 0 or len(nets) == 0),
     )
 
-    if run:
+    save_dataset = st.checkbox("💾 Simpan hasil ke dataset lokal (Parquet, per network/tanggal)",
+                               key="multi_save_dataset")
+
+    background = st.checkbox("⏳ Jalankan sebagai job background (tetap jalan walau halaman di-refresh)",
+                             key="multi_background",
+                             help="Diproses worker terpisah lewat antrean lokal; progres & hasil diambil per job id.")
+
+    if run and background:
+        from utils.jobs import get_job_queue
+        rate = get_eth_idr_rate_cached()
+        if autodetect:
+            from utils.resolver import AUTO_PREFIX
+            items, label = [(AUTO_PREFIX + ",".join(nets), h) for h in hashes], f"{len(hashes)} auto"
+        else:
+            items, label = [(net, h) for net in nets for h in hashes], f"{len(hashes)}×{len(nets)}"
+        job_id = get_job_queue().submit(items, eth_idr_rate=rate or None, label=label)
+        _ensure_job_workers()
+        st.session_state["multi_job"] = job_id
+        st.query_params["job"] = job_id  # reload/bookmark tetap menemukan job-nya
+    elif run:
+        from utils.analytics import FeeAggregator
         rate = get_eth_idr_rate_cached()
-        total = len(hashes) * len(nets)
         prog = st.progress(0.0)
-        rows, fails = [], []
+        rows, fails, raws = [], [], []
+        agg = FeeAggregator()  # ringkasan diperbarui per baris, tanpa hitung ulang seluruh tabel
         i = 0
 
-        for net in nets:
-            for h in hashes:
-                try:
-                    raw = fetch_tx_cached(net, h)
-
-                    gas_used = int(float(raw.get("gas_used", 0) or 0))
-                    gwei     = float(raw.get("gas_price_gwei", 0) or 0.0)
-                    fee_eth  = float(raw.get("cost_eth", 0.0) or 0.0)
-                    fee_idr  = fee_eth * (rate or 0)
-
-                    rows.append({
-                        "Timestamp": raw.get("timestamp",""),
-                        "Network": raw.get("network","").capitalize() or net,
-                        "Tx Hash": h,
-                        "Contract": raw.get("contract",""),
-                        "Function": raw.get("function_name",""),
-                        "Block": int(float(raw.get("block_number",0) or 0)),
-                        "Gas Used": gas_used,
-                        "Gas Price (Gwei)": gwei,
-                        "Estimated Fee (ETH)": fee_eth,
-                        "Estimated Fee (Rp)": fee_idr,
-                        "Status": raw.get("status","Unknown"),
-                        "Gasless?": ("Ya" if float(raw.get("gas_price_gwei",0) or 0) < 0.001 else "Tidak"),
-                    })
-                except Exception as e:
-                    fails.append({"Network": net, "Tx Hash": h, "Error": str(e)})
-
-                i += 1
-                prog.progress(i / total)
-                time.sleep(0.25)  # throttle biar gak ke-rate limit
-
-        if rows:
-            df = pd.DataFrame(rows)
-            st.success(f"Selesai: {len(rows)} baris.")
-            st.dataframe(df, use_container_width=True, height=320)
-
-            csv_bytes = df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                "📥 Unduh gabungan (CSV)",
-                data=csv_bytes,
-                file_name="stc_gasvision_multi.csv",
-                mime="text/csv",
-                use_container_width=True,
-                key="dl_multi_csv",
-            )
-
-        if fails:
-            st.warning(f"{len(fails)} gagal diproses.")
-            st.dataframe(pd.DataFrame(fails), use_container_width=True, height=200)
+        probed = {}  # (net, h) -> tx hasil probe, supaya tidak diminta lagi saat fetch
+        if autodetect:
+            from utils.resolver import get_chain_resolver
+            API = st.secrets.get("ETHERSCAN_API_KEY") or os.getenv("ETHERSCAN_API_KEY")
+            prog.progress(0.0, text="Mendeteksi chain…")
+            jobs = []
+            for h, (net, tx) in get_chain_resolver().resolve_many(hashes, nets, API).items():
+                if isinstance(tx, Exception):
+                    fails.append({"Network": ", ".join(nets), "Tx Hash": h, "Error": str(tx)})
+                elif net is None:
+                    fails.append({"Network": ", ".join(nets), "Tx Hash": h,
+                                  "Error": "Tx tidak ditemukan di chain terpilih"})
+                else:
+                    jobs.append((net, h))
+                    probed[(net, h)] = tx
+        else:
+            jobs = [(net, h) for net in nets for h in hashes]
+        total = max(1, len(jobs))
+        results = fetch_many(
+            jobs,
+            per_chain_concurrency=3,  # laju per API key dijaga token bucket di fetcher
+            fetch_fn=lambda net, h, throttle: fetch_tx_cached(net, h, _throttle=throttle, _rate=rate,
+                                                              _tx=probed.get((net, h))),
+        )
+        for net, h, raw, err in results:
+            if err is not None:
+                fails.append({"Network": net, "Tx Hash": h, "Error": str(err)})
+            else:
+                raws.append(raw)
+                agg.add(raw)
+                row = _multi_row(raw, net, h, rate)
+                row["_net"] = net
+                rows.append(row)
+
+            i += 1
+            prog.progress(i / total)
+
+        # hasil datang sesuai urutan selesai; kembalikan ke urutan input
+        order = {job: k for k, job in enumerate(jobs)}
+        rows.sort(key=lambda r: order.get((r["_net"], r["Tx Hash"]), 0))
+        for r in rows:
+            r.pop("_net", None)
+        fails.sort(key=lambda f: order.get((f["Network"], f["Tx Hash"]), 0))
+        _show_multi_results(rows, fails, raws, agg, rate, save_dataset)
+
+    job_id = st.session_state.get("multi_job") or st.query_params.get("job")
+    if job_id and not (run and not background):
+        _show_job(job_id, save_dataset)
+
+with st.expander("📤 Konversi CSV eksternal ke format STC Analytics", expanded=False):
+    up = st.file_uploader("Upload CSV hasil export explorer lain", type=["csv"], key="conv_upload")
+    if up is not None and st.button("Konversi", use_container_width=True, key="btn_convert"):
+        from utils.stc_format import convert_csv_to_stc
+        buf = BytesIO()
+        conv_prog = st.empty()
+        conv_fmt = "parquet" if st.session_state.get("dl_format") == "Parquet" else "csv"
+        stats = convert_csv_to_stc(
+            up, buf,
+            on_progress=lambda n, rps: conv_prog.caption(f"{n:,} baris • {rps:,.0f} baris/s"),
+            fmt=conv_fmt,
+        )
+        st.success(f"Selesai: {stats['rows']:,} baris dalam {stats['seconds']:.2f}s "
+                   f"({stats['rows_per_s']:,.0f} baris/s).")
+        st.download_button(
+            "⬇️ Unduh untuk analisa di STC Analytics",
+            data=buf.getvalue(),
+            file_name=f"stc_analytics_ready.{conv_fmt}",
+            mime="application/vnd.apache.parquet" if conv_fmt == "parquet" else "text/csv",
+            use_container_width=True,
+            key="dl_convert",
+        )
 
 # === Separator UI ===
 st.markdown("---")
@@ -506,6 +645,7 @@ Gunakan simulasi berikut untuk membandingkan biaya berdasarkan jenis transaksi d
 """)
 
 with st.expander("Simulasikan Biaya Gas Manual"):
+    from tools.simulator import TX_PRESETS, GAS_SPEED_PRESET
     col1, col2 = st.columns(2)
     with col1:
         tx_type = st.selectbox("Jenis Transaksi", list(TX_PRESETS.keys()))
@@ -518,9 +658,26 @@ with st.expander("Simulasikan Biaya Gas Manual"):
         )
 
     if st.button("🔍 Simulasikan Biaya"):
-        df_simulasi = simulate_fee_table(tx_type, gas_used, speed, selected_networks)
+        from tools.simulator import simulate_fee_table
+        from utils.gasfeed import get_gas_feed
+        # poller eth_feeHistory baru jalan saat simulasi pertama diminta, bukan tiap sesi yang membuka halaman;
+        # tidak di-refresh sinkron di sini: sebelum poll pertama selesai dipakai preset
+        gas_feed = get_gas_feed()
+        df_simulasi = simulate_fee_table(tx_type, gas_used, speed, selected_networks, eth_to_idr=get_eth_to_idr(),
+                                         feed=gas_feed)
         st.success("Simulasi berhasil dilakukan.")
         st.dataframe(df_simulasi, use_container_width=True)
-
-        csv_simulasi = df_simulasi.to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Unduh Hasil Simulasi", csv_simulasi, "simulasi_biaya_gas.csv", "text/csv")
+        status = gas_feed.status() if gas_feed is not None else {}
+        live = [f"{n} (block #{status[n]['block']})" for n in selected_networks
+                if gas_feed is not None and gas_feed.tier(n, speed) is not None]
+        warming = [n for n in selected_networks if gas_feed is not None
+                   and n not in gas_feed.updated and n not in gas_feed.errors]
+        st.caption(("⛽ Gas price live dari eth_feeHistory: " + ", ".join(live) + ". " if live else "")
+                   + ("Jaringan lain memakai preset." if len(live) < len(selected_networks) else "")
+                   + (" Feed gas live sedang dimuat, simulasikan ulang sebentar lagi." if warming else ""))
+
+        data_bytes, fname, mime = _export(df_simulasi, "simulasi_biaya_gas")
+        st.download_button("⬇️ Unduh Hasil Simulasi", data_bytes, fname, mime)
+
+# === Kurs (diisi terakhir, lihat rate_slot di atas) ===
+rate_slot.write(f"💱 Kurs saat ini (ETH to IDR): Rp {get_eth_to_idr():,}")
@@ -0,0 +1,175 @@
+"""
+Batch fetch tanpa browser: hash dari file/stdin → CSV/JSONL STC Analytics.
+
+    python -m tools.batch_fetch hashes.txt -n sepolia -n base -o laporan.csv
+    cat hashes.txt | python -m tools.batch_fetch - -n mainnet -o laporan.jsonl
+
+Hasil ditulis bertahap begitu tiap tx selesai. File output sekaligus jadi
+checkpoint: kalau job mati di tengah jalan, jalankan ulang perintah yang sama
+dan pasangan (network, hash) yang sudah ada di output akan dilewati.
+Tx yang gagal dicatat di `<output>.fails.jsonl` dan dicoba lagi di run berikutnya.
+Dengan `--dataset`, payload juga ditambahkan ke dataset Parquet lokal (utils.dataset);
+baris output baru ditulis setelah kelompoknya masuk dataset, jadi checkpoint tidak
+pernah mendahului dataset.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from utils.fetchers import CHAINIDS, fetch_eth_idr_rate, fetch_many, iter_hashes, to_standard_row
+
+FIELDS = list(to_standard_row({}).keys())
+DATASET_FLUSH = 200  # dengan --dataset: baris per kelompok (satu file Parquet per partisi per kelompok)
+
+def _fmt(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+def _repair_tail(path: str):
+    """Buang baris terakhir yang terpotong (proses di-kill saat menulis)."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # cari newline terakhir dari belakang
+        pos = size - 1
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            i = chunk.rfind(b"\n")
+            if i >= 0:
+                f.truncate(pos - step + i + 1)
+                return
+            pos -= step
+        f.truncate(0)
+
+def _load_checkpoint(path: str, fmt: str) -> set:
+    """Pasangan (network_key, tx_hash) yang sudah tertulis di output."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    _repair_tail(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = (json.loads(line) for line in f if line.strip()) if fmt == "jsonl" else csv.DictReader(f)
+        for r in rows:
+            done.add(((r.get("Network") or "").lower(), (r.get("Tx Hash") or "").lower()))
+    return done
+
+def _batches(it, size: int):
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def run(hash_lines, networks: list, out_path: str, api_key: str, fmt: str | None = None,
+        per_chain_concurrency: int = 3, window: int = 2000, eth_idr_rate: float | None = None,
+        price_index=None, dataset=None, log=sys.stderr) -> dict:
+    fmt = _fmt(out_path, fmt)
+    done = _load_checkpoint(out_path, fmt)
+    new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    if eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+
+    stats = {"ok": 0, "failed": 0, "skipped": 0}
+
+    def jobs():
+        for h in iter_hashes(hash_lines):
+            for net in networks:
+                if (net, h.lower()) in done:
+                    stats["skipped"] += 1
+                else:
+                    yield net, h
+
+    t0 = time.monotonic()
+    with open(out_path, "a", encoding="utf-8", newline="") as out, \
+         open(out_path + ".fails.jsonl", "a", encoding="utf-8") as fails:
+        writer = csv.DictWriter(out, fieldnames=FIELDS) if fmt == "csv" else None
+        if writer is not None and new_file:
+            writer.writeheader()
+        pending = []  # (row, raw) yang belum masuk dataset, jadi belum boleh jadi checkpoint
+
+        def commit():
+            # dataset dulu, baru output (= checkpoint): mati di antaranya → di-fetch ulang, bukan hilang
+            if dataset is not None:
+                dataset.append([raw for _, raw in pending])
+            for row, _ in pending:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["ok"] += len(pending)
+            pending.clear()
+
+        for chunk in _batches(jobs(), window):
+            for net, h, raw, err in fetch_many(chunk, api_key, eth_idr_rate=eth_idr_rate,
+                                               per_chain_concurrency=per_chain_concurrency,
+                                               price_index=price_index):
+                if err is not None:
+                    stats["failed"] += 1
+                    fails.write(json.dumps({"Network": net, "Tx Hash": h, "Error": str(err)}) + "\n")
+                    fails.flush()
+                    continue
+                pending.append((to_standard_row(raw), raw))
+                if dataset is None or len(pending) >= DATASET_FLUSH:
+                    commit()
+            if pending:
+                commit()
+            dt = time.monotonic() - t0
+            n = stats["ok"] + stats["failed"]
+            print(f"[batch] {n} selesai ({stats['failed']} gagal) • {n / dt if dt else 0:.1f} tx/s",
+                  file=log, flush=True)
+    return stats
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="GasVision batch fetch → CSV/JSONL STC Analytics")
+    ap.add_argument("input", help="file berisi tx hash (pisah baris/koma), '-' untuk stdin")
+    ap.add_argument("-n", "--network", action="append", choices=sorted(CHAINIDS),
+                    help="network (boleh diulang); default sepolia")
+    ap.add_argument("-o", "--output", required=True, help="file output .csv / .jsonl (juga checkpoint)")
+    ap.add_argument("--format", choices=["csv", "jsonl"], help="paksa format output")
+    ap.add_argument("--api-key", default=os.getenv("ETHERSCAN_API_KEY"), help="default: env ETHERSCAN_API_KEY")
+    ap.add_argument("--concurrency", type=int, default=3, help="request paralel per chain")
+    ap.add_argument("--window", type=int, default=2000, help="jumlah job per gelombang (batas memori)")
+    ap.add_argument("--rate", type=float, help="kurs ETH→IDR tetap (default: ambil sekali di awal)")
+    ap.add_argument("--price-history", help="CSV (waktu, harga ETH→IDR) untuk kurs saat blok")
+    ap.add_argument("--dataset", nargs="?", const="", metavar="DIR",
+                    help="tambahkan juga ke dataset Parquet lokal (default: GV_DATASET_DIR)")
+    args = ap.parse_args(argv)
+
+    if not args.api_key:
+        ap.error("ETHERSCAN_API_KEY belum diset (env atau --api-key)")
+    price_index = None
+    if args.price_history:
+        from utils.price_index import PriceIndex
+        price_index = PriceIndex.from_csv(args.price_history)
+    dataset = None
+    if args.dataset is not None:
+        from utils.dataset import DatasetStore, get_dataset_store
+        dataset = DatasetStore(args.dataset) if args.dataset else get_dataset_store()
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        stats = run(src, args.network or ["sepolia"], args.output, args.api_key, fmt=args.format,
+                    per_chain_concurrency=args.concurrency, window=args.window, eth_idr_rate=args.rate,
+                    price_index=price_index, dataset=dataset)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"Selesai: {stats['ok']} baris baru, {stats['failed']} gagal, {stats['skipped']} sudah ada.",
+          file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+Benchmark jalur utama GasVision terhadap stand-in lokal, tanpa internet.
+
+    python -m tools.bench                                   # ukuran 10 & 1k
+    python -m tools.bench --full -o bench/results.jsonl     # + 100k untuk semua kasus
+    python -m tools.bench --latency-ms 80 --jitter-ms 40 --error-rate 0.01 --rate-limit-rate 0.05
+    python -m tools.bench --compare bench/baseline.jsonl    # exit 1 kalau throughput turun > --threshold
+
+Stand-in = `tools.stub_rpc` di subprocess (Etherscan v2 `/v2/api`, 4byte.directory,
+CoinGecko) dengan latensi / HTTP 503 / rate limit (429 atau "Max rate limit
+reached") yang bisa diatur dan ber-seed, jadi hasil bisa diulang.
+
+Kasus:
+- parse_hashes          : n hash dalam satu teks (plus duplikat & sampah)
+- convert_to_stc_format : DataFrame n baris hasil to_standard_row
+- simulate_fee_table    : n panggilan (jenis tx / speed bergantian)
+- fetch_tx_raw_any      : n tx berurutan (sinkron, tanpa cache disk)
+- multi_hash            : n tx lewat fetch_many + FeeAggregator + to_standard_row + konversi STC
+- multi_hash_async      : n tx lewat utils.async_fetchers.fetch_many (httpx)
+
+Kasus per item (tiga terakhir + simulate_fee_table) default hanya sampai 1k;
+100k ikut dengan `--full`. Tiap baris hasil:
+    {"case", "n", "seconds", "throughput", "p50_ms", "p99_ms", "peak_mb", "errors"}
+p50/p99 = latensi per item (kasus per item) atau per ulangan (kasus batch).
+peak_mb diukur di pass terpisah dengan tracemalloc (`--no-memory` untuk lewati).
+"""
+import argparse
+import ast
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (10, 1_000, 100_000)
+QUICK_MAX = 1_000          # batas ukuran kasus per item tanpa --full
+STUB_TXS_PER_BLOCK = 3
+STUB_START_BLOCK = 1000    # sama dengan default StubChain
+API_KEY = "bench"
+
+# =========================
+# Stand-in (subprocess tools.stub_rpc)
+# =========================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Stub:
+    """Jalankan tools.stub_rpc di proses terpisah (tidak berebut GIL / tidak ikut tracemalloc)."""
+
+    def __init__(self, n_txs: int, faults: dict):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        blocks = max(1, -(-n_txs // STUB_TXS_PER_BLOCK))
+        cmd = [sys.executable, "-m", "tools.stub_rpc", "--port", str(self.port),
+               "--blocks", str(blocks), "--txs-per-block", str(STUB_TXS_PER_BLOCK)]
+        for k, v in faults.items():
+            cmd += [f"--{k.replace('_', '-')}", str(v)]
+        self.proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        line = self.proc.stdout.readline()
+        if not line.startswith("Stub"):
+            self.proc.kill()
+            raise RuntimeError(f"stub_rpc gagal start: {line!r}")
+        self.injected = {}
+
+    def env(self) -> dict:
+        return {
+            "GV_ETHERSCAN_BASE": self.url,
+            "GV_4BYTE_URL": self.url + "/api/v1/signatures/",
+            "GV_COINGECKO_URL": self.url + "/api/v3/simple/price",
+            "GV_GAS_RPC_URL": self.url,
+        }
+
+    def close(self):
+        self.proc.send_signal(signal.SIGINT)
+        try:
+            out, _ = self.proc.communicate(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            return
+        for line in out.splitlines():
+            if line.startswith("Gangguan disuntikkan:"):
+                self.injected = ast.literal_eval(line.split(":", 1)[1].strip())
+
+def stub_hashes(n: int) -> list:
+    """n hash tx pertama StubChain (deterministik, tanpa membangun chain-nya)."""
+    from tools.stub_rpc import _h
+    return [_h(1, STUB_START_BLOCK + i // STUB_TXS_PER_BLOCK, i % STUB_TXS_PER_BLOCK) for i in range(n)]
+
+# =========================
+# Kasus
+# =========================
+# Tiap kasus: fn(n, ctx) -> (detik_wall, latensi_detik[], error)
+
+def _reset_caches():
+    """Cache memori proses dikosongkan supaya tiap kasus mulai dingin."""
+    import utils.fetchers as F
+    with F.BLOCK_HEADERS._lock:
+        F.BLOCK_HEADERS._data.clear()
+    F.SIG_NAMES.clear()
+
+def _repeat(fn, repeat: int):
+    lat = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t)
+    return statistics.median(lat), lat, 0
+
+def _payloads(n: int) -> list:
+    """Payload sintetis ala fetcher (tanpa jaringan) untuk kasus konversi."""
+    fns = ("transfer", "approve", "ETH Transfer", "swapExactTokensForTokens")
+    return [{
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1_700_000_000 + i * 12)),
+        "network": ("sepolia", "mainnet", "arbitrum")[i % 3],
+        "tx_hash": h, "contract": "0x" + f"{i % 50:02x}" * 20, "function_name": fns[i % 4],
+        "block_number": STUB_START_BLOCK + i // 3, "gas_used": 21000 + (i * 12345) % 200000,
+        "gas_price_wei": 1_000_000_000 + (i % 97) * 10_000_000,
+        "status": "Success" if i % 5 else "Failed",
+    } for i, h in enumerate(stub_hashes(n))]
+
+def case_parse_hashes(n, ctx):
+    from utils.fetchers import parse_hashes
+    hashes = stub_hashes(n)
+    # separator campur, duplikat dan token bukan hash seperti input user sungguhan
+    text = "\n".join(f"{h}, {hashes[i // 2]} ; bukan-hash" for i, h in enumerate(hashes))
+    return _repeat(lambda: parse_hashes(text), ctx["repeat"])
+
+def case_convert_to_stc_format(n, ctx):
+    import pandas as pd
+    from utils.fetchers import to_standard_row
+    from utils.stc_format import convert_to_stc_format
+    df = pd.DataFrame([to_standard_row(p) for p in _payloads(n)])
+    return _repeat(lambda: convert_to_stc_format(df), ctx["repeat"])
+
+def case_simulate_fee_table(n, ctx):
+    from tools.simulator import GAS_SPEED_PRESET, SIMULATED_NETWORKS, TX_PRESETS, simulate_fee_table
+    from utils.gasfeed import GasFeed
+    presets, speeds, nets = list(TX_PRESETS.items()), list(GAS_SPEED_PRESET), list(SIMULATED_NETWORKS)
+    feed = ctx.get("gas_feed")
+    if feed is None:
+        feed = ctx["gas_feed"] = GasFeed(window=64)
+        feed.refresh()  # isi ring dari stub sekali; yang diukur hanya pembacaan tier
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        tx_type, gas = presets[i % len(presets)]
+        t = time.perf_counter()
+        simulate_fee_table(tx_type, gas, speeds[i % len(speeds)], nets, eth_to_idr=ctx["rate"], feed=feed)
+        lat.append(time.perf_counter() - t)
+    return time.perf_counter() - t0, lat, 0
+
+def case_fetch_tx_raw_any(n, ctx):
+    from utils.fetchers import fetch_tx_raw_any
+    lat, errors = [], 0
+    t0 = time.perf_counter()
+    for h in stub_hashes(n):
+        t = time.perf_counter()
+        try:
+            fetch_tx_raw_any(h, API_KEY, "sepolia", eth_idr_rate=ctx["rate"], use_cache=False)
+        except Exception:
+            errors += 1
+        lat.append(time.perf_counter() - t)
+    return time.perf_counter() - t0, lat, errors
+
+def case_multi_hash(n, ctx):
+    """Alur tab multi-hash di app: fetch paralel → agregat inkremental → baris STC → DataFrame."""
+    import pandas as pd
+    from utils.analytics import FeeAggregator
+    from utils.fetchers import fetch_many, fetch_tx_raw_any, to_standard_row
+    from utils.stc_format import convert_to_stc_format
+
+    lat = []
+
+    def fetch_fn(net, h, throttle):
+        t = time.perf_counter()
+        try:
+            return fetch_tx_raw_any(h, API_KEY, net, eth_idr_rate=ctx["rate"], throttle=throttle,
+                                    use_cache=False)
+        finally:
+            lat.append(time.perf_counter() - t)
+
+    t0 = time.perf_counter()
+    agg, rows, errors = FeeAggregator(), [], 0
+    jobs = [("sepolia", h) for h in stub_hashes(n)]
+    for _net, _h, raw, err in fetch_many(jobs, API_KEY, per_chain_concurrency=ctx["concurrency"],
+                                         max_workers=ctx["concurrency"], fetch_fn=fetch_fn):
+        if err is not None:
+            errors += 1
+            continue
+        agg.add(raw)
+        rows.append(to_standard_row(raw))
+    if rows:
+        convert_to_stc_format(pd.DataFrame(rows))
+    agg.snapshot()
+    return time.perf_counter() - t0, lat, errors
+
+def case_multi_hash_async(n, ctx):
+    import asyncio
+    from utils.async_fetchers import _HeaderFlights, fetch_many, fetch_tx_raw_any
+
+    lat = []
+    headers = _HeaderFlights()
+
+    async def fetch_fn(net, h, client):
+        t = time.perf_counter()
+        try:
+            return await fetch_tx_raw_any(h, API_KEY, net, ctx["rate"], client, _headers=headers)
+        finally:
+            lat.append(time.perf_counter() - t)
+
+    async def go():
+        return await fetch_many([("sepolia", h) for h in stub_hashes(n)], API_KEY,
+                                eth_idr_rate=ctx["rate"], concurrency=ctx["concurrency"] * 4, fetch_fn=fetch_fn)
+
+    t0 = time.perf_counter()
+    results = asyncio.run(go())
+    return time.perf_counter() - t0, lat, sum(1 for *_x, err in results if err is not None)
+
+# (nama, fungsi, per_item, pakai_stub)
+CASES = [
+    ("parse_hashes", case_parse_hashes, False, False),
+    ("convert_to_stc_format", case_convert_to_stc_format, False, False),
+    ("simulate_fee_table", case_simulate_fee_table, True, False),
+    ("fetch_tx_raw_any", case_fetch_tx_raw_any, True, True),
+    ("multi_hash", case_multi_hash, True, True),
+    ("multi_hash_async", case_multi_hash_async, True, True),
+]
+
+# =========================
+# Runner
+# =========================
+
+def _pct(vals, q: float):
+    if not vals:
+        return None
+    vals = sorted(vals)
+    return round(vals[min(len(vals) - 1, int(q * len(vals)))] * 1000, 3)
+
+def _peak_mb(fn, n, ctx) -> float:
+    _reset_caches()
+    tracemalloc.start()
+    try:
+        fn(n, {**ctx, "repeat": 1})
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+def _measure(name, fn, n, ctx, memory: bool) -> dict:
+    _reset_caches()
+    seconds, lat, errors = fn(n, ctx)
+    return {
+        "case": name, "n": n,
+        "seconds": round(seconds, 4),
+        "throughput": round(n / seconds, 1) if seconds > 0 else None,
+        "p50_ms": _pct(lat, 0.50),
+        "p99_ms": _pct(lat, 0.99),
+        "peak_mb": _peak_mb(fn, n, ctx) if memory else None,
+        "errors": errors,
+    }
+
+def _git_head() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+def run(sizes=SIZES[:2], cases=None, full: bool = False, faults: dict | None = None,
+        concurrency: int = 16, repeat: int = 5, memory: bool = True, log=None) -> dict:
+    """Jalankan kasus terpilih; return {"meta", "results"}."""
+    faults = {k: v for k, v in (faults or {}).items() if v}
+    chosen = [c for c in CASES if not cases or c[0] in cases]
+    plan = [(c, n) for c in chosen for n in sizes if full or not c[2] or n <= QUICK_MAX]
+    n_stub = max((n for c, n in plan if c[3]), default=0)
+
+    # lingkungan terisolasi: cache di folder sementara, endpoint ke stand-in; diset sebelum utils di-import
+    tmp = tempfile.TemporaryDirectory(prefix="gv-bench-")
+    os.environ.update(GV_CACHE_DIR=tmp.name, GV_TX_CACHE="0",
+                      GV_RATE_ETHERSCAN="1000000", GV_RATE_4BYTE="1000000", GV_RATE_COINGECKO="1000000")
+    stub = Stub(n_stub, faults) if n_stub else None
+    if stub is not None:
+        os.environ.update(stub.env())
+    sys.path.insert(0, ROOT)
+    results = []
+    try:
+        import utils.rates as R
+        if stub is not None:
+            # hanya stand-in CoinGecko; fallback Binance berarti internet
+            R._default = R.RateService(providers=[("coingecko", R._coingecko)])
+            t = time.perf_counter()
+            rate = R.get_eth_idr_rate()
+            rate_s = time.perf_counter() - t
+        else:
+            rate, rate_s = 60_000_000.0, None
+        ctx = {"rate": rate or 60_000_000.0, "concurrency": concurrency, "repeat": repeat}
+
+        for (name, fn, _per_item, _uses_stub), n in plan:
+            res = _measure(name, fn, n, ctx, memory)
+            results.append(res)
+            if log:
+                log(res)
+    finally:
+        if stub is not None:
+            stub.close()
+        tmp.cleanup()
+
+    return {
+        "meta": {
+            "bench": "pipeline",
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_head(),
+            "python": sys.version.split()[0],
+            "concurrency": concurrency,
+            "repeat": repeat,
+            "faults": faults,
+            "injected": stub.injected if stub is not None else {},
+            "rate_fetch_s": round(rate_s, 4) if rate_s is not None else None,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Kasus (case, n) yang throughput-nya turun lebih dari `threshold` (0.2 = 20%)."""
+    base = {(r["case"], r["n"]): r for r in baseline["results"]}
+    worse = []
+    for r in current["results"]:
+        b = base.get((r["case"], r["n"]))
+        if not b or not b.get("throughput") or not r.get("throughput"):
+            continue
+        delta = r["throughput"] / b["throughput"] - 1
+        print(f"{r['case']:<24} n={r['n']:<7} {b['throughput']:>12.1f} → {r['throughput']:>12.1f}/s "
+              f"({delta:+.1%})", file=sys.stderr)
+        if delta < -threshold:
+            worse.append({**r, "baseline_throughput": b["throughput"], "delta": round(delta, 4)})
+    return worse
+
+def _load_last(path: str) -> dict:
+    """Hasil terakhir dari file JSONL (atau file JSON tunggal)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [ln for ln in f.read().splitlines() if ln.strip()]
+    try:
+        return json.loads(lines[-1])
+    except json.JSONDecodeError:
+        return json.loads("\n".join(lines))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark pipeline GasVision terhadap stand-in lokal")
+    ap.add_argument("--sizes", default=None, help="mis. 10,1000 (default 10,1000; --full: 10,1000,100000)")
+    ap.add_argument("--full", action="store_true", help="ikutkan 100k untuk semua kasus")
+    ap.add_argument("--case", action="append", choices=[c[0] for c in CASES], help="hanya kasus ini (boleh berulang)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--repeat", type=int, default=5, help="ulangan kasus batch")
+    ap.add_argument("--no-memory", action="store_true", help="lewati pass tracemalloc")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("-o", "--output", help="tambahkan hasil (satu baris JSON) ke file ini")
+    ap.add_argument("--compare", help="hasil baseline (JSONL/JSON) untuk dibandingkan")
+    ap.add_argument("--threshold", type=float, default=0.2, help="batas penurunan throughput (0.2 = 20%%)")
+    args = ap.parse_args(argv)
+
+    sizes = tuple(int(s) for s in args.sizes.split(",")) if args.sizes else (SIZES if args.full else SIZES[:2])
+    faults = {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+              "rate_limit_rate": args.rate_limit_rate}
+    if any(faults.values()):
+        faults["seed"] = args.seed
+
+    def log(r):
+        print(f"{r['case']:<24} n={r['n']:<7} {r['seconds']:>9.3f}s {r['throughput'] or 0:>12.1f}/s "
+              f"p50={r['p50_ms']}ms p99={r['p99_ms']}ms peak={r['peak_mb']}MB err={r['errors']}", file=sys.stderr)
+
+    res = run(sizes, args.case, args.full, faults, args.concurrency, args.repeat, not args.no_memory, log)
+    line = json.dumps(res, ensure_ascii=False)
+    print(line)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    if args.compare:
+        return 1 if compare(res, _load_last(args.compare), args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Benchmark cold start streamlit_app.py (tiap pengukuran di interpreter baru).
+
+    python -m tools.bench_startup                 # 3 ulangan, cetak JSON
+    python -m tools.bench_startup -n 5 -o bench/startup.jsonl
+
+Metrik (detik, median dari ulangan):
+- app_imports_s   : import top-level streamlit_app.py saja (diambil via ast)
+- streamlit_s     : import streamlit + harness AppTest (biaya tetap server)
+- first_delta_s   : dari mulai script sampai elemen UI pertama terkirim
+- script_s        : satu run script penuh (cold) sampai selesai
+- rerun_s         : run berikutnya di proses yang sama (warm)
+- heavy_at_import : modul berat yang sudah ter-load setelah import top-level
+
+Default offline: kurs di-seed ke cache disk sementara sehingga tidak ada
+network call; `--online` memakai cache/provider sungguhan.
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+HEAVY = ("pandas", "numpy", "pyarrow", "web3", "httpx")
+
+def _top_level_imports(path: str) -> list:
+    """Statement import level modul dari file app (urutan sesuai file)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+_IMPORTS_CHILD = r"""
+import sys, time, json
+t = time.perf_counter()
+exec(compile(sys.argv[1], "<app-imports>", "exec"), {})
+dt = time.perf_counter() - t
+print(json.dumps({"app_imports_s": dt, "heavy_at_import": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+_RUN_CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+t_st = time.perf_counter() - t0
+
+marks = []
+_enqueue = ForwardMsgQueue.enqueue
+def enqueue(self, msg):
+    if msg.WhichOneof("type") == "delta":
+        marks.append(time.perf_counter())
+    return _enqueue(self, msg)
+ForwardMsgQueue.enqueue = enqueue
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+first = (marks[0] - t1) if marks else None
+marks.clear()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "streamlit_s": t_st, "first_delta_s": first, "script_s": t2 - t1, "rerun_s": t3 - t2,
+    "exceptions": [str(e.value) for e in at.exception],
+}))
+"""
+
+def _child(code: str, *args, env=None) -> dict:
+    out = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True,
+                         env=env, cwd=os.path.dirname(APP), timeout=600)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip()[-2000:])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _offline_env(tmp: str) -> dict:
+    env = dict(os.environ, GV_CACHE_DIR=tmp, GV_GAS_FEED="0")  # tanpa poller eth_feeHistory ke RPC publik
+    with open(os.path.join(tmp, "eth_idr_rate.json"), "w", encoding="utf-8") as f:
+        json.dump({"value": 60_000_000.0, "ts": time.time() + 86400, "source": "bench"}, f)
+    return env
+
+def run(repeat: int = 3, online: bool = False) -> dict:
+    imports = "\n".join(_top_level_imports(APP))
+    samples = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ) if online else _offline_env(tmp)
+            s = _child(_IMPORTS_CHILD, imports, json.dumps(HEAVY), env=env)
+            s.update(_child(_RUN_CHILD, APP, env=env))
+        samples.append(s)
+
+    def med(key):
+        vals = [s[key] for s in samples if s.get(key) is not None]
+        return round(statistics.median(vals), 4) if vals else None
+
+    return {
+        "bench": "startup",
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_head(),
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "online": online,
+        **{k: med(k) for k in ("app_imports_s", "streamlit_s", "first_delta_s", "script_s", "rerun_s")},
+        "heavy_at_import": samples[-1]["heavy_at_import"],
+        "exceptions": samples[-1]["exceptions"],
+    }
+
+def _git_head() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP)).stdout.strip() or None
+    except OSError:
+        return None
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark cold start streamlit_app.py")
+    ap.add_argument("-n", "--repeat", type=int, default=3)
+    ap.add_argument("-o", "--output", help="tambahkan hasil (JSONL) ke file ini")
+    ap.add_argument("--online", action="store_true", help="pakai cache/provider kurs sungguhan")
+    args = ap.parse_args(argv)
+
+    res = run(args.repeat, args.online)
+    line = json.dumps(res, ensure_ascii=False)
+    print(line)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return 1 if res["exceptions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
-import streamlit as st
+import numpy as np
 import pandas as pd
-import requests
+from utils.rates import get_eth_idr_rate
+from utils.wei import fee_parts, gwei_to_wei, parts_to_eth, wei_to_eth, wei_to_idr
 
 # === Preset Gas Used per Transaction Type ===
 TX_PRESETS = {
@@ -12,6 +13,7 @@ TX_PRESETS = {
     "Add Liquidity": 270000,
 }
 
+# fallback kalau feed live (utils.gasfeed) belum punya data untuk jaringan tsb
 GAS_SPEED_PRESET = {
     "Standard": 20,
     "Fast": 50,
@@ -26,33 +28,98 @@ SIMULATED_NETWORKS = {
 }
 
 def get_eth_to_idr():
-    try:
-        url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=idr"
-        response = requests.get(url)
-        return response.json()["ethereum"]["idr"]
-    except:
-        return 60000000  # fallback
+    return get_eth_idr_rate() or 60000000  # fallback
 
 def calculate_gas_fees(gas_used, gas_price_gwei, eth_to_idr):
-    fee_eth = (gas_used * gas_price_gwei) * 1e-9
-    fee_idr = fee_eth * eth_to_idr
-    return fee_eth, fee_idr
-
-def simulate_fee_table(tx_type, gas_used_input, speed_level, selected_networks):
-    eth_to_idr = get_eth_to_idr()
-    gas_price_gwei = GAS_SPEED_PRESET[speed_level]
-    rows = []
-
-    for network in selected_networks:
-        token = SIMULATED_NETWORKS[network]
-        fee_eth, fee_idr = calculate_gas_fees(gas_used_input, gas_price_gwei, eth_to_idr)
-        rows.append({
-            "Jaringan": network,
-            "Token": token,
-            "Gas Used": gas_used_input,
-            "Gas Price (Gwei)": gas_price_gwei,
-            "Fee (ETH)": round(fee_eth, 8),
-            "Fee (Rp)": round(fee_idr, 2)
-        })
-
-    return pd.DataFrame(rows)
+    fee_wei = int(gas_used) * gwei_to_wei(gas_price_gwei)
+    return wei_to_eth(fee_wei), wei_to_idr(fee_wei, eth_to_idr)
+
+def gas_price_gwei(network: str, speed_level: str, feed=None) -> float:
+    """Gas price tier dari feed live (O(1), tanpa I/O); fallback GAS_SPEED_PRESET."""
+    live = feed.tier(network, speed_level) if feed is not None else None
+    return live if live is not None else GAS_SPEED_PRESET[speed_level]
+
+def simulate_fee_table(tx_type, gas_used_input, speed_level, selected_networks, eth_to_idr=None, feed=None):
+    """
+    Fee satu jenis tx di tiap jaringan. Gas price per jaringan dari `feed`
+    (mis. utils.gasfeed.get_gas_feed()); tanpa feed / belum ada data → preset.
+    """
+    if eth_to_idr is None:
+        eth_to_idr = get_eth_to_idr()
+    nets = list(selected_networks)
+
+    # gas price bisa beda per jaringan → satu baris per jaringan, tetap integer wei
+    g = np.full(len(nets), int(gas_used_input), dtype=np.int64)
+    p = np.asarray([gas_price_gwei(n, speed_level, feed) for n in nets], dtype=np.float64)
+    fee_eth = parts_to_eth(*fee_parts(g, np.rint(p * 1e9).astype(np.int64)))
+    return pd.DataFrame({
+        "Jaringan": pd.Categorical(nets),
+        "Token": pd.Categorical([SIMULATED_NETWORKS.get(n, "ETH") for n in nets]),
+        "Gas Used": g,
+        "Gas Price (Gwei)": p,
+        "Fee (ETH)": np.round(fee_eth, 8),
+        "Fee (Rp)": np.round(fee_eth * float(eth_to_idr), 2),
+    })
+
+# === Simulasi grid (vectorized) untuk budgeting ===
+
+def gas_price_samples(median_gwei: float, sigma: float = 0.5, n: int = 1000, seed=None) -> np.ndarray:
+    """Sampel gas price (Gwei) dari distribusi lognormal di sekitar median."""
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=np.log(median_gwei), sigma=sigma, size=n)
+
+def simulate_fee_grid(gas_used, gas_price_gwei, eth_to_idr, networks=None, as_frame: bool = True):
+    """
+    Hitung fee untuk seluruh kombinasi (cartesian) dalam satu pass NumPy:
+    network × gas_used × gas_price × kurs.
+
+    - `gas_used`: array gas used, atau dict {jenis_tx: gas_used} (mis. TX_PRESETS)
+    - `gas_price_gwei`: array gas price (boleh hasil `gas_price_samples`)
+    - `eth_to_idr`: array kurs ETH→IDR
+    - `networks`: daftar nama di SIMULATED_NETWORKS (default semua)
+
+    Return DataFrame (`as_frame=True`) atau dict kolom → ndarray.
+    """
+    labels = None
+    if isinstance(gas_used, dict):
+        labels = np.asarray(list(gas_used.keys()), dtype=object)
+        gas_used = list(gas_used.values())
+    g = np.asarray(gas_used).ravel()
+    p = np.asarray(gas_price_gwei).ravel()
+    r = np.asarray(eth_to_idr, dtype=np.float64).ravel()
+    nets = list(networks) if networks is not None else list(SIMULATED_NETWORKS)
+
+    # fee per (gas_used, gas_price) dalam integer wei, lalu broadcast ke kurs: shape (g, p, r)
+    p_wei = np.rint(p.astype(np.float64) * 1e9).astype(np.int64)
+    fee_eth_gp = parts_to_eth(*fee_parts(g.astype(np.int64)[:, None], p_wei[None, :]))
+    fee_idr = np.multiply.outer(fee_eth_gp, r)
+    fee_eth = np.broadcast_to(fee_eth_gp[:, :, None], fee_idr.shape)
+
+    n_g, n_p, n_r = fee_idr.shape
+    per_net = n_g * n_p * n_r
+    n_net = len(nets)
+
+    # index kolom untuk layout C-order (g, p, r), lalu diulang per network
+    gi = np.repeat(np.arange(n_g), n_p * n_r)
+    pi = np.tile(np.repeat(np.arange(n_p), n_r), n_g)
+    ri = np.tile(np.arange(n_r), n_g * n_p)
+
+    tokens = [SIMULATED_NETWORKS.get(n, "ETH") for n in nets]
+    token_cats = sorted(set(tokens))
+    token_codes = np.asarray([token_cats.index(t) for t in tokens], dtype=np.int64)
+
+    net_codes = np.repeat(np.arange(n_net), per_net)
+    cols = {
+        "Jaringan": pd.Categorical.from_codes(net_codes, categories=nets),
+        "Token": pd.Categorical.from_codes(token_codes[net_codes], categories=token_cats),
+    }
+    if labels is not None:
+        cols["Jenis Transaksi"] = np.tile(labels[gi], n_net)
+    cols.update({
+        "Gas Used": np.tile(g[gi], n_net),
+        "Gas Price (Gwei)": np.tile(p[pi], n_net),
+        "Kurs (Rp)": np.tile(r[ri], n_net),
+        "Fee (ETH)": np.tile(fee_eth.ravel(), n_net),
+        "Fee (Rp)": np.tile(fee_idr.ravel(), n_net),
+    })
+    return pd.DataFrame(cols, copy=False) if as_frame else cols
@@ -0,0 +1,275 @@
+"""
+Stub JSON-RPC lokal untuk uji backend batch (utils/rpc.py) tanpa internet.
+
+    python -m tools.stub_rpc --port 8545 --blocks 50 --txs-per-block 5
+
+Chain palsu dibuat deterministik dari seed; hash tx yang tersedia bisa
+diambil dari `StubChain.tx_hashes`, block baru ditambah dengan `mine()`
+(eth_feeHistory ikut bergerak, untuk uji utils/gasfeed.py).
+
+Server yang sama juga melayani GET ala Etherscan v2 (`/v2/api?module=proxy`),
+4byte.directory (`/api/v1/signatures/`) dan CoinGecko (`/api/v3/simple/price`),
+jadi fetcher bisa diuji dengan GV_ETHERSCAN_BASE / GV_4BYTE_URL /
+GV_COINGECKO_URL diarahkan ke sini. `Faults` menyuntikkan latensi, HTTP 5xx
+dan rate limit (HTTP 429 / "Max rate limit reached") secara acak ber-seed.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# signature yang dikenal endpoint 4byte stub
+STUB_SIGNATURES = {"0xa9059cbb": "transfer(address,uint256)"}
+STUB_ETH_IDR = 60_000_000.0
+
+class Faults:
+    """Gangguan yang disuntikkan ke tiap request: latensi + error 5xx + rate limit."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1, seed: int = 1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected = {"error": 0, "http_429": 0, "etherscan_limit": 0}
+
+    def pick(self) -> tuple[float, str | None]:
+        """(delay_detik, jenis_gangguan|None) untuk satu request."""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            r = self._rng.random()
+            kind = None
+            if r < self.error_rate:
+                kind = "error"
+            elif r < self.error_rate + self.rate_limit_rate:
+                # Etherscan membalas rate limit dua cara: HTTP 429 atau HTTP 200 + pesan
+                kind = "http_429" if self._rng.random() < 0.5 else "etherscan_limit"
+            if kind:
+                self.injected[kind] += 1
+            return delay, kind
+
+def _h(*parts) -> str:
+    return "0x" + hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+class StubChain:
+    """Chain in-memory: block header, tx dan receipt dalam format JSON-RPC."""
+
+    def __init__(self, blocks: int = 20, txs_per_block: int = 3, seed: int = 1,
+                 start_block: int = 1000, start_ts: int = 1_700_000_000):
+        self.blocks, self.txs, self.receipts = {}, {}, {}
+        self.calls = 0  # jumlah call JSON-RPC (bukan POST) yang diterima
+        self.seed, self.txs_per_block = seed, txs_per_block
+        self.start_block, self.start_ts = start_block, start_ts
+        self.head = start_block - 1
+        self.mine(blocks)
+
+    def mine(self, n: int = 1):
+        """Tambah `n` block baru di atas head (untuk uji feed yang mem-poll chain)."""
+        seed, txs_per_block, start_block, start_ts = self.seed, self.txs_per_block, self.start_block, self.start_ts
+        for b in range(self.head + 1, self.head + 1 + n):
+            base_fee = 1_000_000_000 + (b % 7) * 10_000_000
+            hashes = []
+            for i in range(txs_per_block):
+                h = _h(seed, b, i)
+                gas_used = 21000 + (i * 12345) % 200000
+                price = base_fee + (i + 1) * 100_000_000 + (b % 5) * 50_000_000  # tip bervariasi antar block
+                data = "0x" if i % 3 == 0 else "0xa9059cbb" + "00" * 64
+                self.txs[h] = {
+                    "hash": h, "blockNumber": hex(b), "from": "0x" + "11" * 20,
+                    "to": "0x" + f"{i:02x}" * 20, "gasPrice": hex(price), "input": data,
+                    "transactionIndex": hex(i),
+                }
+                self.receipts[h] = {
+                    "transactionHash": h, "blockNumber": hex(b), "gasUsed": hex(gas_used),
+                    "effectiveGasPrice": hex(price), "status": "0x1" if i % 5 else "0x0",
+                }
+                hashes.append(h)
+            self.blocks[b] = {
+                "number": hex(b), "hash": _h("blk", seed, b),
+                "timestamp": hex(start_ts + (b - start_block) * 12),
+                "baseFeePerGas": hex(base_fee), "gasUsed": hex(15_000_000),
+                "gasLimit": hex(30_000_000), "transactions": hashes,
+            }
+            self.head = b
+
+    @property
+    def tx_hashes(self) -> list:
+        return list(self.txs)
+
+    def handle(self, method: str, params: list):
+        self.calls += 1
+        if method == "eth_getTransactionByHash":
+            return self.txs.get(params[0])
+        if method == "eth_getTransactionReceipt":
+            return self.receipts.get(params[0])
+        if method == "eth_blockNumber":
+            return hex(self.head)
+        if method == "eth_feeHistory":
+            return self._fee_history(*params)
+        if method == "eth_getBlockByNumber":
+            tag = params[0]
+            num = self.head if tag == "latest" else int(tag, 16)
+            blk = self.blocks.get(num)
+            if blk is None:
+                return None
+            full = bool(params[1]) if len(params) > 1 else False
+            if full:
+                return {**blk, "transactions": [self.txs[h] for h in blk["transactions"]]}
+            return blk
+        raise KeyError(method)
+
+    def _fee_history(self, count, newest, percentiles=()):
+        count = int(count, 16) if isinstance(count, str) else int(count)
+        newest = self.head if newest in ("latest", "pending") else int(newest, 16)
+        oldest = max(self.start_block, newest - count + 1)
+        base, ratio, reward = [], [], []
+        for n in range(oldest, newest + 1):
+            blk = self.blocks[n]
+            fee = int(blk["baseFeePerGas"], 16)
+            tips = sorted(int(self.txs[h]["gasPrice"], 16) - fee for h in blk["transactions"]) or [0]
+            base.append(hex(fee))
+            ratio.append(int(blk["gasUsed"], 16) / int(blk["gasLimit"], 16))
+            reward.append([hex(tips[min(len(tips) - 1, int(len(tips) * p / 100))]) for p in percentiles])
+        base.append(hex(1_000_000_000 + ((newest + 1) % 7) * 10_000_000))  # base fee block berikutnya
+        out = {"oldestBlock": hex(oldest), "baseFeePerGas": base, "gasUsedRatio": ratio}
+        if percentiles:
+            out["reward"] = reward
+        return out
+
+def _make_handler(chain: StubChain, faults: Faults | None = None, chains: dict | None = None):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive seperti provider sungguhan
+        disable_nagle_algorithm = True  # header & body ditulis terpisah; tanpa ini kena delayed ACK ~40ms
+
+        def log_message(self, *args):
+            pass
+
+        def _inject(self, etherscan: bool = False) -> bool:
+            """Terapkan gangguan; True kalau response sudah dikirim (request selesai)."""
+            if faults is None:
+                return False
+            delay, kind = faults.pick()
+            if delay:
+                time.sleep(delay)
+            if kind == "error":
+                self._send({"error": "injected"}, status=503)
+            elif kind == "http_429" or (kind == "etherscan_limit" and not etherscan):
+                self._send({"error": "Too Many Requests"}, status=429,
+                           headers={"Retry-After": str(int(faults.retry_after))})  # detik bulat, sesuai RFC
+            elif kind == "etherscan_limit":
+                self._send({"status": "0", "message": "NOTOK", "result": "Max rate limit reached"})
+            return kind is not None
+
+        def _one(self, req):
+            try:
+                with lock:
+                    result = chain.handle(req["method"], req.get("params", []))
+                return {"jsonrpc": "2.0", "id": req.get("id"), "result": result}
+            except KeyError:
+                return {"jsonrpc": "2.0", "id": req.get("id"),
+                        "error": {"code": -32601, "message": "method not found"}}
+
+        def _send(self, obj, status: int = 200, headers: dict | None = None):
+            data = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self._inject():
+                return
+            req = json.loads(body or b"null")
+            self._send([self._one(r) for r in req] if isinstance(req, list) else self._one(req))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            path = url.path.rstrip("/")
+            if self._inject(etherscan=(path == "/v2/api")):
+                return
+            if path == "/v2/api":
+                self._send(_etherscan_proxy(q))
+            elif path == "/api/v3/simple/price":
+                self._send({"ethereum": {"idr": STUB_ETH_IDR}})
+            elif path == "/api/v1/signatures":
+                sig = STUB_SIGNATURES.get(q.get("hex_signature", ""))
+                self._send({"count": int(bool(sig)),
+                            "results": [{"text_signature": sig, "created_at": "2020-01-01"}] if sig else []})
+            else:
+                self._send({"error": "not found"}, status=404)
+
+    def _etherscan_proxy(q: dict) -> dict:
+        """module=proxy → method JSON-RPC yang sama (format balasan Etherscan)."""
+        params = {
+            "eth_getTransactionByHash": lambda: [q.get("txhash")],
+            "eth_getTransactionReceipt": lambda: [q.get("txhash")],
+            "eth_getBlockByNumber": lambda: [q.get("tag"), q.get("boolean") == "true"],
+            "eth_blockNumber": lambda: [],
+        }.get(q.get("action"))
+        if q.get("module") != "proxy" or params is None:
+            return {"status": "0", "message": "NOTOK", "result": "Error! Missing Or invalid Module name"}
+        # `chains` {chainid: StubChain}: tiap chainid punya data sendiri (uji deteksi chain)
+        target = chain if chains is None else chains.get(int(q.get("chainid") or 0))
+        if target is None:
+            return {"jsonrpc": "2.0", "id": 1, "result": None}
+        with lock:
+            result = target.handle(q["action"], params())
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+    return Handler
+
+class _StubServer(ThreadingHTTPServer):
+    # backlog bawaan socketserver cuma 5: burst koneksi baru (klien async) meluap dan
+    # kena retransmit SYN ~1 dtk, yang lalu terbaca sebagai latensi fetcher di benchmark
+    request_queue_size = 1024
+
+def serve(chain: StubChain, host: str = "127.0.0.1", port: int = 0, faults: Faults | None = None,
+          chains: dict | None = None):
+    """Jalankan server di thread background; return (server, url)."""
+    srv = _StubServer((host, port), _make_handler(chain, faults, chains))
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://{host}:{srv.server_address[1]}"
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Stub JSON-RPC lokal untuk GasVision")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8545)
+    ap.add_argument("--blocks", type=int, default=20)
+    ap.add_argument("--txs-per-block", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="peluang HTTP 503 per request")
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0, help="peluang rate limit per request")
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=1, help="seed acak gangguan")
+    args = ap.parse_args()
+
+    chain = StubChain(blocks=args.blocks, txs_per_block=args.txs_per_block)
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, seed=args.seed)
+    srv = _StubServer((args.host, args.port), _make_handler(chain, faults))
+    print(f"Stub JSON-RPC di http://{args.host}:{args.port} — {len(chain.txs)} tx")
+    print(f"  GV_ETHERSCAN_BASE=http://{args.host}:{args.port} "
+          f"GV_4BYTE_URL=http://{args.host}:{args.port}/api/v1/signatures/ "
+          f"GV_COINGECKO_URL=http://{args.host}:{args.port}/api/v3/simple/price")
+    for h in chain.tx_hashes[:5]:
+        print(" ", h, flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Gangguan disuntikkan: {faults.injected}", flush=True)
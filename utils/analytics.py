@@ -0,0 +1,225 @@
+import math
+import numpy as np
+import pandas as pd
+
+from utils.wei import WEI_PER_GWEI, fees_frame, parts_to_eth, parts_to_wei, split_wei
+
+# =========================
+# Analitik fee multi-hash
+# =========================
+# Dua mode, keluaran sama bentuknya:
+# - `summarize(frame)`   : sekali jalan, vectorized (groupby) di atas fees_frame()
+# - `FeeAggregator`      : inkremental; tiap baris/batch baru hanya memperbarui
+#                          akumulator grupnya, tanpa hitung ulang seluruh frame.
+# Semua jumlah fee eksak (integer wei, lihat utils.wei). Persentil gas price
+# di mode inkremental diambil dari histogram log (error relatif ≤ ~3%).
+
+GROUP_KEYS = ["network", "contract", "function", "status"]
+QUANTILES = (0.1, 0.5, 0.9)
+GASLESS_MAX_WEI = WEI_PER_GWEI // 1000   # aturan "Gasless?": < 0.001 Gwei
+
+# histogram gas price: 40 bin per dekade, 1e-6 .. 1e6 Gwei; bin 0 = di bawahnya (termasuk 0)
+_BINS_PER_DECADE = 40
+_LOG_MIN, _LOG_MAX = -6, 6
+N_BINS = (_LOG_MAX - _LOG_MIN) * _BINS_PER_DECADE + 1
+
+def _price_bins(price_wei) -> np.ndarray:
+    gwei = np.asarray(price_wei, dtype=np.float64) / 1e9
+    with np.errstate(divide="ignore"):
+        pos = (np.log10(gwei) - _LOG_MIN) * _BINS_PER_DECADE
+    return np.where(gwei > 0, np.clip(np.floor(pos) + 1, 0, N_BINS - 1), 0).astype(np.int64)
+
+def _bin_value(b: int) -> float:
+    """Nilai tengah (geometris) bin dalam Gwei."""
+    if b <= 0:
+        return 0.0
+    return 10 ** (_LOG_MIN + (b - 0.5) / _BINS_PER_DECADE)
+
+def _hist_quantile(hist: np.ndarray, q: float) -> float:
+    total = hist.sum()
+    if total == 0:
+        return float("nan")
+    b = int(np.searchsorted(np.cumsum(hist), q * total, side="left"))
+    return _bin_value(min(b, N_BINS - 1))
+
+def _qname(q: float) -> str:
+    return f"gas_price_gwei_p{round(q * 100)}"
+
+def _finish_groups(keys: pd.DataFrame, n, gas_used, fee_gwei, fee_rem, p_gwei, p_rem, gasless) -> pd.DataFrame:
+    fee_eth = parts_to_eth(fee_gwei, fee_rem)
+    n = np.asarray(n, dtype=np.int64)
+    out = keys.reset_index(drop=True).copy()
+    out["tx"] = n
+    out["gas_used_sum"] = np.asarray(gas_used, dtype=np.int64)
+    out["fee_wei_sum"] = parts_to_wei(fee_gwei, fee_rem)
+    out["fee_eth_sum"] = fee_eth
+    out["fee_eth_mean"] = fee_eth / n
+    out["gas_price_gwei_mean"] = parts_to_eth(p_gwei, p_rem) * 1e9 / n
+    out["gasless_ratio"] = np.asarray(gasless, dtype=np.int64) / n
+    return out
+
+def _hourly(frame: pd.DataFrame) -> pd.DataFrame:
+    """Biaya per jam blok (UTC) per network."""
+    work = pd.DataFrame({
+        "network": frame["network"], "hour": frame["ts"].to_numpy() // 3600 * 3600,
+        "tx": 1, "fee_gwei": frame["fee_gwei"], "fee_rem": frame["fee_rem"],
+    })
+    work = work[frame["ts"].to_numpy() > 0]  # tanpa waktu blok → tidak masuk per jam
+    g = work.groupby(["network", "hour"], observed=True, sort=True).sum().reset_index()
+    return _finish_hourly(g["network"], g["hour"], g["tx"], g["fee_gwei"], g["fee_rem"])
+
+def _finish_hourly(network, hour, tx, fee_gwei, fee_rem) -> pd.DataFrame:
+    fee_eth = parts_to_eth(fee_gwei, fee_rem)
+    return pd.DataFrame({
+        "network": np.asarray(network, dtype=object),
+        "hour": pd.to_datetime(np.asarray(hour, dtype=np.int64), unit="s", utc=True),
+        "tx": np.asarray(tx, dtype=np.int64),
+        "fee_eth_sum": fee_eth,
+        "fee_eth_per_tx": fee_eth / np.asarray(tx, dtype=np.int64),
+    })
+
+def summarize(frame: pd.DataFrame, by=GROUP_KEYS, quantiles=QUANTILES) -> dict:
+    """
+    Ringkasan batch dari `fees_frame()`: {"groups": DataFrame per grup, "hourly": per jam blok}.
+    Persentil di sini eksak (groupby quantile).
+    """
+    by = list(by)
+    p_gwei, p_rem = split_wei(frame["gas_price_wei"].to_numpy())
+    price = frame["gas_price_wei"].to_numpy()
+    work = frame[by].assign(
+        _n=1, gas_used=frame["gas_used"], fee_gwei=frame["fee_gwei"], fee_rem=frame["fee_rem"],
+        _p_gwei=p_gwei, _p_rem=p_rem, _gasless=(price < GASLESS_MAX_WEI).astype(np.int64),
+    )
+    grouped = work.groupby(by, observed=True, sort=True)
+    g = grouped.sum()
+    out = _finish_groups(g.index.to_frame(index=False), g["_n"], g["gas_used"], g["fee_gwei"], g["fee_rem"],
+                         g["_p_gwei"], g["_p_rem"], g["_gasless"])
+    if quantiles and len(frame):
+        gwei = pd.Series(price / 1e9, index=frame.index)
+        qs = gwei.groupby([frame[k] for k in by], observed=True, sort=True).quantile(list(quantiles)).unstack()
+        for q in quantiles:
+            out[_qname(q)] = qs[q].to_numpy()
+    return {"groups": out, "hourly": _hourly(frame) if "ts" in frame else pd.DataFrame()}
+
+def summarize_payloads(payloads, **kwargs) -> dict:
+    return summarize(fees_frame(payloads), **kwargs)
+
+class FeeAggregator:
+    """
+    Agregat fee yang diperbarui inkremental: `add(payload)` per baris yang baru
+    datang, atau `add_many(payloads)` per batch (vectorized). `snapshot()`
+    menghasilkan bentuk yang sama dengan `summarize()`.
+    """
+
+    # kolom akumulator per grup
+    _COLS = ("n", "gas_used", "fee_gwei", "fee_rem", "p_gwei", "p_rem", "gasless")
+
+    def __init__(self, quantiles=QUANTILES):
+        self.quantiles = tuple(quantiles)
+        self._acc: dict = {}     # key grup -> np.int64[len(_COLS)]
+        self._hist: dict = {}    # key grup -> np.int64[N_BINS]
+        self._hours: dict = {}   # (network, jam) -> np.int64[3] (tx, fee_gwei, fee_rem)
+        self.rows = 0
+
+    def _slot(self, key):
+        acc = self._acc.get(key)
+        if acc is None:
+            acc = self._acc[key] = np.zeros(len(self._COLS), dtype=np.int64)
+            self._hist[key] = np.zeros(N_BINS, dtype=np.int64)
+        return acc, self._hist[key]
+
+    @staticmethod
+    def _normalize_rem(arr, i):
+        """Jaga sisa sub-Gwei < 1e9 (carry ke bagian Gwei) supaya tidak pernah overflow."""
+        if arr[i + 1] >= WEI_PER_GWEI:
+            arr[i] += arr[i + 1] // WEI_PER_GWEI
+            arr[i + 1] %= WEI_PER_GWEI
+
+    def add(self, raw: dict):
+        """Satu payload fetcher (jalur cepat tanpa pandas)."""
+        gas_used = int(raw.get("gas_used") or 0)
+        price = int(raw.get("gas_price_wei") or 0)
+        fee = gas_used * price
+        key = (raw.get("network") or "", raw.get("contract") or "",
+               raw.get("function_name") or "", raw.get("status") or "Unknown")
+        acc, hist = self._slot(key)
+        acc += (1, gas_used, fee // WEI_PER_GWEI, fee % WEI_PER_GWEI,
+                price // WEI_PER_GWEI, price % WEI_PER_GWEI, price < GASLESS_MAX_WEI)
+        self._normalize_rem(acc, 2)
+        self._normalize_rem(acc, 4)
+        hist[_price_bins([price])[0]] += 1
+
+        ts = raw.get("timestamp_unix")
+        if ts:
+            h = self._hours.setdefault((key[0], int(ts) // 3600 * 3600), np.zeros(3, dtype=np.int64))
+            h += (1, fee // WEI_PER_GWEI, fee % WEI_PER_GWEI)
+            self._normalize_rem(h, 1)
+        self.rows += 1
+
+    def add_many(self, payloads):
+        """Batch payload: diringkas per grup dulu (vectorized), lalu digabung ke akumulator."""
+        self.add_frame(fees_frame(payloads))
+
+    def add_frame(self, frame: pd.DataFrame):
+        if not len(frame):
+            return
+        price = frame["gas_price_wei"].to_numpy()
+        p_gwei, p_rem = split_wei(price)
+        grouper = frame.groupby(GROUP_KEYS, observed=True, sort=False)
+        codes = grouper.ngroup().to_numpy()
+        n_groups = int(codes.max()) + 1
+
+        vals = np.stack([
+            np.ones(len(frame), dtype=np.int64), frame["gas_used"].to_numpy(np.int64),
+            frame["fee_gwei"].to_numpy(np.int64), frame["fee_rem"].to_numpy(np.int64),
+            p_gwei, p_rem, (price < GASLESS_MAX_WEI).astype(np.int64),
+        ], axis=1)
+        sums = np.zeros((n_groups, len(self._COLS)), dtype=np.int64)
+        np.add.at(sums, codes, vals)
+        hists = np.zeros((n_groups, N_BINS), dtype=np.int64)
+        np.add.at(hists, (codes, _price_bins(price)), 1)
+
+        keys = frame[GROUP_KEYS].astype(object).to_numpy()
+        first = np.unique(codes, return_index=True)[1]
+        for code, row in enumerate(first):
+            acc, hist = self._slot(tuple(keys[row]))
+            acc += sums[code]
+            self._normalize_rem(acc, 2)
+            self._normalize_rem(acc, 4)
+            hist += hists[code]
+
+        if "ts" in frame:
+            hourly = pd.DataFrame({
+                "network": frame["network"].astype(object), "hour": frame["ts"].to_numpy() // 3600 * 3600,
+                "tx": 1, "fee_gwei": frame["fee_gwei"], "fee_rem": frame["fee_rem"],
+            })
+            hourly = hourly[frame["ts"].to_numpy() > 0]
+            for (net, hour), r in hourly.groupby(["network", "hour"], sort=False).sum().iterrows():
+                h = self._hours.setdefault((net, int(hour)), np.zeros(3, dtype=np.int64))
+                h += (r["tx"], r["fee_gwei"], r["fee_rem"])
+                self._normalize_rem(h, 1)
+        self.rows += len(frame)
+
+    def snapshot(self) -> dict:
+        """{"groups", "hourly"} — bentuk sama dengan `summarize()`; biaya O(jumlah grup)."""
+        if not self._acc:
+            return {"groups": pd.DataFrame(columns=GROUP_KEYS), "hourly": pd.DataFrame()}
+        keys = sorted(self._acc)
+        acc = np.stack([self._acc[k] for k in keys])
+        out = _finish_groups(pd.DataFrame(keys, columns=GROUP_KEYS), *acc.T)
+        for q in self.quantiles:
+            out[_qname(q)] = [_hist_quantile(self._hist[k], q) for k in keys]
+
+        hours = sorted(self._hours)
+        h = np.stack([self._hours[k] for k in hours]) if hours else np.zeros((0, 3), dtype=np.int64)
+        hourly = _finish_hourly([k[0] for k in hours], [k[1] for k in hours], h[:, 0], h[:, 1], h[:, 2])
+        return {"groups": out, "hourly": hourly}
+
+    def totals(self) -> dict:
+        """Total keseluruhan (eksak) tanpa membangun DataFrame."""
+        if not self._acc:
+            return {"tx": 0, "fee_wei": 0, "fee_eth": 0.0, "gasless_ratio": math.nan}
+        acc = np.sum(np.stack(list(self._acc.values())).astype(object), axis=0)
+        fee_wei = int(acc[2]) * WEI_PER_GWEI + int(acc[3])
+        return {"tx": int(acc[0]), "fee_wei": fee_wei, "fee_eth": fee_wei / 10**18,
+                "gasless_ratio": int(acc[6]) / int(acc[0])}
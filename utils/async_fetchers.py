@@ -0,0 +1,283 @@
+import asyncio
+import json
+import time
+
+import utils.fetchers as F
+from utils.fetchers import (
+    BLOCK_HEADERS, CHAINIDS, MISSES, SIG_FLIGHT, SIG_NAMES, TX_FLIGHT, RateLimited, _build_payload,
+    _etherscan_parse, _hex_to_int, _is_retryable, _pick_signature, _receipt_or_pending, _reprice,
+    _take_result_or_fail, _trim_header,
+    _tx_or_miss, count_error, count_retry,
+    fetch_eth_idr_rate, get_rate_limiter, to_standard_row,
+)
+from utils.http import async_client
+from utils.metrics import record_http
+from utils.sigindex import get_sig_index
+from utils.txcache import get_tx_cache
+
+# =========================
+# Fetcher async (httpx) — padanan fetch_tx_raw_any / fetch_many
+# =========================
+# I/O non-blocking: tx & receipt diminta bersamaan, baru block header
+# (butuh blockNumber dari tx). Retry pakai asyncio.sleep, laju per API key
+# tetap lewat token bucket yang sama dengan versi sinkron (acquire_async).
+# Cache tx/header/signature sama dengan versi sinkron (SQLite lokal); akses
+# SQLite & fetch kurs blocking, jadi dijalankan lewat asyncio.to_thread supaya
+# event loop tetap melayani request lain. Single-flight tx (TX_FLIGHT), LRU
+# nama fungsi (SIG_NAMES) dan single-flight 4byte (SIG_FLIGHT) dibagi dengan
+# jalur sinkron, jadi sesi sync & async yang menanyakan hal sama tetap satu
+# call upstream.
+
+_CHAIN_NAMES = {v: k for k, v in CHAINIDS.items()}  # label chain di metrik
+
+async def _off_loop(fn, *args):
+    """`fn(*args)` yang menyentuh cache SQLite: di thread kalau cache disk aktif, inline kalau tidak."""
+    if get_tx_cache() is None:
+        return fn(*args)  # hanya dict memori; hop thread justru lebih mahal
+    return await asyncio.to_thread(fn, *args)
+
+async def _timed_get(client, provider: str, url: str, **kwargs):
+    """GET httpx + catat ke utils.metrics (padanan utils.http._timed)."""
+    t = time.perf_counter()
+    try:
+        r = await client.get(url, **kwargs)
+    except Exception as e:
+        record_http(provider, time.perf_counter() - t, type(e).__name__)
+        raise
+    record_http(provider, time.perf_counter() - t, r.status_code)
+    return r
+
+async def _etherscan_get_v2(client, params: dict, timeout: float = 10):
+    r = await _timed_get(client, "etherscan", F.BASE_V2.rstrip("/") + "/v2/api", params=params, timeout=timeout)
+    return _etherscan_parse(r)
+
+async def _call_proxy(client, chainid: int, api_key: str, action: str, params: dict):
+    """Proxy Etherscan v2 dengan token bucket + retry/backoff async."""
+    chain = _CHAIN_NAMES.get(chainid, str(chainid))
+    limiter = get_rate_limiter("etherscan", api_key)
+    backoff = 0.35
+    last_err = None
+    for _ in range(3):
+        try:
+            await limiter.acquire_async()
+            resp = await _etherscan_get_v2(client, {
+                "module": "proxy", "action": action, "chainid": chainid, "apikey": api_key, **params,
+            })
+            if isinstance(resp, str):
+                try:
+                    resp = json.loads(resp)
+                except Exception:
+                    raise RuntimeError(f"Unexpected string from Etherscan: {resp[:200]}")
+            limiter.reward()
+            return resp
+        except RateLimited as e:
+            last_err = e
+            limiter.penalize(e.retry_after)
+            count_retry("etherscan", chain, e)
+        except Exception as e:
+            if not _is_retryable(e):
+                count_error("etherscan", chain, e)
+                raise
+            last_err = e
+            count_retry("etherscan", chain, e)
+            await asyncio.sleep(backoff)
+            backoff *= 1.7
+    count_error("etherscan", chain, last_err)
+    raise last_err
+
+# --- 4byte ---
+
+async def _fetch_4byte_signature(client, method_id: str, timeout: float) -> str:
+    """Padanan async `utils.fetchers._fetch_4byte_signature` (httpx); '' kalau gagal / tidak ketemu."""
+    try:
+        await get_rate_limiter("4byte").acquire_async()
+        r = await _timed_get(client, "4byte", F.FOURBYTE_URL, params={"hex_signature": method_id},
+                             timeout=timeout)
+        if r.status_code == 200:
+            return _pick_signature(r.json())
+    except Exception as e:
+        count_error("4byte", "", e)
+    return ""
+
+async def lookup_4byte(client, method_id: str, timeout: float = 6) -> str:
+    """Nama fungsi untuk selector: LRU bersama → index lokal → 4byte.directory (httpx); fallback method_id."""
+    if not method_id:
+        return ""
+    name = SIG_NAMES.get(method_id)  # hit: tanpa I/O, tanpa hop thread
+    if name is not None:
+        return name
+    idx = get_sig_index()
+    sig = await asyncio.to_thread(idx.get, method_id) if idx is not None else None
+    if sig is None:
+        # selector sama yang sedang ditanyakan thread/sesi lain (sync maupun async) → tunggu hasilnya
+        sig = await SIG_FLIGHT.do_async(method_id.lower(),
+                                        lambda: _fetch_4byte_signature(client, method_id, timeout))
+        if sig and idx is not None:
+            await asyncio.to_thread(idx.put_many, [(method_id, sig)])
+    name = sig.split("(")[0] if sig else method_id
+    SIG_NAMES.put(method_id, name)
+    return name
+
+# --- Header block: dedupe request yang sedang jalan di event loop yang sama ---
+
+class _HeaderFlights:
+    def __init__(self):
+        self._tasks: dict = {}
+
+    async def get(self, client, chainid: int, api_key: str, number: int) -> dict:
+        h = (await _off_loop(BLOCK_HEADERS.get_many, chainid, [number])).get(number)
+        if h is not None:
+            return h
+        key = (chainid, number)
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(self._fetch(client, chainid, api_key, number))
+            task.add_done_callback(lambda _t: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _fetch(client, chainid, api_key, number):
+        resp = await _call_proxy(client, chainid, api_key, "eth_getBlockByNumber",
+                                 {"tag": hex(number), "boolean": "false"})
+        header = _trim_header(_take_result_or_fail(resp, "block"))
+        await _off_loop(BLOCK_HEADERS.put_many, chainid, {number: header})
+        return header
+
+# --- Fetcher utama ---
+
+def _cached_or_check(cache, chainid: int, network_key: str, tx_hash: str) -> dict | None:
+    """Bagian blocking sebelum upstream: payload dari cache, atau raise status negatif (MISSES)."""
+    if cache is not None:
+        cached = cache.get(chainid, tx_hash)
+        if cached is not None:
+            return cached
+    MISSES.check(chainid, network_key, tx_hash)
+    return None
+
+async def fetch_tx_raw_any(
+    tx_hash: str,
+    api_key: str,
+    network: str = "sepolia",
+    eth_idr_rate: float | None = None,
+    client=None,
+    use_cache: bool = True,
+    price_index=None,
+    _headers: _HeaderFlights | None = None,
+) -> dict:
+    """Versi async `utils.fetchers.fetch_tx_raw_any`; payload identik."""
+    network_key = (network or "sepolia").lower().strip()
+    if network_key not in CHAINIDS:
+        raise ValueError(f"Network belum didukung: {network}")
+    chainid = CHAINIDS[network_key]
+
+    cache = get_tx_cache() if use_cache else None
+    if use_cache:
+        cached = await _off_loop(_cached_or_check, cache, chainid, network_key, tx_hash)
+        if cached is not None:
+            return _reprice(cached, tx_hash, eth_idr_rate, price_index)
+
+    if not api_key:
+        raise RuntimeError("ETHERSCAN_API_KEY belum diset di secrets/env")
+    if client is None:
+        async with async_client() as c:
+            return await fetch_tx_raw_any(tx_hash, api_key, network, eth_idr_rate, c, use_cache, price_index,
+                                          _headers=_headers)
+    if eth_idr_rate is None and price_index is None:
+        eth_idr_rate = await asyncio.to_thread(fetch_eth_idr_rate)
+
+    # single-flight bersama jalur sinkron; penumpang dapat salinan dengan kurs miliknya sendiri
+    payload = await TX_FLIGHT.do_async(
+        (chainid, tx_hash.strip().lower()),
+        lambda: _fetch_tx_upstream(client, tx_hash, api_key, network_key, chainid, eth_idr_rate,
+                                   price_index, cache, _headers),
+    )
+    return _reprice(payload, tx_hash, eth_idr_rate, price_index)
+
+async def _fetch_tx_upstream(client, tx_hash, api_key, network_key, chainid, eth_idr_rate, price_index,
+                             cache, _headers) -> dict:
+    """tx + receipt + header dari Etherscan (dipanggil lewat TX_FLIGHT)."""
+    # tx & receipt tidak saling bergantung → bersamaan
+    h = tx_hash.strip()
+    tx_resp, rcpt_resp = await asyncio.gather(
+        _call_proxy(client, chainid, api_key, "eth_getTransactionByHash", {"txhash": h}),
+        _call_proxy(client, chainid, api_key, "eth_getTransactionReceipt", {"txhash": h}),
+    )
+    tx = _tx_or_miss(tx_resp, chainid, network_key, tx_hash)
+    rcpt = _receipt_or_pending(rcpt_resp, chainid, network_key, tx_hash)
+
+    # header block (timestamp) + nama fungsi, juga bersamaan
+    headers = _headers or _HeaderFlights()
+    input_data = (tx.get("input") or "0x").strip()
+    blk, fn = await asyncio.gather(
+        headers.get(client, chainid, api_key, _hex_to_int(tx.get("blockNumber"), 0)),
+        lookup_4byte(client, input_data[:10]) if input_data.lower() != "0x" else asyncio.sleep(0, None),
+    )
+
+    payload = _build_payload(tx, rcpt, blk, network_key, tx_hash, eth_idr_rate, price_index,
+                             function_name=fn or None)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, chainid, tx_hash, payload)
+    return payload
+
+async def fetch_many(
+    jobs,
+    api_key: str,
+    eth_idr_rate: float | None = None,
+    concurrency: int = 64,
+    per_chain_concurrency: int | None = None,
+    price_index=None,
+    client=None,
+    fetch_fn=None,
+) -> list:
+    """
+    Ambil banyak (network, tx_hash) sekaligus dengan asyncio.gather di bawah semaphore.
+    Return list (network, tx_hash, payload, error) sesuai urutan input.
+    Laju request sebenarnya tetap dijaga token bucket per API key.
+    `fetch_fn(network, tx_hash, client)`: override coroutine fetcher (mis. untuk mengukur latensi).
+    """
+    jobs = list(jobs)
+    if eth_idr_rate is None and price_index is None:
+        # sekali per batch di thread, bukan per tx di event loop
+        eth_idr_rate = await asyncio.to_thread(fetch_eth_idr_rate)
+    sem = asyncio.Semaphore(concurrency)
+    chain_sems = {}
+    headers = _HeaderFlights()
+
+    if fetch_fn is None:
+        async def fetch_fn(net, h, c):
+            return await fetch_tx_raw_any(h, api_key, net, eth_idr_rate, c,
+                                          price_index=price_index, _headers=headers)
+
+    async def one(c, net, h):
+        chain_sem = None
+        if per_chain_concurrency:
+            chain_sem = chain_sems.setdefault(net, asyncio.Semaphore(per_chain_concurrency))
+        async with sem:
+            try:
+                if chain_sem is not None:
+                    async with chain_sem:
+                        raw = await fetch_fn(net, h, c)
+                else:
+                    raw = await fetch_fn(net, h, c)
+                return net, h, raw, None
+            except Exception as e:
+                return net, h, None, e
+
+    if client is not None:
+        return list(await asyncio.gather(*(one(client, n, h) for n, h in jobs)))
+    async with async_client() as c:
+        return list(await asyncio.gather(*(one(c, n, h) for n, h in jobs)))
+
+async def fetch_rows(jobs, api_key: str, **kwargs) -> tuple[list, list]:
+    """Bulk → (baris standar STC via to_standard_row, daftar gagal) sesuai urutan input."""
+    rows, fails = [], []
+    for net, h, raw, err in await fetch_many(jobs, api_key, **kwargs):
+        if err is not None:
+            fails.append({"Network": net, "Tx Hash": h, "Error": str(err)})
+        else:
+            rows.append(to_standard_row(raw, kwargs.get("price_index")))
+    return rows, fails
+
+def run_many(jobs, api_key: str, **kwargs) -> list:
+    """Pemanggil sinkron (CLI/skrip): jalankan `fetch_many` di event loop baru."""
+    return asyncio.run(fetch_many(jobs, api_key, **kwargs))
@@ -0,0 +1,229 @@
+import os
+import sys
+import uuid
+import threading
+from io import BytesIO
+from datetime import datetime, timezone
+
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Dataset lokal: Parquet terpartisi (network / tanggal)
+# =========================
+# Baris hasil fetch disimpan kolumnar dan bertipe: wei sebagai integer
+# (fee_wei = decimal128 presisi penuh), bukan float ETH. Layout hive:
+#   <root>/network=sepolia/date=2024-05-01/part-<uuid>.parquet
+# Append = tulis file baru di partisi terkait (tanpa rewrite). Baca dengan
+# filter network/tanggal hanya membuka partisi yang relevan.
+# pyarrow di-import saat dipakai saja.
+
+DATASET_DIR = os.getenv("GV_DATASET_DIR") or os.path.join(CACHE_DIR, "dataset")
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("timestamp", pa.timestamp("s", tz="UTC")),
+        ("tx_hash", pa.string()),
+        ("contract", pa.string()),
+        ("function", pa.string()),
+        ("block", pa.int64()),
+        ("gas_used", pa.int64()),
+        ("gas_price_wei", pa.int64()),
+        ("fee_wei", pa.decimal128(38, 0)),
+        ("fee_idr", pa.float64()),
+        ("status", pa.string()),
+        ("from_addr", pa.string()),
+        ("to_addr", pa.string()),
+        ("network", pa.string()),
+        ("date", pa.string()),
+    ])
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([("network", pa.string()), ("date", pa.string())]), flavor="hive")
+
+def _int(x) -> int:
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        try:
+            return int(float(x))
+        except (TypeError, ValueError):
+            return 0
+
+def _ts_of(raw: dict) -> int:
+    """Unix detik dari payload fetcher (timestamp_unix, fallback string UTC)."""
+    ts = raw.get("timestamp_unix")
+    if ts:
+        return int(ts)
+    try:
+        return int(datetime.strptime(raw.get("timestamp", ""), "%Y-%m-%d %H:%M:%S")
+                   .replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):  # timestamp None / format lain
+        return 0
+
+def payloads_to_table(payloads):
+    """Payload fetcher (`_build_payload`) → pyarrow.Table bertipe sesuai skema dataset."""
+    import pyarrow as pa
+
+    cols = {f.name: [] for f in _schema()}
+    for raw in payloads:
+        ts = _ts_of(raw)
+        gas_used = _int(raw.get("gas_used"))
+        price_wei = _int(raw.get("gas_price_wei"))
+        if not price_wei and raw.get("gas_price_gwei"):
+            price_wei = round(float(raw["gas_price_gwei"]) * 10**9)
+        cols["timestamp"].append(ts)
+        cols["tx_hash"].append((raw.get("tx_hash") or "").lower())
+        cols["contract"].append(raw.get("contract") or "")
+        cols["function"].append(raw.get("function_name") or "")
+        cols["block"].append(_int(raw.get("block_number")))
+        cols["gas_used"].append(gas_used)
+        cols["gas_price_wei"].append(price_wei)
+        cols["fee_wei"].append(gas_used * price_wei)
+        cols["fee_idr"].append(float(raw.get("cost_idr") or 0.0))
+        cols["status"].append(raw.get("status") or "Unknown")
+        cols["from_addr"].append(raw.get("from_addr") or "")
+        cols["to_addr"].append(raw.get("to_addr") or "")
+        cols["network"].append((raw.get("network") or "").lower())
+        cols["date"].append(datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d"))
+    return pa.Table.from_pydict(cols, schema=_schema())
+
+def _day(x) -> str | None:
+    if x is None:
+        return None
+    if isinstance(x, str):
+        return x[:10]
+    return x.strftime("%Y-%m-%d")
+
+def _as_utc(x):
+    import pandas as pd
+    t = pd.Timestamp(x)
+    return (t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")).to_pydatetime()
+
+class DatasetStore:
+    """Store Parquet append-only terpartisi network/tanggal dengan baca terfilter."""
+
+    def __init__(self, root: str = DATASET_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, payloads) -> int:
+        """Tambah payload fetcher; return jumlah baris tertulis."""
+        table = payloads_to_table(payloads)
+        return self.append_table(table)
+
+    def append_table(self, table) -> int:
+        import pyarrow.dataset as ds
+
+        if table.num_rows == 0:
+            return 0
+        with self._lock:
+            ds.write_dataset(
+                table, self.root, format="parquet", partitioning=_partitioning(),
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+            )
+        return table.num_rows
+
+    def _dataset(self):
+        import pyarrow.dataset as ds
+        return ds.dataset(self.root, format="parquet", partitioning=_partitioning(), schema=_schema())
+
+    def _filter(self, networks=None, start=None, end=None, where=None):
+        """Ekspresi filter; network & tanggal kena partisi (pruning), sisanya per baris."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        expr = None
+
+        def add(e):
+            nonlocal expr
+            expr = e if expr is None else expr & e
+
+        if networks:
+            add(ds.field("network").isin([n.lower() for n in networks]))
+        if start is not None:
+            add(ds.field("date") >= _day(start))
+            if not isinstance(start, str) or len(start) > 10:
+                add(ds.field("timestamp") >= pa.scalar(_as_utc(start), pa.timestamp("s", tz="UTC")))
+        if end is not None:
+            add(ds.field("date") <= _day(end))
+            if not isinstance(end, str) or len(end) > 10:
+                add(ds.field("timestamp") <= pa.scalar(_as_utc(end), pa.timestamp("s", tz="UTC")))
+        if where is not None:
+            add(where)
+        return expr
+
+    def read_table(self, networks=None, start=None, end=None, columns=None, where=None):
+        """
+        Baca sebagai pyarrow.Table. `start`/`end`: 'YYYY-MM-DD' (inklusif per hari)
+        atau datetime; `where`: ekspresi pyarrow.dataset tambahan.
+        """
+        import pyarrow as pa
+
+        if not any(e.is_dir() for e in os.scandir(self.root)):
+            return _schema().empty_table() if columns is None else \
+                pa.schema([_schema().field(c) for c in columns]).empty_table()
+        return self._dataset().to_table(columns=columns, filter=self._filter(networks, start, end, where))
+
+    def read_frame(self, networks=None, start=None, end=None, columns=None, where=None, dedupe: bool = True):
+        """Seperti `read_table`, hasil pandas DataFrame; `dedupe` buang tx ganda (append ulang)."""
+        df = self.read_table(networks, start, end, columns, where).to_pandas()
+        if dedupe and {"network", "tx_hash"} <= set(df.columns):
+            df = df.drop_duplicates(["network", "tx_hash"], keep="last").reset_index(drop=True)
+        return df
+
+    def compact(self, networks=None) -> int:
+        """Gabung file kecil per partisi jadi satu (sekaligus dedupe); return jumlah partisi."""
+        import pyarrow.parquet as pq
+
+        n = 0
+        with self._lock:
+            for net_dir in sorted(os.scandir(self.root), key=lambda e: e.name):
+                if not net_dir.is_dir() or not net_dir.name.startswith("network="):
+                    continue
+                if networks and net_dir.name.split("=", 1)[1] not in {x.lower() for x in networks}:
+                    continue
+                for day_dir in os.scandir(net_dir.path):
+                    files = sorted(f.path for f in os.scandir(day_dir.path) if f.name.endswith(".parquet"))
+                    if len(files) < 2:
+                        continue
+                    df = pq.ParquetDataset(files).read().to_pandas()
+                    df = df.drop_duplicates("tx_hash", keep="last")
+                    tmp = os.path.join(day_dir.path, f"part-{uuid.uuid4().hex}-0.parquet")
+                    df.to_parquet(tmp + ".tmp", index=False, compression="zstd")
+                    os.replace(tmp + ".tmp", tmp)
+                    for f in files:
+                        os.remove(f)
+                    n += 1
+        return n
+
+def to_parquet_bytes(df) -> bytes:
+    """DataFrame → bytes Parquet (zstd) untuk st.download_button."""
+    buf = BytesIO()
+    df.to_parquet(buf, index=False, compression="zstd")
+    return buf.getvalue()
+
+_default: DatasetStore | None = None
+_default_lock = threading.Lock()
+
+def get_dataset_store() -> DatasetStore:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = DatasetStore()
+    return _default
+
+if __name__ == "__main__":
+    # python -m utils.dataset [network ...]  → ringkasan isi dataset lokal
+    store = get_dataset_store()
+    df = store.read_frame(sys.argv[1:] or None, columns=["network", "date", "tx_hash"])
+    if df.empty:
+        print(f"Dataset kosong: {store.root}")
+    else:
+        print(df.groupby(["network", "date"]).size().rename("rows").to_string())
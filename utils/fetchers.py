@@ -1,15 +1,80 @@
 import os
+import re
+import sys
 import time
 import json
+import asyncio
+import itertools
+import threading
 import requests
+from utils.http import disable_transport_retry, http_get
+from utils.metrics import METRICS
+from utils.txcache import get_tx_cache
+from utils.sigindex import get_sig_index
+from utils.singleflight import SingleFlight
+from utils.wei import payload_fee_wei, wei_to_eth, wei_to_gwei, wei_to_idr
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
-from functools import lru_cache
+# Single-flight per proses (dipakai bersama semua sesi Streamlit, sync & async):
+# lookup identik yang sedang berjalan digabung jadi satu call upstream.
+TX_FLIGHT = SingleFlight()    # key (chainid, tx_hash)
+SIG_FLIGHT = SingleFlight()   # key selector 4-byte
+
+class SigNameCache:
+    """LRU in-memory selector → nama fungsi; dipakai bersama jalur sinkron & async (utils.async_fetchers)."""
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, method_id: str) -> str | None:
+        with self._lock:
+            name = self._data.get(method_id)
+            if name is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(method_id)
+            self.hits += 1
+            return name
+
+    def put(self, method_id: str, name: str):
+        with self._lock:
+            self._data[method_id] = name
+            self._data.move_to_end(method_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+SIG_NAMES = SigNameCache()
 
-@lru_cache(maxsize=8192)
 def _lookup_4byte_cached(method_id: str, timeout=6) -> str:
-    return lookup_4byte(method_id, timeout=timeout)
+    """LRU → index lokal → API 4byte (hasilnya ditulis ke index & LRU)."""
+    name = SIG_NAMES.get(method_id)
+    if name is not None:
+        return name
+    idx = get_sig_index()
+    if idx is None:
+        name = lookup_4byte(method_id, timeout=timeout)
+    else:
+        name = idx.lookup_many([method_id], remote=lambda m: _lookup_4byte_signature(m, timeout=timeout))[method_id]
+    SIG_NAMES.put(method_id, name)
+    return name
+
+def lookup_4byte_many(method_ids, timeout=6) -> dict:
+    """Decode banyak selector sekaligus: {method_id: nama_fungsi}."""
+    idx = get_sig_index()
+    if idx is None:
+        return {m: _lookup_4byte_cached(m, timeout=timeout) for m in dict.fromkeys(method_ids) if m}
+    return idx.lookup_many(method_ids, remote=lambda m: _lookup_4byte_signature(m, timeout=timeout))
 
 # =========================
 # Helpers
@@ -36,31 +101,167 @@ def _hex_to_int(x, default=None):
     except Exception:
         return default
 
+FOURBYTE_URL = os.getenv("GV_4BYTE_URL") or "https://www.4byte.directory/api/v1/signatures/"
+
+HASH_RE = re.compile(r"^0x[a-fA-F0-9]{64}$")
+
+def parse_hashes(s: str) -> list[str]:
+    if not s: return []
+    toks = re.split(r"[\s,;]+", s.strip())
+    seen, out = set(), []
+    for t in toks:
+        if HASH_RE.fullmatch(t) and t not in seen:
+            out.append(t); seen.add(t)
+    return out
+
+def iter_hashes(lines):
+    """Versi streaming parse_hashes untuk file/stdin besar (dedup lintas baris)."""
+    seen = set()
+    for line in lines:
+        for h in parse_hashes(line):
+            if h not in seen:
+                seen.add(h)
+                yield h
+
+def _lookup_4byte_signature(method_id: str, timeout=6) -> str:
+    """Text signature lengkap dari 4byte.directory (mis. 'transfer(address,uint256)'); '' kalau tidak ketemu."""
+    if not method_id:
+        return ""
+    # selector yang sama sedang ditanyakan thread/sesi lain → tunggu hasilnya saja
+    return SIG_FLIGHT.do(method_id.lower(), lambda: _fetch_4byte_signature(method_id, timeout))
+
+def _fetch_4byte_signature(method_id: str, timeout=6) -> str:
+    try:
+        get_rate_limiter("4byte").acquire()
+        r = http_get(FOURBYTE_URL, params={"hex_signature": method_id}, timeout=timeout, provider="4byte")
+        if r.status_code == 200:
+            return _pick_signature(r.json())
+    except Exception as e:
+        # tetap fallback ke method_id, tapi kegagalannya terlihat di metrik
+        count_error("4byte", "", e)
+    return ""
+
+def _pick_signature(data: dict) -> str:
+    """Signature terbaru dari response 4byte.directory."""
+    results = data.get("results", [])
+    if results:
+        results.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        return results[0].get("text_signature", "")
+    return ""
+
 def lookup_4byte(method_id: str, timeout=6) -> str:
     """Coba tebak nama fungsi dari 4byte.directory; fallback ke method_id."""
     if not method_id:
         return ""
+    sig = _lookup_4byte_signature(method_id, timeout=timeout)
+    return (sig.split("(")[0] if sig else method_id)
+
+# =========================
+# Rate limiter (token bucket per provider + API key)
+# =========================
+
+# Limit nyata per provider (request/detik); bisa diubah lewat configure_rate().
+PROVIDER_RATES = {
+    "etherscan": float(os.getenv("GV_RATE_ETHERSCAN", "5")),
+    "4byte": float(os.getenv("GV_RATE_4BYTE", "2")),
+    "coingecko": float(os.getenv("GV_RATE_COINGECKO", "0.5")),
+}
+DEFAULT_RATE = 2.0
+
+class RateLimited(RuntimeError):
+    """Provider menolak karena rate limit (HTTP 429 / 'Max rate limit reached')."""
+
+    def __init__(self, msg: str, retry_after: float | None = None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Token bucket thread-safe (dan bisa di-await dari coroutine).
+
+    Mulai di `rate` (limit provider). Saat provider membalas rate limit,
+    `penalize()` memotong rate setengah + jeda; tiap sukses `reward()`
+    menaikkan rate pelan-pelan kembali ke limit (AIMD).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None, min_rate: float = 0.2):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(min_rate, self.max_rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Ambil token (boleh berhutang); return berapa detik harus menunggu."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self, tokens: float = 1.0):
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: float | None = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def reward(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+_limiters: dict = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, api_key: str | None = None) -> TokenBucket:
+    """Bucket bersama per (provider, api_key) untuk semua thread di proses ini."""
+    key = (provider, api_key or "")
+    lim = _limiters.get(key)
+    if lim is None:
+        with _limiters_lock:
+            lim = _limiters.get(key)
+            if lim is None:
+                lim = _limiters[key] = TokenBucket(PROVIDER_RATES.get(provider, DEFAULT_RATE))
+    return lim
+
+def configure_rate(provider: str, rate: float):
+    """Set limit provider (mis. plan Etherscan berbayar); bucket yang ada ikut diperbarui."""
+    PROVIDER_RATES[provider] = float(rate)
+    with _limiters_lock:
+        for (p, _), lim in _limiters.items():
+            if p == provider:
+                lim.max_rate = lim.rate = float(rate)
+                lim.capacity = max(1.0, float(rate))
+
+def _retry_after(r) -> float | None:
     try:
-        r = requests.get(
-            "https://www.4byte.directory/api/v1/signatures/",
-            params={"hex_signature": method_id},
-            timeout=timeout,
-        )
-        if r.status_code == 200:
-            results = r.json().get("results", [])
-            if results:
-                results.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-                sig = results[0].get("text_signature", "")
-                return (sig.split("(")[0] if sig else method_id)
-    except Exception:
-        pass
-    return method_id
+        return float(r.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
 
 # =========================
 # Etherscan v2 (wajib chainid)
 # =========================
 
-BASE_V2 = "https://api.etherscan.io"  # v2 host tunggal
+BASE_V2 = os.getenv("GV_ETHERSCAN_BASE") or "https://api.etherscan.io"  # v2 host tunggal
+# retry Etherscan hanya di call_etherscan (lewat token bucket per API key), bukan juga di urllib3
+disable_transport_retry(BASE_V2.rstrip("/") + "/")
 
 CHAINIDS = {
     "mainnet": 1,
@@ -76,7 +277,12 @@ CHAINIDS = {
 def _etherscan_get_v2(params: dict, timeout: int = 10):
     """GET ke Etherscan v2, selalu return dict JSON atau raise error jelas."""
     url = BASE_V2.rstrip("/") + "/v2/api"
-    r = requests.get(url, params=params, timeout=timeout)
+    return _etherscan_parse(http_get(url, params=params, timeout=timeout, provider="etherscan"))
+
+def _etherscan_parse(r):
+    """Validasi response Etherscan (requests atau httpx — API-nya sama untuk yang dipakai di sini)."""
+    if r.status_code == 429:
+        raise RateLimited("Etherscan HTTP 429", retry_after=_retry_after(r))
     r.raise_for_status()
     try:
         data = r.json()
@@ -84,11 +290,43 @@ def _etherscan_get_v2(params: dict, timeout: int = 10):
         txt = r.text[:200]
         raise RuntimeError(f"Etherscan non-JSON response: {txt}")
 
+    # rate limit dibalas HTTP 200 + result "Max rate limit reached ..."
+    res = data.get("result") if isinstance(data, dict) else None
+    if isinstance(res, str) and "rate limit" in res.lower():
+        raise RateLimited(f"Etherscan: {res}")
+
     # v2 kadang tidak pakai status/message untuk proxy; tetap kembalikan data mentah
     if isinstance(data, dict) and data.get("status") == "0" and data.get("message") != "OK":
         raise RuntimeError(f"Etherscan error: {data.get('message')} | {data.get('result')}")
     return data
 
+def count_retry(provider: str, chain: str, e: Exception):
+    """Catat satu retry di level fetcher (alasan: rate_limit atau kelas error)."""
+    reason = "rate_limit" if isinstance(e, RateLimited) else type(e).__name__
+    METRICS.inc("gv_fetch_retries_total", provider=provider, chain=chain, reason=reason)
+
+def count_error(provider: str, chain: str, e: Exception):
+    """Catat call yang akhirnya gagal (setelah retry habis / error non-retryable)."""
+    METRICS.inc("gv_fetch_errors_total", provider=provider, chain=chain, error=type(e).__name__)
+
+def _is_retryable(e: Exception) -> bool:
+    """
+    Error jaringan / 5xx / balasan rusak layak dicoba lagi; error API (key salah, dll) tidak.
+    Dipakai juga oleh utils.async_fetchers (error httpx).
+    """
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(e, requests.HTTPError):
+        code = getattr(e.response, "status_code", 0) or 0
+        return code >= 500
+    httpx = sys.modules.get("httpx")  # hanya ada kalau jalur async dipakai; jangan import di sini
+    if httpx is not None:
+        if isinstance(e, httpx.TransportError):  # koneksi putus, timeout, dll
+            return True
+        if isinstance(e, httpx.HTTPStatusError):
+            return e.response.status_code >= 500
+    return "non-JSON" in str(e)
+
 def _take_result_or_fail(resp: dict, label: str):
     """Ambil field 'result' dari resp. Validasi harus dict."""
     if not isinstance(resp, dict):
@@ -100,46 +338,259 @@ def _take_result_or_fail(resp: dict, label: str):
         raise RuntimeError(f"{label}: invalid result -> {msg}")
     return res
 
+# =========================
+# Cache header block (dipakai bersama semua call)
+# =========================
+
+HEADER_FIELDS = ("number", "timestamp", "baseFeePerGas")
+
+def _trim_header(blk: dict) -> dict:
+    """Simpan hanya field header yang dipakai (bukan daftar transaksi)."""
+    return {k: blk.get(k) for k in HEADER_FIELDS if blk.get(k) is not None}
+
+class BlockHeaderCache:
+    """
+    Header block per (chainid, block_number): LRU in-memory di depan tabel
+    SQLite TxCache. Lookup block yang sama dari banyak thread sekaligus
+    digabung jadi satu request.
+    """
+
+    def __init__(self, maxsize: int = 50_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, chainid, headers: dict):
+        with self._lock:
+            for n, h in headers.items():
+                self._data[(chainid, n)] = h
+                self._data.move_to_end((chainid, n))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_many(self, chainid, numbers) -> dict:
+        """Header yang sudah diketahui (memori → disk): {number: header}."""
+        out, todo = {}, []
+        with self._lock:
+            for n in dict.fromkeys(numbers):
+                h = self._data.get((chainid, n))
+                if h is None:
+                    todo.append(n)
+                else:
+                    self._data.move_to_end((chainid, n))
+                    out[n] = h
+        cache = get_tx_cache()
+        if todo and cache is not None and isinstance(chainid, int):
+            found = cache.get_headers(chainid, todo)
+            self._remember(chainid, found)
+            out.update(found)
+        with self._lock:
+            self.hits += len(out)
+            self.misses += len(set(numbers)) - len(out)
+        return out
+
+    def put_many(self, chainid, headers: dict):
+        headers = {int(n): _trim_header(h) for n, h in headers.items()}
+        self._remember(chainid, headers)
+        cache = get_tx_cache()
+        if cache is not None and isinstance(chainid, int):
+            cache.put_headers(chainid, headers)
+
+    def get_or_fetch(self, chainid, number: int, fetch) -> dict:
+        """Header dari cache; kalau belum ada panggil `fetch(number)` sekali saja walau diminta paralel."""
+        key = (chainid, number)
+        with self._lock:
+            h = self._data.get(key)
+            if h is not None:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return h
+            ev = self._inflight.get(key)
+            owner = ev is None
+            if owner:
+                ev = self._inflight[key] = threading.Event()
+        if not owner:
+            ev.wait()
+            with self._lock:
+                h = self._data.get(key)
+            if h is not None:
+                return h
+            # pemilik request gagal → coba sendiri
+            header = _trim_header(fetch(number))
+            self.put_many(chainid, {number: header})
+            return header
+        try:
+            h = self.get_many(chainid, [number]).get(number)
+            if h is None:
+                h = _trim_header(fetch(number))
+                self.put_many(chainid, {number: h})
+            return h
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            ev.set()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._data),
+                "hit_ratio": (self.hits / total) if total else 0.0}
+
+BLOCK_HEADERS = BlockHeaderCache()
+
+# =========================
+# Cache negatif: hash tidak ditemukan / tx masih pending
+# =========================
+# Tx mined masuk cache permanen (TxCache.tx). Hash yang tidak ada di sebuah
+# chain, atau tx yang belum mined / receipt-nya belum ada, dicatat terpisah
+# dengan TTL: lookup ulang dalam jendela itu langsung raise tanpa API call.
+# Pending sengaja pendek supaya tx yang baru mined cepat terambil.
+
+NOT_FOUND_TTL = float(os.getenv("GV_NOT_FOUND_TTL", "300"))
+PENDING_TTL = float(os.getenv("GV_PENDING_TTL", "15"))
+
+class TxNotFound(LookupError):
+    """Hash tidak ada di chain ini (per pengecekan terakhir); `retry_in` = detik sampai dicek ulang."""
+
+    def __init__(self, msg: str, retry_in: float | None = None):
+        super().__init__(msg)
+        self.retry_in = retry_in
+
+class TxPending(RuntimeError):
+    """Tx belum mined atau receipt belum tersedia; `retry_in` = detik sampai dicek ulang."""
+
+    def __init__(self, msg: str, retry_in: float | None = None):
+        super().__init__(msg)
+        self.retry_in = retry_in
+
+class MissCache:
+    """
+    Status (chainid, tx_hash) → ("not_found" | "pending", kedaluwarsa): dict
+    in-memory di depan tabel tx_miss TxCache, jadi berlaku lintas proses/restart.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(chainid, tx_hash: str) -> tuple:
+        return chainid, (tx_hash or "").strip().lower()
+
+    def get(self, chainid, tx_hash: str) -> tuple[str, float] | None:
+        """(state, sisa_detik) kalau masih berlaku; entri kedaluwarsa dibuang."""
+        key = self._key(chainid, tx_hash)
+        with self._lock:
+            entry = self._data.get(key)
+        cache = get_tx_cache()
+        if entry is None and cache is not None and isinstance(chainid, int):
+            entry = cache.get_miss(chainid, tx_hash)
+        now = time.time()
+        if entry is not None and entry[1] <= now:
+            self.drop(chainid, tx_hash)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return entry[0], entry[1] - now
+
+    def put(self, chainid, tx_hash: str, state: str, ttl: float):
+        until = time.time() + ttl
+        key = self._key(chainid, tx_hash)
+        with self._lock:
+            self._data[key] = (state, until)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        cache = get_tx_cache()
+        if cache is not None and isinstance(chainid, int):
+            cache.put_miss(chainid, tx_hash, state, until)
+
+    def drop(self, chainid, tx_hash: str):
+        with self._lock:
+            self._data.pop(self._key(chainid, tx_hash), None)
+        cache = get_tx_cache()
+        if cache is not None and isinstance(chainid, int):
+            cache.drop_miss(chainid, tx_hash)
+
+    def check(self, chainid, network_key: str, tx_hash: str):
+        """Raise TxNotFound / TxPending kalau status negatif hash ini masih berlaku."""
+        hit = self.get(chainid, tx_hash)
+        if hit is None:
+            return
+        state, left = hit
+        if state == "pending":
+            raise TxPending(f"tx masih pending di {network_key} (cek ulang ±{left:.0f} dtk lagi)", left)
+        raise TxNotFound(f"tx tidak ditemukan di {network_key} (cek ulang ±{left:.0f} dtk lagi)", left)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._data)}
+
+MISSES = MissCache()
+
+def _tx_or_miss(resp, chainid, network_key: str, tx_hash: str) -> dict:
+    """Result eth_getTransactionByHash; null → TxNotFound, belum mined → TxPending (dicatat di MISSES)."""
+    if isinstance(resp, dict) and "result" in resp and resp["result"] is None and "error" not in resp:
+        MISSES.put(chainid, tx_hash, "not_found", NOT_FOUND_TTL)
+        raise TxNotFound(f"tx tidak ditemukan di {network_key}", NOT_FOUND_TTL)
+    return _mined(_take_result_or_fail(resp, "tx"), chainid, network_key, tx_hash)
+
+def _mined(tx: dict, chainid, network_key: str, tx_hash: str) -> dict:
+    """Tx tanpa blockNumber (masih di mempool) → TxPending."""
+    if tx.get("blockNumber") is None:
+        MISSES.put(chainid, tx_hash, "pending", PENDING_TTL)
+        raise TxPending(f"tx masih pending di {network_key}", PENDING_TTL)
+    return tx
+
+def _receipt_or_pending(resp, chainid, network_key: str, tx_hash: str) -> dict:
+    """Result eth_getTransactionReceipt; null (tx ada, belum di-index) → TxPending."""
+    if isinstance(resp, dict) and "result" in resp and resp["result"] is None and "error" not in resp:
+        MISSES.put(chainid, tx_hash, "pending", PENDING_TTL)
+        raise TxPending(f"receipt tx belum tersedia di {network_key}", PENDING_TTL)
+    return _take_result_or_fail(resp, "receipt")
+
+def _cache_samples():
+    """Collector utils.metrics: hit/miss cache yang sudah dihitung di tempat lain."""
+    caches = [("4byte_lru", SIG_NAMES.hits, SIG_NAMES.misses), ("block_headers", BLOCK_HEADERS.hits, BLOCK_HEADERS.misses),
+              ("tx_negative", MISSES.hits, MISSES.misses)]
+    tx_cache = get_tx_cache()
+    if tx_cache is not None:
+        caches.append(("tx", tx_cache.hits, tx_cache.misses))
+    for name, hits, misses in caches:
+        yield "gv_cache_lookups_total", {"cache": name, "result": "hit"}, hits
+        yield "gv_cache_lookups_total", {"cache": name, "result": "miss"}, misses
+
+    flights = [("tx", TX_FLIGHT), ("4byte", SIG_FLIGHT)]
+    rates = sys.modules.get("utils.rates")  # jangan membuat layanan kurs hanya untuk metrik
+    if rates is not None and rates._default is not None:
+        flights.append(("eth_idr_rate", rates._default._flight))
+    for name, flight in flights:
+        st = flight.stats()
+        yield "gv_singleflight_total", {"key": name, "result": "executed"}, st["calls"]
+        yield "gv_singleflight_total", {"key": name, "result": "coalesced"}, st["coalesced"]
+
+METRICS.add_collector(_cache_samples)
+
 # =========================
 # Kurs ETH → IDR
 # =========================
 
 def fetch_eth_idr_rate(timeout=6):
     """Kurs ETH→IDR dengan multi-fallback. Return float > 0 kalau sukses."""
-    # 1) CoinGecko
-    try:
-        r = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": "ethereum", "vs_currencies": "idr"},
-            timeout=timeout
-        )
-        r.raise_for_status()
-        v = float(r.json()["ethereum"]["idr"])
-        if v > 0:
-            return v
-    except Exception:
-        pass
-
-    # 2) Binance ETHUSDT * USD→IDR (exchangerate.host)
-    try:
-        r1 = requests.get("https://api.binance.com/api/v3/ticker/price",
-                          params={"symbol": "ETHUSDT"}, timeout=timeout)
-        r1.raise_for_status()
-        eth_usd = float(r1.json()["price"])
-
-        r2 = requests.get("https://api.exchangerate.host/latest",
-                          params={"base": "USD", "symbols": "IDR"}, timeout=timeout)
-        r2.raise_for_status()
-        usd_idr = float(r2.json()["rates"]["IDR"])
-
-        v = eth_usd * usd_idr
-        if v > 0:
-            return v
-    except Exception:
-        pass
-
-    # 3) gagal semua
-    return 0.0
+    # layanan bersama: cache memori/disk, stale-while-revalidate, provider paralel
+    from utils.rates import get_rate_service
+    return get_rate_service().get(timeout=timeout)
 
 # =========================
 # Fetcher utama
@@ -149,55 +600,156 @@ def fetch_tx_raw_any(
     tx_hash: str,
     api_key: str,
     network: str = "sepolia",
-    eth_idr_rate: float | None = None
+    eth_idr_rate: float | None = None,
+    throttle=None,
+    use_cache: bool = True,
+    price_index=None,
+    tx: dict | None = None,
 ) -> dict:
+    """
+    Payload standar satu tx (cache disk → cache negatif → Etherscan v2).
+    Raise TxNotFound / TxPending untuk hash yang tidak ada / belum mined di chain ini.
+    `tx`: hasil eth_getTransactionByHash yang sudah ada (mis. dari utils.resolver), tidak diminta ulang.
+    """
     network_key = (network or "sepolia").lower().strip()
     if network_key not in CHAINIDS:
         raise ValueError(f"Network belum didukung: {network}")
-    if not api_key:
-        raise RuntimeError("ETHERSCAN_API_KEY belum diset di secrets/env")
 
     chainid = CHAINIDS[network_key]
 
-    # --- helper retry ringan untuk proxy endpoints (v2 butuh chainid) ---
-    def call_proxy(action, params):
-        backoff = 0.35
-        last_err = None
-        for _ in range(3):
-            try:
-                resp = _etherscan_get_v2({
-                    "module": "proxy",
-                    "action": action,
-                    "chainid": chainid,
-                    "apikey": api_key,
-                    **params,
-                })
-                # guard: kadang API balikin string mentah
-                if isinstance(resp, str):
-                    try:
-                        resp = json.loads(resp)
-                    except Exception:
-                        snip = resp[:200]
-                        raise RuntimeError(f"Unexpected string from Etherscan: {snip}")
-                return resp
-            except Exception as e:
-                last_err = e
-                time.sleep(backoff)
-                backoff *= 1.7
-        raise last_err
-
-    # --- TX data ---
-    tx_resp = call_proxy("eth_getTransactionByHash", {"txhash": tx_hash.strip()})
-    tx = _take_result_or_fail(tx_resp, "tx")
+    # --- cache persisten: tx mined tidak berubah, jadi tidak perlu API call ---
+    cache = get_tx_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(chainid, tx_hash)
+        if cached is not None:
+            return _reprice(cached, tx_hash, eth_idr_rate, price_index)
+    # --- cache negatif: tidak ditemukan / pending yang masih dalam TTL → tanpa API call ---
+    if use_cache:
+        MISSES.check(chainid, network_key, tx_hash)
 
-    # --- Receipt ---
-    rcpt_resp = call_proxy("eth_getTransactionReceipt", {"txhash": tx_hash.strip()})
-    rcpt = _take_result_or_fail(rcpt_resp, "receipt")
+    if not api_key:
+        raise RuntimeError("ETHERSCAN_API_KEY belum diset di secrets/env")
 
-    # --- Block (untuk timestamp) ---
-    blk_resp = call_proxy("eth_getBlockByNumber", {"tag": tx.get("blockNumber", "0x0"), "boolean": "true"})
-    blk = _take_result_or_fail(blk_resp, "block")
+    # --- single-flight lintas sesi/thread: lookup identik yang sedang jalan cukup satu ke upstream;
+    # penumpang dapat salinan yang dihitung ulang dengan kurs miliknya sendiri ---
+    payload = TX_FLIGHT.do(
+        (chainid, tx_hash.strip().lower()),
+        lambda: _fetch_tx_upstream(tx_hash, api_key, network_key, chainid, eth_idr_rate, throttle,
+                                   price_index, cache, tx),
+    )
+    return _reprice(payload, tx_hash, eth_idr_rate, price_index)
+
+def call_proxy(chainid: int, network_key: str, api_key: str, action: str, params: dict, throttle=None):
+    """Proxy Etherscan v2 (wajib chainid) dengan token bucket per API key + retry ringan."""
+    return call_etherscan(network_key, api_key, {"module": "proxy", "action": action, "chainid": chainid, **params},
+                          throttle)
+
+def call_etherscan(network_key: str, api_key: str, params: dict, throttle=None):
+    """Call Etherscan v2 apa saja (proxy, account/txlist, ...): token bucket per API key + retry ringan."""
+    limiter = get_rate_limiter("etherscan", api_key)
+    backoff = 0.35
+    last_err = None
+    for _ in range(3):
+        try:
+            if throttle is not None:
+                throttle.acquire()
+            limiter.acquire()
+            resp = _etherscan_get_v2({**params, "apikey": api_key})
+            # guard: kadang API balikin string mentah
+            if isinstance(resp, str):
+                try:
+                    resp = json.loads(resp)
+                except Exception:
+                    snip = resp[:200]
+                    raise RuntimeError(f"Unexpected string from Etherscan: {snip}")
+            limiter.reward()
+            return resp
+        except RateLimited as e:
+            # bucket yang menahan laju; tidak perlu sleep tambahan di sini
+            last_err = e
+            limiter.penalize(e.retry_after)
+            count_retry("etherscan", network_key, e)
+        except Exception as e:
+            if not _is_retryable(e):
+                count_error("etherscan", network_key, e)
+                raise
+            last_err = e
+            count_retry("etherscan", network_key, e)
+            time.sleep(backoff)
+            backoff *= 1.7
+    count_error("etherscan", network_key, last_err)
+    raise last_err
+
+def _fetch_tx_upstream(tx_hash: str, api_key: str, network_key: str, chainid: int, eth_idr_rate,
+                       throttle, price_index, cache, tx: dict | None = None) -> dict:
+    """tx + receipt + header dari Etherscan (dipanggil lewat TX_FLIGHT)."""
+    def proxy(action, params):
+        return call_proxy(chainid, network_key, api_key, action, params, throttle)
+
+    # --- TX data (bisa sudah didapat resolver chain) ---
+    if tx is None:
+        tx_resp = proxy("eth_getTransactionByHash", {"txhash": tx_hash.strip()})
+        tx = _tx_or_miss(tx_resp, chainid, network_key, tx_hash)
+    else:
+        tx = _mined(tx, chainid, network_key, tx_hash)
 
+    # --- Receipt ---
+    rcpt_resp = proxy("eth_getTransactionReceipt", {"txhash": tx_hash.strip()})
+    rcpt = _receipt_or_pending(rcpt_resp, chainid, network_key, tx_hash)
+
+    # --- Block (untuk timestamp): header saja, di-cache per (chainid, block) ---
+    def fetch_header(number):
+        blk_resp = proxy("eth_getBlockByNumber", {"tag": hex(number), "boolean": "false"})
+        return _take_result_or_fail(blk_resp, "block")
+
+    blk = BLOCK_HEADERS.get_or_fetch(chainid, _hex_to_int(tx.get("blockNumber"), 0), fetch_header)
+
+    payload = _build_payload(tx, rcpt, blk, network_key, tx_hash, eth_idr_rate, price_index)
+    if cache is not None:
+        cache.put(chainid, tx_hash, payload)
+    return payload
+
+def _payload_ts(payload: dict) -> int | None:
+    """Unix ts blok dari payload (payload lama belum punya timestamp_unix)."""
+    ts = payload.get("timestamp_unix")
+    if ts is not None:
+        return int(ts)
+    try:
+        dt = datetime.strptime(payload.get("timestamp", ""), "%Y-%m-%d %H:%M:%S")
+        return int(dt.replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):  # timestamp None / format lain
+        return None
+
+def _rate_at(ts_unix: int | None, eth_idr_rate: float | None = None, price_index=None) -> float:
+    """Kurs untuk tx: harga historis saat blok kalau index punya datanya, selain itu kurs sekarang."""
+    if price_index is not None and ts_unix is not None:
+        v = price_index.price_at(ts_unix)
+        if v == v and v > 0:  # bukan NaN
+            return float(v)
+    if eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+    return float(eth_idr_rate or 0)
+
+def _reprice(payload: dict, tx_hash: str, eth_idr_rate: float | None = None, price_index=None) -> dict:
+    """
+    Payload dari cache: hitung ulang cost_idr (kurs saat blok kalau ada index, atau kurs
+    yang diberikan). Tanpa keduanya cost_idr tersimpan dipakai apa adanya, jadi cache hit
+    tidak memicu lookup kurs; kurs baru dicari hanya kalau payload belum punya cost_idr.
+    """
+    out = dict(payload)
+    out["tx_hash"] = tx_hash
+    out["timestamp_unix"] = _payload_ts(out)
+    out["fee_wei"] = payload_fee_wei(out)
+    if eth_idr_rate is None and price_index is None and out.get("cost_idr") is not None:
+        return out
+    rate = _rate_at(out["timestamp_unix"], eth_idr_rate, price_index)
+    out["cost_idr"] = wei_to_idr(out["fee_wei"], rate)
+    return out
+
+def _build_payload(tx: dict, rcpt: dict, blk: dict, network_key: str, tx_hash: str,
+                   eth_idr_rate: float | None = None, price_index=None,
+                   function_name: str | None = None) -> dict:
+    """Normalisasi tx + receipt + block (header cukup) ke payload standar fetcher."""
     # === Waktu: UTC + WIB ===
     ts_unix = _hex_to_int(blk.get("timestamp"))
     ts_utc = datetime.fromtimestamp(ts_unix, tz=timezone.utc)
@@ -207,22 +759,22 @@ def fetch_tx_raw_any(
     except Exception:
         timestamp_wib = ""
 
-    # === Biaya ===
+    # === Biaya (integer wei; ETH/Gwei/Rp hanya turunan untuk tampilan) ===
     gas_used = _hex_to_int(rcpt.get("gasUsed", "0x0"))
     # EIP-1559 pakai effectiveGasPrice; fallback legacy gasPrice
     eff_price_hex = rcpt.get("effectiveGasPrice") or tx.get("gasPrice") or "0x0"
     gas_price_wei = _hex_to_int(eff_price_hex, 0) or 0
-    gas_price_gwei = gas_price_wei / 1e9
-    cost_eth = (gas_used * gas_price_wei) / 1e18
+    fee_wei = gas_used * gas_price_wei
 
-    if eth_idr_rate is None:
-        eth_idr_rate = fetch_eth_idr_rate()
-    cost_idr = cost_eth * float(eth_idr_rate or 0)
+    cost_idr = wei_to_idr(fee_wei, _rate_at(ts_unix, eth_idr_rate, price_index))
 
     # === Function name ===
     input_data = (tx.get("input") or "0x").strip()
 
-    if input_data.lower() == "0x":
+    if function_name:
+        # sudah diketahui sumber data (mis. functionName dari Etherscan txlist)
+        function_name = function_name.split("(")[0]
+    elif input_data.lower() == "0x":
         # pure ETH transfer
         method_id = ""
         function_name = "ETH Transfer"
@@ -239,6 +791,7 @@ def fetch_tx_raw_any(
     return {
         "timestamp": timestamp_utc,
         "timestamp_local": timestamp_wib,
+        "timestamp_unix": ts_unix,
         "network": network_key.capitalize(),
         "tx_hash": tx_hash,
         "contract": tx.get("to") or "",
@@ -246,14 +799,94 @@ def fetch_tx_raw_any(
         "block_number": _hex_to_int(tx.get("blockNumber", "0x0")),
         "gas_used": gas_used,
         "gas_price_wei": gas_price_wei,
-        "gas_price_gwei": gas_price_gwei,
-        "cost_eth": cost_eth,
+        "fee_wei": fee_wei,
+        "gas_price_gwei": wei_to_gwei(gas_price_wei),
+        "cost_eth": wei_to_eth(fee_wei),
         "cost_idr": cost_idr,
         "status": tx_status,                           # <- variabel ada & jelas
         "from_addr": tx.get("from") or "",
         "to_addr": tx.get("to") or ""
     }
 
+# =========================
+# Multi fetch (paralel)
+# =========================
+
+def _interleave_jobs(jobs):
+    """Urutkan job round-robin per chain supaya semua chain jalan bersamaan."""
+    per_net = {}
+    for net, h in jobs:
+        per_net.setdefault(net, []).append((net, h))
+    queues = list(per_net.values())
+    out = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        out.extend(q[i] for q in queues if i < len(q))
+    return out
+
+def fetch_many(
+    jobs,
+    api_key: str | None = None,
+    eth_idr_rate: float | None = None,
+    per_chain_concurrency: int = 3,
+    max_workers: int = 16,
+    rps: float | None = None,
+    fetch_fn=None,
+    price_index=None,
+):
+    """
+    Ambil banyak (network, tx_hash) secara paralel.
+
+    - `per_chain_concurrency`: maks request bersamaan per chain
+    - `rps`: budget request/detik global tambahan (opsional); limit per
+      provider/API key sudah dijaga token bucket `get_rate_limiter`
+    - `fetch_fn(network, tx_hash, throttle)`: override fetcher (mis. versi cached)
+    - `price_index`: PriceIndex untuk menghitung Rupiah di kurs saat blok
+
+    Yield `(network, tx_hash, raw, error)` sesuai urutan selesai;
+    `raw` None kalau gagal, `error` None kalau sukses.
+    """
+    jobs = _interleave_jobs(list(jobs))
+    if not jobs:
+        return
+    throttle = TokenBucket(rps) if rps else None
+    if fetch_fn is None:
+        if eth_idr_rate is None and price_index is None:
+            eth_idr_rate = fetch_eth_idr_rate()  # sekali per batch, bukan per tx / per cache hit
+
+        def fetch_fn(net, h, throttle):
+            return fetch_tx_raw_any(h, api_key, network=net,
+                                    eth_idr_rate=eth_idr_rate, throttle=throttle,
+                                    price_index=price_index)
+
+    nets = {net for net, _ in jobs}
+    slots = {net: threading.BoundedSemaphore(max(1, per_chain_concurrency)) for net in nets}
+    workers = max(1, min(max_workers, len(jobs), len(nets) * max(1, per_chain_concurrency)))
+
+    def run(net, h):
+        with slots[net]:
+            return fetch_fn(net, h, throttle)
+
+    # job disubmit bertahap (jendela ~2× worker): kalau konsumen berhenti iterasi,
+    # hanya sedikit fetch yang masih antre dan sisanya dibatalkan, bukan ikut dijalankan
+    todo = iter(jobs)
+    pending = {}
+    ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gv-fetch")
+    try:
+        for net, h in itertools.islice(todo, workers * 2):
+            pending[ex.submit(run, net, h)] = (net, h)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                net, h = pending.pop(fut)
+                for nxt in itertools.islice(todo, 1):
+                    pending[ex.submit(run, *nxt)] = nxt
+                try:
+                    yield net, h, fut.result(), None
+                except Exception as e:
+                    yield net, h, None, e
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+
 # ===== Wrapper untuk STC Analytics =====
 def fetch_tx_raw(network: str, tx_hash: str) -> dict:
     """Ambil data transaksi dari network."""
@@ -261,13 +894,25 @@ def fetch_tx_raw(network: str, tx_hash: str) -> dict:
     API = st.secrets.get("ETHERSCAN_API_KEY") or os.getenv("ETHERSCAN_API_KEY")
     return fetch_tx_raw_any(tx_hash, API, network=network)
 
-def to_standard_row(raw: dict) -> dict:
-    """Konversi raw tx menjadi row standar STC Analytics GasVision CSV."""
+def to_standard_row(raw: dict, price_index=None) -> dict:
+    """Konversi raw tx menjadi row standar STC Analytics GasVision CSV.
+
+    Dengan `price_index`, Estimated Fee (Rp) dihitung di kurs saat blok.
+    """
     def num(x, default=0):
         try:
             return float(x)
         except Exception:
             return default
+    # payload fetcher membawa integer wei; baris dari sumber lain cukup pakai float-nya
+    has_wei = raw.get("gas_price_wei") is not None
+    fee_wei = payload_fee_wei(raw) if has_wei else None
+    fee_eth = wei_to_eth(fee_wei) if has_wei else num(raw.get("cost_eth"))
+    fee_idr = num(raw.get("cost_idr"))
+    if price_index is not None:
+        rate = price_index.price_at(_payload_ts(raw))
+        if rate == rate and rate > 0:
+            fee_idr = wei_to_idr(fee_wei, rate) if has_wei else fee_eth * rate
     return {
         "Timestamp": raw.get("timestamp", ""),
         "Network": raw.get("network", ""),
@@ -276,9 +921,9 @@ def to_standard_row(raw: dict) -> dict:
         "Function": raw.get("function_name", ""),
         "Block": int(num(raw.get("block_number"))),
         "Gas Used": int(num(raw.get("gas_used"))),
-        "Gas Price (Gwei)": num(raw.get("gas_price_gwei")),
-        "Estimated Fee (ETH)": num(raw.get("cost_eth")),
-        "Estimated Fee (Rp)": num(raw.get("cost_idr")),
+        "Gas Price (Gwei)": wei_to_gwei(raw["gas_price_wei"]) if has_wei else num(raw.get("gas_price_gwei")),
+        "Estimated Fee (ETH)": fee_eth,
+        "Estimated Fee (Rp)": fee_idr,
         "Status": raw.get("status", "Unknown"),
         "Wallet From": raw.get("from_addr", ""),
         "Wallet To": raw.get("to_addr", ""),
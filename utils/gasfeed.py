@@ -0,0 +1,184 @@
+import os
+import bisect
+import threading
+import time
+from array import array
+
+from utils.fetchers import _hex_to_int, count_error
+from utils.rpc import RPC_URLS, RpcError, rpc_batch
+
+# =========================
+# Feed gas price live per chain (eth_feeHistory)
+# =========================
+# Simulator dulu memakai preset tetap 20/50/100 Gwei untuk semua jaringan.
+# Feed ini mem-poll eth_feeHistory tiap chain di RPC_URLS (atau stub lokal
+# lewat GV_GAS_RPC_URL) dan menyimpan tip (priority fee) per block di ring
+# buffer berukuran tetap. Tier Standard/Fast/Instant = base fee block
+# berikutnya + persentil tip di jendela itu:
+# - tiap block baru: satu insert + satu evict di salinan terurut (bisect),
+#   bukan sort ulang seluruh jendela
+# - tier dihitung sekali per poll lalu dipublikasi sebagai dict baru, jadi
+#   pembaca (simulate_fee_table) cukup satu lookup O(1) tanpa lock
+
+FEE_WINDOW = int(os.getenv("GV_FEE_WINDOW", "120"))      # block per chain di ring buffer
+POLL_S = float(os.getenv("GV_GAS_POLL", "12"))           # interval poll (± waktu block L1)
+GAS_RPC_URL = os.getenv("GV_GAS_RPC_URL")                # satu URL untuk semua chain (mis. stub)
+REWARD_PERCENTILE = 50   # tip yang diambil per block: median priority fee block tsb
+MAX_CATCHUP = 64         # block maksimal yang diminta per poll setelah jendela terisi
+TIER_PERCENTILES = {"Standard": 50, "Fast": 75, "Instant": 95}
+
+class FeeRing:
+    """Tip per block (Gwei) di array melingkar ukuran tetap + salinan terurut untuk persentil."""
+
+    def __init__(self, size: int = FEE_WINDOW, tiers: dict = TIER_PERCENTILES):
+        self.size = max(1, size)
+        self.tier_percentiles = dict(tiers)
+        self._tips = array("d", bytes(8 * self.size))     # slot ring, ditimpa melingkar
+        self._blocks = array("q", bytes(8 * self.size))
+        self._sorted: list = []   # isi jendela saat ini, terurut naik
+        self._head = 0            # slot berikutnya yang ditulis
+        self.count = 0
+        self.last_block: int | None = None
+        self.base_fee_gwei: float | None = None
+        self._tiers: dict = {}
+
+    def push(self, number: int, tip_gwei: float):
+        """Tambah satu block; kalau penuh, block tertua keluar dari jendela."""
+        if self.count == self.size:
+            old = self._tips[self._head]
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        else:
+            self.count += 1
+        self._tips[self._head] = tip_gwei
+        self._blocks[self._head] = number
+        self._head = (self._head + 1) % self.size
+        bisect.insort(self._sorted, tip_gwei)
+        self.last_block = number
+
+    def percentile(self, q: float) -> float | None:
+        """Persentil (nearest-rank) tip di jendela; langsung dari index salinan terurut."""
+        n = len(self._sorted)
+        if not n:
+            return None
+        return self._sorted[min(n - 1, max(0, int(-(-q * n // 100)) - 1))]
+
+    def publish(self, base_fee_gwei: float):
+        """Hitung tier untuk base fee terbaru; dict lama diganti utuh (aman dibaca thread lain)."""
+        self.base_fee_gwei = base_fee_gwei
+        self._tiers = {name: base_fee_gwei + self.percentile(q)
+                       for name, q in self.tier_percentiles.items()} if self._sorted else {}
+
+    def tiers(self) -> dict:
+        return self._tiers
+
+    def blocks(self) -> list:
+        """Nomor block di jendela, urut lama → baru."""
+        idx = [(self._head - self.count + i) % self.size for i in range(self.count)]
+        return [self._blocks[i] for i in idx]
+
+class GasFeed:
+    """Poller eth_feeHistory untuk beberapa chain; `tier()` membaca hasil terakhir tanpa I/O."""
+
+    def __init__(self, urls: dict | None = None, window: int = FEE_WINDOW, poll: float = POLL_S,
+                 max_age: float | None = None):
+        if urls is None:
+            urls = {name: GAS_RPC_URL or url for name, url in RPC_URLS.items()}
+        self.urls = dict(urls)
+        self.window = window
+        self.poll = poll
+        self.max_age = max_age if max_age is not None else poll * 10  # lewat dari ini dianggap basi
+        self.rings = {name: FeeRing(window) for name in self.urls}
+        self.updated: dict = {}   # network -> epoch poll sukses terakhir
+        self.errors: dict = {}    # network -> pesan error poll terakhir
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _poll(self, network: str):
+        ring = self.rings[network]
+        count = self.window if ring.last_block is None else min(self.window, MAX_CATCHUP)
+        res = rpc_batch(self.urls[network], [("eth_feeHistory", [hex(count), "latest", [REWARD_PERCENTILE]])],
+                        timeout=10)[0]
+        if isinstance(res, Exception):
+            raise res
+        if not isinstance(res, dict) or not res.get("baseFeePerGas"):
+            raise RpcError(f"eth_feeHistory: invalid result -> {res}")
+        oldest = _hex_to_int(res.get("oldestBlock"), 0)
+        rewards = res.get("reward") or []
+        with self._lock:
+            for i, reward in enumerate(rewards):
+                number = oldest + i
+                if ring.last_block is not None and number <= ring.last_block:
+                    continue  # sudah ada di ring dari poll sebelumnya
+                ring.push(number, _hex_to_int(reward[0] if reward else 0, 0) / 1e9)
+            # elemen terakhir baseFeePerGas = base fee block berikutnya (yang akan ditambang)
+            ring.publish(_hex_to_int(res["baseFeePerGas"][-1], 0) / 1e9)
+        self.updated[network] = time.time()
+        self.errors.pop(network, None)
+
+    def refresh(self, networks=None):
+        """Poll sekarang (sinkron) untuk `networks` (default semua); error dicatat, tidak di-raise."""
+        for network in (list(self.urls) if networks is None else networks):
+            if network not in self.urls:
+                continue
+            try:
+                self._poll(network)
+            except Exception as e:
+                self.errors[network] = str(e)
+                count_error("rpc", network, e)
+
+    def start(self):
+        """Poll berkala di thread daemon (sekali per feed)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, daemon=True, name="gv-gasfeed")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        retry_at: dict = {}
+        while not self._stop.is_set():
+            now = time.time()
+            due = [n for n in self.urls if retry_at.get(n, 0) <= now]
+            self.refresh(due)
+            for n in due:
+                # chain yang error (RPC mati / feeHistory tidak didukung) dicoba lebih jarang
+                retry_at[n] = now + (self.max_age if n in self.errors else 0)
+            self._stop.wait(self.poll)
+
+    def tier(self, network: str, speed: str) -> float | None:
+        """Gas price (Gwei) tier `speed` untuk chain ini; None kalau belum ada data / sudah basi."""
+        ring = self.rings.get(network)
+        if ring is None or time.time() - self.updated.get(network, 0) > self.max_age:
+            return None
+        return ring.tiers().get(speed)
+
+    def status(self) -> dict:
+        """Ringkasan per chain untuk UI: block terakhir, umur data, base fee, tier, error."""
+        now = time.time()
+        return {
+            name: {
+                "block": ring.last_block, "window": ring.count,
+                "age_s": (now - self.updated[name]) if name in self.updated else None,
+                "base_fee_gwei": ring.base_fee_gwei, "tiers": ring.tiers(), "error": self.errors.get(name),
+            }
+            for name, ring in self.rings.items()
+        }
+
+_default: GasFeed | None = None
+_default_lock = threading.Lock()
+
+def get_gas_feed() -> GasFeed | None:
+    """Feed default per proses (poller otomatis jalan); None kalau dimatikan (GV_GAS_FEED=0)."""
+    global _default
+    if os.getenv("GV_GAS_FEED", "1") == "0":
+        return None
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = GasFeed().start()
+    return _default
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.metrics import record_http
+
+# =========================
+# Session HTTP bersama (keep-alive + pooling per host)
+# =========================
+# Semua fetcher lewat sini supaya koneksi TCP+TLS ke host yang sama
+# (Etherscan, 4byte, CoinGecko, ...) dipakai ulang, tidak handshake tiap call.
+
+POOL_CONNECTIONS = int(os.getenv("GV_HTTP_POOL_CONNECTIONS", "16"))  # jumlah host yang pool-nya disimpan
+POOL_MAXSIZE = int(os.getenv("GV_HTTP_POOL_MAXSIZE", "32"))          # koneksi keep-alive per host
+DEFAULT_TIMEOUT = float(os.getenv("GV_HTTP_TIMEOUT", "10"))
+RETRY_TOTAL = int(os.getenv("GV_HTTP_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("GV_HTTP_BACKOFF", "0.3"))
+RETRY_STATUS = (500, 502, 503, 504)
+
+USER_AGENT = "stc-gasvision/1.0 (+https://github.com/mrbrightsides/stc-gasvision)"
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_config = {
+    "pool_connections": POOL_CONNECTIONS,
+    "pool_maxsize": POOL_MAXSIZE,
+    "timeout": DEFAULT_TIMEOUT,
+    "retries": RETRY_TOTAL,
+    "backoff": RETRY_BACKOFF,
+}
+# prefix URL yang retry-nya diurus pemanggil (loop retry + token bucket di utils.fetchers);
+# di sini tanpa retry transport supaya satu call logis tidak jadi retry × retry ke API
+_app_retried: set = set()
+
+def _adapter(retries: int) -> HTTPAdapter:
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=_config["backoff"],
+        status_forcelist=RETRY_STATUS if retries else (),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    )
+    return HTTPAdapter(
+        pool_connections=_config["pool_connections"],
+        pool_maxsize=_config["pool_maxsize"],
+        max_retries=retry,
+        pool_block=False,
+    )
+
+def _build_session() -> requests.Session:
+    adapter = _adapter(_config["retries"])
+    s = requests.Session()
+    s.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    for prefix in _app_retried:
+        s.mount(prefix, _adapter(0))
+    return s
+
+def get_session() -> requests.Session:
+    """Session bersama per proses (pool urllib3-nya thread-safe)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def disable_transport_retry(prefix: str):
+    """URL berawalan `prefix` tanpa retry urllib3: pemanggilnya sudah retry sendiri lewat token bucket."""
+    with _lock:
+        _app_retried.add(prefix)
+        if _session is not None:
+            _session.mount(prefix, _adapter(0))
+
+def configure(pool_connections: int | None = None, pool_maxsize: int | None = None,
+              timeout: float | None = None, retries: int | None = None,
+              backoff: float | None = None):
+    """Ubah ukuran pool/timeout/retry; session lama ditutup dan dibangun ulang."""
+    global _session
+    with _lock:
+        for k, v in (("pool_connections", pool_connections), ("pool_maxsize", pool_maxsize),
+                     ("timeout", timeout), ("retries", retries), ("backoff", backoff)):
+            if v is not None:
+                _config[k] = v
+        old, _session = _session, None
+    if old is not None:
+        old.close()
+
+# host → label provider untuk metrik (endpoint yang dialihkan, mis. stub lokal, pakai host-nya)
+PROVIDER_HOSTS = {
+    "etherscan.io": "etherscan",
+    "4byte.directory": "4byte",
+    "coingecko.com": "coingecko",
+    "binance.com": "binance",
+    "exchangerate.host": "exchangerate",
+    "infura.io": "rpc",
+}
+
+def provider_of(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    for suffix, name in PROVIDER_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return name
+    return host
+
+def _timed(method: str, url: str, provider: str | None, **kwargs):
+    """Request lewat session bersama + catat latensi, status dan retry transport ke utils.metrics."""
+    provider = provider or provider_of(url)
+    t = time.perf_counter()
+    try:
+        r = get_session().request(method, url, **kwargs)
+    except Exception as e:
+        record_http(provider, time.perf_counter() - t, type(e).__name__)
+        raise
+    history = getattr(getattr(r.raw, "retries", None), "history", None) or ()
+    record_http(provider, time.perf_counter() - t, r.status_code, retries=len(history))
+    return r
+
+def http_get(url: str, params: dict | None = None, timeout: float | None = None,
+             provider: str | None = None, **kwargs):
+    """GET lewat session bersama; timeout default dari konfigurasi. `provider`: label metrik."""
+    return _timed("GET", url, provider, params=params, timeout=timeout or _config["timeout"], **kwargs)
+
+def http_post(url: str, json=None, timeout: float | None = None, provider: str | None = None, **kwargs):
+    """POST lewat session bersama (dipakai JSON-RPC)."""
+    return _timed("POST", url, provider, json=json, timeout=timeout or _config["timeout"], **kwargs)
+
+def async_client(**kwargs):
+    """
+    httpx.AsyncClient dengan UA/timeout/pool yang sama (untuk utils.async_fetchers).
+    httpx di-import saat dipakai; client terikat event loop, jadi buat per `asyncio.run`.
+    """
+    import httpx
+    kwargs.setdefault("limits", httpx.Limits(max_connections=_config["pool_maxsize"],
+                                             max_keepalive_connections=_config["pool_maxsize"]))
+    kwargs.setdefault("transport", httpx.AsyncHTTPTransport(retries=_config["retries"]))
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+        timeout=kwargs.pop("timeout", _config["timeout"]),
+        **kwargs,
+    )
@@ -0,0 +1,400 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Job queue lokal (SQLite) + worker proses terpisah
+# =========================
+# Batch multi-hash tidak lagi hidup di dalam run script Streamlit: UI hanya
+# submit job lalu polling progres/hasil per job id. Item dikerjakan oleh
+# proses worker (`python -m utils.jobs worker`) yang mengambil item dengan
+# lease; kalau worker mati, lease habis dan item kembali ke antrean, jadi job
+# bertahan walau rerun, browser tertutup, maupun restart server.
+# Laju Etherscan dibagi rata antar worker (`--rate-share`), sehingga
+# throughput naik sebanding jumlah worker sampai limit API key.
+
+JOBS_PATH = os.getenv("GV_JOBS_PATH") or os.path.join(CACHE_DIR, "jobs.sqlite3")
+LEASE_S = float(os.getenv("GV_JOB_LEASE", "120"))   # item "running" lebih lama dari ini dianggap yatim
+MAX_ATTEMPTS = 3                                      # klaim ulang maksimum setelah worker hilang
+HEARTBEAT_S = 15.0                                    # worker dianggap hidup kalau terlihat dalam jendela ini
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    id           TEXT    PRIMARY KEY,
+    created      REAL    NOT NULL,
+    total        INTEGER NOT NULL,
+    eth_idr_rate REAL,
+    cancelled    INTEGER NOT NULL DEFAULT 0,
+    label        TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS item (
+    job_id      TEXT    NOT NULL,
+    seq         INTEGER NOT NULL,
+    network     TEXT    NOT NULL,
+    tx_hash     TEXT    NOT NULL,
+    state       TEXT    NOT NULL DEFAULT 'queued',   -- queued/running/done/failed/cancelled
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    payload     TEXT,
+    error       TEXT,
+    finished    REAL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS item_queue ON item (state, job_id, seq);
+
+CREATE TABLE IF NOT EXISTS worker (
+    id      TEXT    PRIMARY KEY,
+    pid     INTEGER NOT NULL,
+    host    TEXT    NOT NULL,
+    started REAL    NOT NULL,
+    seen    REAL    NOT NULL,
+    done    INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+ACTIVE = ("queued", "running")
+
+def _new_job_id() -> str:
+    # urut waktu → antrean FIFO lintas job cukup ORDER BY job_id
+    return f"{int(time.time() * 1000):x}-{uuid.uuid4().hex[:6]}"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobQueue:
+    """Antrean job/item di SQLite (WAL); aman dipakai UI dan banyak proses worker sekaligus."""
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # --- sisi UI / CLI ---
+
+    def submit(self, jobs, eth_idr_rate: float | None = None, label: str = "") -> str:
+        """(network, tx_hash) → job baru; return job id."""
+        jobs = list(jobs)
+        job_id = _new_job_id()
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.execute("INSERT INTO job (id, created, total, eth_idr_rate, label) VALUES (?, ?, ?, ?, ?)",
+                      (job_id, time.time(), len(jobs), eth_idr_rate, label))
+            c.executemany("INSERT INTO item (job_id, seq, network, tx_hash) VALUES (?, ?, ?, ?)",
+                          [(job_id, i, net, h) for i, (net, h) in enumerate(jobs)])
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def progress(self, job_id: str) -> dict | None:
+        """Status job: jumlah per state + status ringkas (queued/running/done/cancelled)."""
+        c = self._conn()
+        job = c.execute("SELECT created, total, cancelled, label FROM job WHERE id=?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        counts = dict.fromkeys(("queued", "running", "done", "failed", "cancelled"), 0)
+        counts.update(c.execute("SELECT state, COUNT(*) FROM item WHERE job_id=? GROUP BY state", (job_id,)))
+        last = c.execute("SELECT MAX(finished) FROM item WHERE job_id=?", (job_id,)).fetchone()[0]
+        if counts["queued"] + counts["running"] == 0:
+            status = "cancelled" if job[2] else "done"
+        else:
+            status = "running" if counts["running"] or counts["done"] or counts["failed"] else "queued"
+        return {"id": job_id, "created": job[0], "total": job[1], "label": job[3], "status": status,
+                "finished_at": last if status in ("done", "cancelled") else None, **counts}
+
+    def results(self, job_id: str) -> list:
+        """[(network, tx_hash, payload|None, error|None)] urut input; item yang belum selesai dilewati."""
+        rows = self._conn().execute(
+            "SELECT network, tx_hash, state, payload, error FROM item "
+            "WHERE job_id=? AND state IN ('done', 'failed') ORDER BY seq", (job_id,))
+        return [(net, h, json.loads(p) if state == "done" else None, err if state == "failed" else None)
+                for net, h, state, p, err in rows]
+
+    def cancel(self, job_id: str) -> int:
+        """Batalkan item yang belum diambil worker; yang sedang jalan dibiarkan selesai."""
+        c = self._conn()
+        c.execute("UPDATE job SET cancelled=1 WHERE id=?", (job_id,))
+        return c.execute("UPDATE item SET state='cancelled' WHERE job_id=? AND state='queued'", (job_id,)).rowcount
+
+    def list_jobs(self, limit: int = 20) -> list:
+        ids = [r[0] for r in self._conn().execute("SELECT id FROM job ORDER BY id DESC LIMIT ?", (limit,))]
+        return [self.progress(i) for i in ids]
+
+    def prune(self, older_than_s: float = 7 * 86400) -> int:
+        """Hapus job selesai yang lebih tua dari `older_than_s` detik."""
+        c = self._conn()
+        old = [r[0] for r in c.execute(
+            "SELECT id FROM job j WHERE created < ? AND NOT EXISTS "
+            "(SELECT 1 FROM item i WHERE i.job_id=j.id AND i.state IN ('queued', 'running'))",
+            (time.time() - older_than_s,))]
+        for job_id in old:
+            c.execute("DELETE FROM item WHERE job_id=?", (job_id,))
+            c.execute("DELETE FROM job WHERE id=?", (job_id,))
+        return len(old)
+
+    # --- sisi worker ---
+
+    def claim(self, worker_id: str, n: int, lease: float = LEASE_S) -> list:
+        """Ambil ≤ n item antrean tertua (atomik); lease yang kedaluwarsa dikembalikan dulu."""
+        now = time.time()
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.execute("UPDATE item SET state='failed', error='worker berhenti berulang kali', finished=? "
+                      "WHERE state='running' AND lease_until < ? AND attempts >= ?", (now, now, MAX_ATTEMPTS))
+            c.execute("UPDATE item SET state='queued' WHERE state='running' AND lease_until < ?", (now,))
+            items = c.execute(
+                "SELECT i.job_id, i.seq, i.network, i.tx_hash, j.eth_idr_rate FROM item i "
+                "JOIN job j ON j.id = i.job_id WHERE i.state='queued' ORDER BY i.job_id, i.seq LIMIT ?",
+                (n,)).fetchall()
+            c.executemany(
+                "UPDATE item SET state='running', worker=?, lease_until=?, attempts=attempts+1 "
+                "WHERE job_id=? AND seq=?", [(worker_id, now + lease, j, s) for j, s, *_ in items])
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        return items
+
+    def complete(self, job_id: str, seq: int, payload: dict):
+        self._conn().execute(
+            "UPDATE item SET state='done', payload=?, error=NULL, finished=? WHERE job_id=? AND seq=?",
+            (json.dumps(payload, ensure_ascii=False), time.time(), job_id, seq))
+
+    def fail(self, job_id: str, seq: int, error: str):
+        self._conn().execute(
+            "UPDATE item SET state='failed', error=?, finished=? WHERE job_id=? AND seq=?",
+            (error[:2000], time.time(), job_id, seq))
+
+    def heartbeat(self, worker_id: str, done: int = 0, lease: float | None = None):
+        """Tandai worker hidup; dengan `lease`, item 'running' miliknya diperpanjang sampai now + lease."""
+        now = time.time()
+        c = self._conn()
+        c.execute(
+            "INSERT INTO worker (id, pid, host, started, seen, done) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET seen=excluded.seen, done=worker.done + excluded.done",
+            (worker_id, os.getpid(), socket.gethostname(), now, now, done))
+        if lease is not None:
+            c.execute("UPDATE item SET lease_until=? WHERE worker=? AND state='running'", (now + lease, worker_id))
+
+    def register_worker(self, worker_id: str, pid: int):
+        """Catat worker yang baru dijalankan sebelum heartbeat pertamanya."""
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO worker (id, pid, host, started, seen) VALUES (?, ?, ?, ?, ?)",
+            (worker_id, pid, socket.gethostname(), now, now))
+
+    def forget_worker(self, worker_id: str):
+        self._conn().execute("DELETE FROM worker WHERE id=?", (worker_id,))
+
+    def live_workers(self) -> list:
+        """Worker yang heartbeat-nya baru (dan prosesnya masih ada, kalau di host yang sama)."""
+        host = socket.gethostname()
+        rows = self._conn().execute(
+            "SELECT id, pid, host, started, seen, done FROM worker WHERE seen > ?",
+            (time.time() - HEARTBEAT_S,)).fetchall()
+        return [dict(zip(("id", "pid", "host", "started", "seen", "done"), r)) for r in rows
+                if r[2] != host or _pid_alive(r[1])]
+
+_default: JobQueue | None = None
+_default_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = JobQueue()
+    return _default
+
+# =========================
+# Worker
+# =========================
+
+def run_worker(api_key: str, queue: JobQueue | None = None, threads: int = 4, batch: int | None = None,
+               lease: float = LEASE_S, poll: float = 0.5, idle_exit: float | None = None,
+               rate_share: int = 1, stop: threading.Event | None = None) -> int:
+    """
+    Loop worker: klaim item → fetch_tx_raw_any (paralel `threads`) → tulis hasil.
+    `rate_share`: jumlah worker yang berbagi API key; limit Etherscan proses ini = limit / rate_share.
+    `idle_exit`: berhenti setelah sekian detik tanpa item (None = jalan terus). Return jumlah item.
+    """
+    from utils.fetchers import PROVIDER_RATES, configure_rate, fetch_tx_raw_any
+    from utils.resolver import AUTO_PREFIX, get_chain_resolver
+
+    q = queue or get_job_queue()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    if rate_share > 1:
+        configure_rate("etherscan", PROVIDER_RATES["etherscan"] / rate_share)
+    batch = batch or threads * 2
+    beat = min(HEARTBEAT_S, lease / 3)   # perpanjang lease jauh sebelum habis
+    processed, idle_since = 0, time.monotonic()
+
+    def one(net, h, rate):
+        tx = None
+        if net.startswith(AUTO_PREFIX):
+            # item multi-chain: cari dulu chain pemilik hash, fetch penuh hanya di sana
+            net, tx = get_chain_resolver().resolve(h, net[len(AUTO_PREFIX):].split(","), api_key)
+            if net is None:
+                raise LookupError("Tx tidak ditemukan di chain terpilih")
+        return fetch_tx_raw_any(h, api_key, network=net, eth_idr_rate=rate, tx=tx)
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="gv-job") as ex:
+        try:
+            while stop is None or not stop.is_set():
+                q.heartbeat(worker_id)
+                items = q.claim(worker_id, batch, lease)
+                if not items:
+                    if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                        break
+                    time.sleep(poll)
+                    continue
+                futs = {ex.submit(one, net, h, rate): (job_id, seq) for job_id, seq, net, h, rate in items}
+                pending, last_beat = set(futs), time.monotonic()
+                while pending:
+                    done, pending = wait(pending, timeout=beat, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        job_id, seq = futs[fut]
+                        try:
+                            q.complete(job_id, seq, fut.result())
+                        except Exception as e:
+                            q.fail(job_id, seq, str(e))
+                    if pending and time.monotonic() - last_beat >= beat:
+                        # batch lambat (retry/backoff): item yang masih jalan jangan sampai diklaim worker lain
+                        q.heartbeat(worker_id, lease=lease)
+                        last_beat = time.monotonic()
+                q.heartbeat(worker_id, done=len(items))
+                processed += len(items)
+                idle_since = time.monotonic()
+        finally:
+            q.forget_worker(worker_id)
+    return processed
+
+def ensure_workers(n: int, api_key: str | None = None, threads: int = 4, idle_exit: float | None = 300,
+                   queue: JobQueue | None = None) -> int:
+    """
+    Pastikan ada ≥ n worker hidup untuk antrean ini; kekurangannya dijalankan sebagai proses
+    terpisah (lepas dari proses pemanggil). Return jumlah worker yang baru dijalankan.
+    """
+    q = queue or get_job_queue()
+    missing = n - len(q.live_workers())
+    if missing <= 0:
+        return 0
+    env = dict(os.environ, GV_JOBS_PATH=q.path)
+    if api_key:
+        env["ETHERSCAN_API_KEY"] = api_key  # lewat env, bukan argv (tidak terlihat di `ps`)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cmd = [sys.executable, "-m", "utils.jobs", "worker", "--threads", str(threads), "--rate-share", str(n)]
+    if idle_exit is not None:
+        cmd += ["--idle-exit", str(idle_exit)]
+    for _ in range(missing):
+        p = subprocess.Popen(cmd, cwd=root, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+        # daftar segera supaya pemanggil berikutnya tidak menjalankan worker ganda sebelum child siap
+        q.register_worker(f"{socket.gethostname()}:{p.pid}", p.pid)
+    return missing
+
+if __name__ == "__main__":
+    # python -m utils.jobs worker -n 4          |  python -m utils.jobs submit -n sepolia hashes.txt
+    # python -m utils.jobs status [JOB_ID]      |  python -m utils.jobs results JOB_ID -o hasil.jsonl
+    ap = argparse.ArgumentParser(description="Job queue lokal GasVision")
+    ap.add_argument("--path", default=JOBS_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    w = sub.add_parser("worker", help="jalankan worker (foreground)")
+    w.add_argument("-n", "--workers", type=int, default=1, help="jumlah proses worker")
+    w.add_argument("--threads", type=int, default=4, help="request paralel per worker")
+    w.add_argument("--rate-share", type=int, help="berbagi limit API key dengan sekian worker (default -n)")
+    w.add_argument("--idle-exit", type=float, help="berhenti setelah idle sekian detik")
+
+    s = sub.add_parser("submit", help="submit hash dari file/stdin")
+    s.add_argument("input", help="file hash (satu per baris, atau '-' untuk stdin)")
+    s.add_argument("-n", "--network", action="append", required=True)
+
+    st_ = sub.add_parser("status", help="status job (tanpa id: job terbaru)")
+    st_.add_argument("job_id", nargs="?")
+
+    r = sub.add_parser("results", help="payload hasil job → JSONL")
+    r.add_argument("job_id")
+    r.add_argument("-o", "--output", help="file JSONL (default stdout)")
+
+    c = sub.add_parser("cancel", help="batalkan item yang belum dikerjakan")
+    c.add_argument("job_id")
+    args = ap.parse_args()
+
+    q = JobQueue(args.path)
+    if args.cmd == "worker":
+        api_key = os.getenv("ETHERSCAN_API_KEY")
+        if not api_key:
+            ap.error("ETHERSCAN_API_KEY belum diset")
+        share = args.rate_share or args.workers
+        if args.workers == 1:
+            n = run_worker(api_key, q, threads=args.threads, idle_exit=args.idle_exit, rate_share=share)
+            print(json.dumps({"processed": n}), file=sys.stderr)
+        else:
+            cmd = [sys.executable, "-m", "utils.jobs", "--path", q.path, "worker",
+                   "--threads", str(args.threads), "--rate-share", str(share)]
+            if args.idle_exit is not None:
+                cmd += ["--idle-exit", str(args.idle_exit)]
+            procs = [subprocess.Popen(cmd) for _ in range(args.workers)]
+            try:
+                for p in procs:
+                    p.wait()
+            except KeyboardInterrupt:
+                for p in procs:
+                    p.terminate()
+    elif args.cmd == "submit":
+        from utils.fetchers import fetch_eth_idr_rate, iter_hashes
+        f = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        with f:
+            hashes = list(iter_hashes(f))
+        nets = [n.lower() for n in args.network]
+        job_id = q.submit([(net, h) for net in nets for h in hashes], eth_idr_rate=fetch_eth_idr_rate() or None,
+                          label=os.path.basename(args.input))
+        print(job_id)
+    elif args.cmd == "status":
+        jobs = [q.progress(args.job_id)] if args.job_id else q.list_jobs(1)
+        print(json.dumps({"jobs": [j for j in jobs if j], "workers": q.live_workers()}, indent=2))
+    elif args.cmd == "results":
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        for net, h, payload, err in q.results(args.job_id):
+            out.write(json.dumps({"network": net, "tx_hash": h, "payload": payload, "error": err},
+                                 ensure_ascii=False) + "\n")
+        if out is not sys.stdout:
+            out.close()
+    elif args.cmd == "cancel":
+        print(json.dumps({"cancelled": q.cancel(args.job_id)}))
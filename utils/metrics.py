@@ -0,0 +1,251 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# =========================
+# Metrik call keluar (Etherscan, 4byte, kurs, RPC)
+# =========================
+# Registry ringan in-process: counter + histogram latensi berlabel
+# (provider, chain, status/error, ...). Nilai yang sudah dihitung modul lain
+# (hit/miss cache, single-flight) ditarik lewat collector saat dibaca, jadi
+# tidak ada penghitungan ganda. Dibaca sebagai teks Prometheus (`render()`,
+# `serve()`, `dump()`) atau sebagai dict untuk panel sidebar (`snapshot()`).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (tipe, help) per nama metrik; yang tidak terdaftar dianggap counter
+FAMILIES = {
+    "gv_http_requests_total": ("counter", "Request HTTP keluar per provider dan status (kode HTTP atau kelas error)"),
+    "gv_http_request_seconds": ("histogram", "Latensi request HTTP keluar per provider"),
+    "gv_http_transport_retries_total": ("counter", "Retry di level transport (urllib3/httpx) per provider"),
+    "gv_fetch_retries_total": ("counter", "Retry di level fetcher per provider/chain dan alasan"),
+    "gv_fetch_errors_total": ("counter", "Call yang akhirnya gagal per provider/chain dan kelas error"),
+    "gv_cache_lookups_total": ("counter", "Lookup cache per cache dan hasil (hit/miss)"),
+    "gv_singleflight_total": ("counter", "Call single-flight: dieksekusi vs menumpang (coalesced)"),
+}
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+def _fmt_value(v) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+class Metrics:
+    """Counter & histogram thread-safe, plus collector untuk statistik milik modul lain."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters: dict = {}    # (nama, labels) -> nilai
+        self._hists: dict = {}       # (nama, labels) -> [count per bucket..., +Inf, sum]
+        self._collectors: list = []
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        k = (name, _key(labels))
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        k = (name, _key(labels))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self._hists.get(k)
+            if h is None:
+                h = self._hists[k] = [0] * (len(self.buckets) + 2)
+            h[i] += 1
+            h[-1] += seconds
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t, **labels)
+
+    def add_collector(self, fn):
+        """`fn()` → iterable (nama, labels_dict, nilai); dipanggil tiap render/snapshot."""
+        with self._lock:
+            if fn not in self._collectors:
+                self._collectors.append(fn)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._hists.clear()
+            self.started = time.time()
+
+    def _samples(self) -> dict:
+        """Counter sendiri + hasil collector: {(nama, labels): nilai}."""
+        with self._lock:
+            out = dict(self._counters)
+            collectors = list(self._collectors)
+        for fn in collectors:
+            try:
+                for name, labels, value in fn():
+                    k = (name, _key(labels))
+                    out[k] = out.get(k, 0) + value
+            except Exception:
+                continue  # collector rusak tidak boleh mematikan halaman metrik
+        return out
+
+    def render(self) -> str:
+        """Format teks eksposisi Prometheus (text/plain; version=0.0.4)."""
+        counters = self._samples()
+        with self._lock:
+            hists = {k: list(v) for k, v in self._hists.items()}
+        names = sorted({n for n, _ in counters} | {n for n, _ in hists})
+        lines = []
+        for name in names:
+            kind, help_ = FAMILIES.get(name, ("counter", ""))
+            if help_:
+                lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (n, labels), v in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+            for (n, labels), h in sorted(hists.items()):
+                if n != name:
+                    continue
+                cum = 0
+                for le, c in zip([*map(str, self.buckets), "+Inf"], h[:-1]):
+                    cum += c
+                    lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', le),))} {cum}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {repr(float(h[-1]))}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {cum}")
+        return "\n".join(lines) + "\n"
+
+    def _quantile(self, h: list, q: float) -> float:
+        """Perkiraan persentil dari bucket (interpolasi linear di dalam bucket)."""
+        total = sum(h[:-1])
+        if not total:
+            return float("nan")
+        target, cum, lo = q * total, 0, 0.0
+        for i, c in enumerate(h[:-1]):
+            hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if cum + c >= target and c:
+                return lo + (hi - lo) * (target - cum) / c
+            cum += c
+            lo = hi
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        """
+        Ringkasan untuk UI: {"providers", "caches", "flights", "errors": [...], "uptime_s"}.
+        Latensi per provider digabung lintas label lain.
+        """
+        counters = self._samples()
+        with self._lock:
+            hists = {k: list(v) for k, v in self._hists.items()}
+
+        prov: dict = {}
+        for (name, labels), h in hists.items():
+            if name != "gv_http_request_seconds":
+                continue
+            p = dict(labels).get("provider", "")
+            acc = prov.setdefault(p, [0] * len(h))
+            for i, v in enumerate(h):
+                acc[i] += v
+
+        def per(name, label="provider") -> dict:
+            out = {}
+            for (n, labels), v in counters.items():
+                if n == name:
+                    k = dict(labels).get(label, "")
+                    out[k] = out.get(k, 0) + v
+            return out
+
+        calls, retries = per("gv_http_requests_total"), per("gv_fetch_retries_total")
+        transport = per("gv_http_transport_retries_total")
+        errors = per("gv_fetch_errors_total")
+        providers = []
+        for p in sorted(set(prov) | set(calls) | set(errors)):
+            h = prov.get(p)
+            n = sum(h[:-1]) if h else 0
+            providers.append({
+                "provider": p, "calls": int(calls.get(p, 0)),
+                "retries": int(retries.get(p, 0) + transport.get(p, 0)), "errors": int(errors.get(p, 0)),
+                "mean_ms": (h[-1] / n * 1000) if n else None,
+                "p50_ms": self._quantile(h, 0.5) * 1000 if n else None,
+                "p95_ms": self._quantile(h, 0.95) * 1000 if n else None,
+            })
+
+        caches: dict = {}
+        for (n, labels), v in counters.items():
+            if n == "gv_cache_lookups_total":
+                d = dict(labels)
+                caches.setdefault(d.get("cache", ""), {"hit": 0, "miss": 0})[d.get("result", "miss")] += v
+        cache_rows = [{"cache": c, "hits": int(v["hit"]), "misses": int(v["miss"]),
+                       "hit_ratio": v["hit"] / (v["hit"] + v["miss"]) if v["hit"] + v["miss"] else None}
+                      for c, v in sorted(caches.items())]
+
+        flights: dict = {}
+        for (n, labels), v in counters.items():
+            if n == "gv_singleflight_total":
+                d = dict(labels)
+                flights.setdefault(d.get("key", ""), {"executed": 0, "coalesced": 0})[d.get("result", "executed")] += v
+        flight_rows = [{"key": k, "executed": int(v["executed"]), "coalesced": int(v["coalesced"])}
+                       for k, v in sorted(flights.items())]
+
+        error_rows = [{**dict(labels), "count": int(v)} for (n, labels), v in sorted(counters.items())
+                      if n == "gv_fetch_errors_total"]
+        return {"providers": providers, "caches": cache_rows, "flights": flight_rows, "errors": error_rows,
+                "uptime_s": time.time() - self.started}
+
+METRICS = Metrics()
+
+def record_http(provider: str, seconds: float, status, retries: int = 0):
+    """Satu request HTTP keluar; `status` = kode HTTP atau nama kelas error."""
+    METRICS.observe("gv_http_request_seconds", seconds, provider=provider)
+    METRICS.inc("gv_http_requests_total", provider=provider, status=status)
+    if retries:
+        METRICS.inc("gv_http_transport_retries_total", retries, provider=provider)
+
+def dump(path: str) -> str:
+    """Tulis teks Prometheus ke file (mis. untuk node_exporter textfile collector); atomik."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(METRICS.render())
+    os.replace(tmp, path)
+    return path
+
+_server = None
+_server_lock = threading.Lock()
+
+def serve(port: int = 9464, host: str = "127.0.0.1"):
+    """Endpoint `/metrics` di thread background proses ini (sekali per proses); return server."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                data = METRICS.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        srv = ThreadingHTTPServer((host, port), Handler)
+        srv.daemon_threads = True
+        threading.Thread(target=srv.serve_forever, daemon=True, name="gv-metrics").start()
+        _server = srv
+        return srv
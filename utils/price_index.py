@@ -0,0 +1,149 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Index harga historis ETH → IDR
+# =========================
+# Deret (unix_ts, harga) terurut di dua array NumPy. Lookup "as-of":
+# harga terakhir pada/sebelum waktu blok, lewat binary search
+# (np.searchsorted) — satu tx maupun jutaan baris sekaligus.
+
+PRICE_INDEX_PATH = os.getenv("GV_PRICE_INDEX_PATH") or os.path.join(CACHE_DIR, "eth_idr_history.npz")
+
+_EPOCH = pd.Timestamp("1970-01-01", tz="UTC")
+_MISSING = -(1 << 62)  # waktu tidak terbaca → selalu di luar jangkauan index
+
+def _to_unix(values) -> np.ndarray:
+    """Kolom waktu (unix detik/milidetik, atau string tanggal) → int64 unix detik."""
+    s = pd.Series(values)
+    # kolom string tanggal: lewati percobaan parse angka untuk seluruh kolom
+    looks_numeric = pd.api.types.is_numeric_dtype(s) or pd.to_numeric(s.head(100), errors="coerce").notna().all()
+    num = pd.to_numeric(s, errors="coerce") if looks_numeric else None
+    if num is not None and num.notna().all():
+        arr = num.to_numpy(dtype=np.float64)
+        if len(arr) and np.nanmax(arr) > 1e11:  # milidetik (mis. export CoinGecko)
+            arr = arr / 1000.0
+        return arr.astype(np.int64)
+    dt = pd.to_datetime(s, utc=True, errors="coerce", format="ISO8601")
+    secs = ((dt - _EPOCH).dt.total_seconds()).to_numpy(dtype=np.float64)
+    return np.where(np.isnan(secs), _MISSING, secs).astype(np.int64)
+
+class PriceIndex:
+    """Deret waktu harga ETH→IDR dengan lookup binary search."""
+
+    def __init__(self, ts=None, price=None, max_gap: float | None = 3 * 86400):
+        self.ts = np.asarray(ts if ts is not None else [], dtype=np.int64)
+        self.price = np.asarray(price if price is not None else [], dtype=np.float64)
+        # lebih jauh dari ini dari titik harga terdekat sebelumnya → dianggap tidak ada data
+        self.max_gap = max_gap
+        self._sort()
+
+    def _sort(self):
+        ok = np.isfinite(self.price) & (self.price > 0)
+        ts, price = self.ts[ok], self.price[ok]
+        order = np.argsort(ts, kind="stable")
+        ts, price = ts[order], price[order]
+        # timestamp duplikat: ambil yang terakhir dimuat
+        if len(ts):
+            last = np.append(ts[1:] != ts[:-1], True)
+            ts, price = ts[last], price[last]
+        self.ts, self.price = ts, price
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def span(self) -> tuple:
+        return (int(self.ts[0]), int(self.ts[-1])) if len(self) else (None, None)
+
+    def extend(self, ts, price):
+        """Tambah titik harga (bulk); array digabung lalu diurutkan ulang sekali."""
+        self.ts = np.concatenate([self.ts, np.asarray(ts, dtype=np.int64)])
+        self.price = np.concatenate([self.price, np.asarray(price, dtype=np.float64)])
+        self._sort()
+
+    @classmethod
+    def from_csv(cls, path, ts_col: str | None = None, price_col: str | None = None, **kwargs) -> "PriceIndex":
+        """
+        Muat dari CSV. Default kolom pertama = waktu (unix s/ms atau tanggal),
+        kolom kedua = harga ETH→IDR.
+        """
+        df = pd.read_csv(path)
+        ts_col = ts_col or df.columns[0]
+        price_col = price_col or df.columns[1]
+        return cls(_to_unix(df[ts_col]), pd.to_numeric(df[price_col], errors="coerce").to_numpy(), **kwargs)
+
+    @classmethod
+    def load(cls, path: str = PRICE_INDEX_PATH, **kwargs) -> "PriceIndex":
+        with np.load(path) as d:
+            return cls(d["ts"], d["price"], **kwargs)
+
+    def save(self, path: str = PRICE_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, ts=self.ts, price=self.price)
+        os.replace(tmp, path)
+
+    def prices_at(self, ts) -> np.ndarray:
+        """Harga as-of untuk array unix ts (vectorized); NaN kalau di luar jangkauan data."""
+        q = np.asarray(ts, dtype=np.int64)
+        if not len(self):
+            return np.full(q.shape, np.nan)
+        i = np.searchsorted(self.ts, q, side="right") - 1
+        ok = i >= 0
+        i = np.clip(i, 0, len(self.ts) - 1)
+        out = self.price[i]
+        if self.max_gap is not None:
+            ok &= (q - self.ts[i]) <= self.max_gap
+        return np.where(ok, out, np.nan)
+
+    def price_at(self, ts) -> float:
+        """Harga as-of untuk satu unix ts; NaN kalau tidak ada data."""
+        if ts is None or not len(self):
+            return float("nan")
+        return float(self.prices_at([int(ts)])[0])
+
+    def apply(self, df: pd.DataFrame, ts_col: str = "Timestamp", eth_col: str = "Estimated Fee (ETH)",
+              out_col: str = "Estimated Fee (Rp)", fallback_rate: float | None = None) -> pd.DataFrame:
+        """
+        Hitung ulang fee Rupiah per baris di kurs saat blok (in-place, vectorized).
+        Baris tanpa data harga pakai `fallback_rate` (atau dibiarkan apa adanya kalau None).
+        """
+        rates = self.prices_at(_to_unix(df[ts_col].to_numpy()))
+        if fallback_rate is not None:
+            rates = np.where(np.isnan(rates), float(fallback_rate), rates)
+        fee = pd.to_numeric(df[eth_col], errors="coerce").fillna(0).to_numpy(dtype=np.float64) * rates
+        if out_col in df.columns:
+            fee = np.where(np.isnan(fee), pd.to_numeric(df[out_col], errors="coerce").to_numpy(), fee)
+        df[out_col] = fee
+        return df
+
+_default: PriceIndex | None = None
+_default_lock = threading.Lock()
+
+def get_price_index() -> PriceIndex | None:
+    """Index default dari PRICE_INDEX_PATH; None kalau belum pernah dimuat/disimpan."""
+    global _default
+    if _default is None and os.path.exists(PRICE_INDEX_PATH):
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = PriceIndex.load()
+                except Exception:
+                    return None
+    return _default
+
+if __name__ == "__main__":
+    # python -m utils.price_index harga_eth_idr.csv [lainnya.csv ...]
+    import sys
+    idx = get_price_index() or PriceIndex()
+    for p in sys.argv[1:]:
+        other = PriceIndex.from_csv(p)
+        idx.extend(other.ts, other.price)
+        print(f"{p}: {len(other)} titik harga")
+    idx.save()
+    print(f"Total index: {len(idx)} titik {idx.span} → {PRICE_INDEX_PATH}")
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.http import http_get
+from utils.metrics import METRICS
+from utils.singleflight import SingleFlight
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Layanan kurs ETH → IDR bersama
+# =========================
+# Satu sumber kurs untuk fetcher, UI dan simulator:
+# - cache memori + disk (bertahan walau restart)
+# - stale-while-revalidate: nilai lama langsung dipakai, refresh jalan di background
+# - single-flight: saat cache habis, hanya satu refresh yang benar-benar ke provider
+# - semua provider ditanya paralel, nilai valid pertama yang menang
+
+RATE_CACHE_PATH = os.getenv("GV_RATE_CACHE_PATH") or os.path.join(CACHE_DIR, "eth_idr_rate.json")
+FRESH_TTL = float(os.getenv("GV_RATE_TTL", "600"))         # detik dianggap segar
+STALE_TTL = float(os.getenv("GV_RATE_STALE_TTL", "86400"))  # masih boleh dipakai sambil refresh
+FAIL_BACKOFF = 60.0                                         # detik tanpa refresh setelah semua provider gagal
+
+COINGECKO_URL = os.getenv("GV_COINGECKO_URL") or "https://api.coingecko.com/api/v3/simple/price"
+
+def _coingecko(timeout):
+    from utils.fetchers import get_rate_limiter
+    get_rate_limiter("coingecko").acquire()
+    r = http_get(
+        COINGECKO_URL,
+        params={"ids": "ethereum", "vs_currencies": "idr"},
+        timeout=timeout,
+        provider="coingecko",
+    )
+    r.raise_for_status()
+    return float(r.json()["ethereum"]["idr"])
+
+def _binance_x_exchangerate(timeout):
+    """Binance ETHUSDT × USD→IDR (exchangerate.host); dua leg diminta bersamaan."""
+    def eth_usd():
+        r = http_get("https://api.binance.com/api/v3/ticker/price",
+                     params={"symbol": "ETHUSDT"}, timeout=timeout)
+        r.raise_for_status()
+        return float(r.json()["price"])
+
+    def usd_idr():
+        r = http_get("https://api.exchangerate.host/latest",
+                     params={"base": "USD", "symbols": "IDR"}, timeout=timeout)
+        r.raise_for_status()
+        return float(r.json()["rates"]["IDR"])
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        a, b = ex.submit(eth_usd), ex.submit(usd_idr)
+        return a.result() * b.result()
+
+PROVIDERS = [
+    ("coingecko", _coingecko),
+    ("binance×exchangerate", _binance_x_exchangerate),
+]
+
+class RateService:
+    """Kurs ETH→IDR dengan cache memori/disk, SWR dan single-flight refresh."""
+
+    def __init__(self, path: str = RATE_CACHE_PATH, fresh_ttl: float = FRESH_TTL,
+                 stale_ttl: float = STALE_TTL, providers=None, timeout: float = 6):
+        self.path = path
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.providers = providers if providers is not None else PROVIDERS
+        self.timeout = timeout
+        self._value = 0.0
+        self._ts = 0.0
+        self._source = ""
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.providers)), thread_name_prefix="gv-rate")
+        self._load_disk()
+
+    # --- disk ---
+    def _load_disk(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                d = json.load(f)
+            v, ts = float(d.get("value") or 0), float(d.get("ts") or 0)
+            if v > 0:
+                self._value, self._ts, self._source = v, ts, d.get("source", "disk")
+        except Exception:
+            pass
+
+    def _save_disk(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"value": self._value, "ts": self._ts, "source": self._source}, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    # --- provider ---
+    def _query_providers(self, timeout: float | None = None) -> tuple[float, str]:
+        """Tanya semua provider paralel; return (kurs, nama_provider) valid pertama."""
+        timeout = timeout or self.timeout
+        futs = {self._pool.submit(fn, timeout): name for name, fn in self.providers}
+        for fut in as_completed(futs):
+            try:
+                v = float(fut.result())
+            except Exception as e:
+                METRICS.inc("gv_fetch_errors_total", provider=futs[fut], chain="", error=type(e).__name__)
+                continue
+            if v > 0:
+                for other in futs:
+                    other.cancel()
+                return v, futs[fut]
+        return 0.0, ""
+
+    def refresh(self, timeout: float | None = None) -> float:
+        """Refresh sekarang (single-flight); return kurs terbaru (0.0 kalau semua gagal & tanpa cache)."""
+        def do():
+            v, source = self._query_providers(timeout)
+            if v > 0:
+                with self._lock:
+                    self._value, self._ts, self._source = v, time.time(), source
+                self._save_disk()
+            else:
+                self._failed_at = time.time()
+            return self._value
+        return self._flight.do("eth_idr", do)
+
+    def _refresh_background(self):
+        if not self._flight.in_flight("eth_idr"):
+            threading.Thread(target=self._safe_refresh, daemon=True, name="gv-rate-refresh").start()
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass
+
+    def get(self, timeout: float | None = None) -> float:
+        """
+        Kurs ETH→IDR. Segar → langsung; basi → nilai lama + refresh background; kosong → tunggu refresh.
+        `timeout`: per provider untuk refresh sinkron (default `self.timeout`).
+        """
+        with self._lock:
+            v, age = self._value, time.time() - self._ts
+        if v > 0 and age < self.fresh_ttl:
+            return v
+        # semua provider baru saja gagal; jangan bombardir tiap call (basi maupun kosong)
+        backing_off = time.time() - self._failed_at < FAIL_BACKOFF
+        if v > 0 and age < self.stale_ttl:
+            if not backing_off:
+                self._refresh_background()
+            return v
+        if v <= 0 and backing_off:
+            return v
+        return self.refresh(timeout)
+
+    def invalidate(self):
+        """Tandai basi (mis. tombol refresh di UI); nilai lama tetap dipakai sampai refresh selesai."""
+        with self._lock:
+            if self._ts:
+                self._ts = min(self._ts, time.time() - self.fresh_ttl)
+
+    def info(self) -> dict:
+        return {"value": self._value, "age_s": time.time() - self._ts if self._ts else None,
+                "source": self._source, **self._flight.stats()}
+
+_default: RateService | None = None
+_default_lock = threading.Lock()
+
+def get_rate_service() -> RateService:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = RateService()
+    return _default
+
+def get_eth_idr_rate() -> float:
+    """Shortcut kurs ETH→IDR dari layanan bersama (0.0 kalau tidak ada data sama sekali)."""
+    return get_rate_service().get()
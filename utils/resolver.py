@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.fetchers import CHAINIDS, MISSES, NOT_FOUND_TTL, call_proxy
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Deteksi chain otomatis untuk tx hash
+# =========================
+# Mode multi-chain dulu mencoba tiap hash di tiap network (N×M lookup penuh),
+# padahal satu hash hanya ada di satu chain. Resolver memprobe chain dengan
+# satu call murah (eth_getTransactionByHash) secara paralel, berhenti di chain
+# pertama yang punya hash itu, lalu fetch penuh hanya di chain tersebut.
+# - urutan probe: hit rate per chain yang dipelajari (disimpan, bertahan restart)
+# - pemetaan hash → chain diingat, jadi lookup ulang tanpa probe sama sekali
+# - tx hasil probe diteruskan ke fetch_tx_raw_any (tidak diminta dua kali)
+# - probe yang kosong dicatat di cache negatif (fetchers.MISSES): selama TTL
+#   chain itu dilewati untuk hash tsb, jadi hash yang tidak ada di mana pun murah diulang
+
+RESOLVER_PATH = os.getenv("GV_RESOLVER_PATH") or os.path.join(CACHE_DIR, "chains.sqlite3")
+PROBE_PARALLEL = int(os.getenv("GV_PROBE_PARALLEL", "3"))  # chain yang diprobe bersamaan per hash
+CONFIDENT = 0.6         # hit rate chain teratas di atas ini → probe dia sendirian dulu
+AUTO_PREFIX = "auto:"   # network item job "auto:sepolia,base" = resolve di antara chain ini
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tx_chain (
+    tx_hash TEXT PRIMARY KEY,
+    network TEXT NOT NULL,
+    seen    REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chain_stats (
+    network TEXT PRIMARY KEY,
+    probes  INTEGER NOT NULL DEFAULT 0,
+    hits    INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+class ChainResolver:
+    """Hash → network dengan probe paralel berurutan hit rate; hasil & statistik disimpan di SQLite."""
+
+    def __init__(self, path: str = RESOLVER_PATH, parallel: int = PROBE_PARALLEL, max_workers: int = 16):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.parallel = max(1, parallel)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._map: dict = {}
+        self._stats: dict = {}   # network -> [probes, hits]
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gv-probe")
+        self.resolved = 0        # hash yang di-resolve lewat probe
+        self.remembered = 0      # hash yang sudah diketahui chain-nya (tanpa probe)
+        self.probes = 0
+        c = self._conn()
+        c.executescript(_SCHEMA)
+        self._stats = {net: [p, h] for net, p, h in c.execute("SELECT network, probes, hits FROM chain_stats")}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(tx_hash: str) -> str:
+        return (tx_hash or "").strip().lower()
+
+    # --- statistik ---
+
+    def hit_rate(self, network: str) -> float:
+        """Estimasi peluang hash ada di chain ini (Laplace: chain baru mulai di 0.5)."""
+        p, h = self._stats.get(network, (0, 0))
+        return (h + 1) / (p + 2)
+
+    def order(self, networks) -> list:
+        """Network diurutkan dari hit rate tertinggi (stabil untuk yang seri)."""
+        nets = list(dict.fromkeys(n.lower().strip() for n in networks))
+        return sorted(nets, key=lambda n: -self.hit_rate(n))
+
+    def _record(self, network: str, hit: bool):
+        with self._lock:
+            st = self._stats.setdefault(network, [0, 0])
+            st[0] += 1
+            st[1] += int(hit)
+            self.probes += 1
+        self._conn().execute(
+            "INSERT INTO chain_stats (network, probes, hits) VALUES (?, 1, ?) "
+            "ON CONFLICT(network) DO UPDATE SET probes=probes+1, hits=hits+excluded.hits",
+            (network, int(hit)))
+
+    # --- pemetaan hash → chain ---
+
+    def known(self, tx_hash: str) -> str | None:
+        key = self._key(tx_hash)
+        net = self._map.get(key)
+        if net is None:
+            row = self._conn().execute("SELECT network FROM tx_chain WHERE tx_hash=?", (key,)).fetchone()
+            if row:
+                net = self._map[key] = row[0]
+        return net
+
+    def remember(self, tx_hash: str, network: str):
+        key = self._key(tx_hash)
+        self._map[key] = network
+        self._conn().execute("INSERT OR REPLACE INTO tx_chain VALUES (?, ?, ?)", (key, network, time.time()))
+
+    # --- resolve ---
+
+    def _probe(self, tx_hash: str, network: str, api_key: str, throttle=None) -> dict | None:
+        chainid = CHAINIDS[network]
+        resp = call_proxy(chainid, network, api_key, "eth_getTransactionByHash",
+                          {"txhash": tx_hash.strip()}, throttle)
+        tx = resp.get("result") if isinstance(resp, dict) else None
+        hit = isinstance(tx, dict)
+        self._record(network, hit)
+        if not hit and isinstance(resp, dict) and "error" not in resp:
+            MISSES.put(chainid, tx_hash, "not_found", NOT_FOUND_TTL)
+        return tx if hit else None
+
+    @staticmethod
+    def _not_found(tx_hash: str, network: str) -> bool:
+        hit = MISSES.get(CHAINIDS[network], tx_hash)
+        return hit is not None and hit[0] == "not_found"
+
+    def resolve(self, tx_hash: str, networks, api_key: str, throttle=None) -> tuple[str | None, dict | None]:
+        """
+        (network, tx) untuk hash ini di antara `networks`; (None, None) hanya kalau semua chain menjawab
+        tidak ada. Probe yang gagal (jaringan/API) dan tidak ada chain lain yang cocok → error-nya di-raise.
+        `tx` None kalau chain sudah diketahui tanpa probe (fetch biasa akan memintanya).
+        """
+        nets = self.order(n for n in networks if n.lower().strip() in CHAINIDS)
+        known = self.known(tx_hash)
+        if known is not None and known in nets:
+            with self._lock:
+                self.remembered += 1
+            return known, None
+        if len(nets) == 1:
+            return nets[0], None  # tidak ada pilihan: fetch langsung, tanpa probe
+        # chain yang baru saja dicek kosong untuk hash ini tidak diprobe lagi (sampai TTL habis)
+        nets = [n for n in nets if not self._not_found(tx_hash, n)]
+        if not nets:
+            return None, None
+
+        pending, queue, errors = {}, list(nets), []
+        # chain teratas hampir selalu benar → cukup satu probe; selain itu beberapa sekaligus
+        width = 1 if self.hit_rate(nets[0]) >= CONFIDENT else self.parallel
+        try:
+            while queue or pending:
+                # jaga `width` probe berjalan, diisi dari chain dengan hit rate tertinggi
+                while queue and len(pending) < width:
+                    net = queue.pop(0)
+                    pending[self._pool.submit(self._probe, tx_hash, net, api_key, throttle)] = net
+                width = self.parallel
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    net = pending.pop(fut)
+                    try:
+                        tx = fut.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    if tx is not None:
+                        self.remember(tx_hash, net)
+                        with self._lock:
+                            self.resolved += 1
+                        return net, tx
+        finally:
+            for fut in pending:
+                fut.cancel()
+        if errors:
+            # ada chain yang gagal diprobe: hash bisa saja di sana, jadi bukan "tidak ditemukan"
+            raise errors[0]
+        return None, None
+
+    def resolve_many(self, hashes, networks, api_key: str, max_workers: int = 8, on_result=None) -> dict:
+        """{tx_hash: (network|None, tx|None|Exception)}; `on_result(h, net, tx)` dipanggil per hash selesai."""
+        hashes = list(dict.fromkeys(hashes))
+        out = {}
+
+        def one(h):
+            try:
+                return self.resolve(h, networks, api_key)
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(hashes) or 1))) as ex:
+            for h, (net, tx) in zip(hashes, ex.map(one, hashes)):
+                out[h] = (net, tx)
+                if on_result is not None:
+                    on_result(h, net, tx)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "resolved": self.resolved, "remembered": self.remembered, "probes": self.probes,
+            "hit_rate": {n: round(self.hit_rate(n), 3) for n in self.order(self._stats)},
+        }
+
+_default: ChainResolver | None = None
+_default_lock = threading.Lock()
+
+def get_chain_resolver() -> ChainResolver:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = ChainResolver()
+    return _default
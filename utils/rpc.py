@@ -0,0 +1,150 @@
+from utils.http import http_post
+from utils.fetchers import BLOCK_HEADERS, CHAINIDS, _build_payload, _hex_to_int, _reprice, fetch_eth_idr_rate, lookup_4byte_many
+from utils.txcache import get_tx_cache
+
+# =========================
+# Backend JSON-RPC langsung (batch)
+# =========================
+
+RPC_URLS = {
+    "Sepolia": "https://sepolia.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
+    "Goerli": "https://goerli.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
+    "Polygon Mumbai": "https://polygon-mumbai.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206",
+    "Arbitrum Sepolia": "https://arbitrum-sepolia.infura.io/v3/f8d248f838ec4f12b0f01efd2b238206"
+}
+
+MAX_BATCH = 100  # banyak provider membatasi ukuran batch; pecah kalau lebih
+
+class RpcError(RuntimeError):
+    """Error level JSON-RPC (bukan HTTP)."""
+
+def rpc_batch(url: str, calls: list, timeout: float | None = None) -> list:
+    """
+    Kirim banyak call JSON-RPC dalam satu (atau beberapa) POST batch.
+
+    `calls`: list of (method, params). Return list hasil dengan urutan sama;
+    item yang error berisi instance RpcError (tidak raise, biar batch lain tetap jalan).
+    """
+    out = []
+    for start in range(0, len(calls), MAX_BATCH):
+        chunk = calls[start:start + MAX_BATCH]
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": list(params)}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        r = http_post(url, json=payload, timeout=timeout, provider="rpc")
+        r.raise_for_status()
+        try:
+            data = r.json()
+        except ValueError:
+            raise RpcError(f"RPC non-JSON response: {r.text[:200]}")
+        if isinstance(data, dict):
+            # sebagian node membalas satu objek error untuk seluruh batch
+            err = data.get("error") or data
+            raise RpcError(f"RPC batch ditolak: {err}")
+
+        by_id = {item.get("id"): item for item in data if isinstance(item, dict)}
+        for i, (method, _) in enumerate(chunk):
+            item = by_id.get(i)
+            if item is None:
+                out.append(RpcError(f"{method}: tidak ada balasan di batch"))
+            elif item.get("error"):
+                out.append(RpcError(f"{method}: {item['error']}"))
+            else:
+                out.append(item.get("result"))
+    return out
+
+def fetch_many_rpc(
+    tx_hashes: list,
+    rpc_url: str,
+    network: str = "sepolia",
+    eth_idr_rate: float | None = None,
+    timeout: float | None = None,
+    use_cache: bool = True,
+    price_index=None,
+) -> dict:
+    """
+    Ambil banyak tx lewat JSON-RPC: 1 batch tx+receipt untuk semua hash,
+    lalu 1 batch header block (deduplikasi, tanpa body transaksi).
+
+    Return {tx_hash: payload | Exception}; payload sama dengan fetch_tx_raw_any.
+    """
+    network_key = (network or "sepolia").lower().strip()
+    hashes = [h.strip() for h in tx_hashes if h and h.strip()]
+    if not hashes:
+        return {}
+
+    chainid = CHAINIDS.get(network_key)
+    cache = get_tx_cache() if (use_cache and chainid is not None) else None
+    cached = cache.get_many(chainid, hashes) if cache is not None else {}
+    todo = [h for h in hashes if h not in cached]
+    if cached and eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+
+    # --- Batch 1: tx + receipt (hanya yang belum ada di cache) ---
+    calls = []
+    for h in todo:
+        calls.append(("eth_getTransactionByHash", [h]))
+        calls.append(("eth_getTransactionReceipt", [h]))
+    res = rpc_batch(rpc_url, calls, timeout=timeout) if calls else []
+
+    out = {h: _reprice(p, h, eth_idr_rate, price_index) for h, p in cached.items()}
+    found = {}
+    for k, h in enumerate(todo):
+        tx, rcpt = res[2 * k], res[2 * k + 1]
+        if isinstance(tx, Exception) or isinstance(rcpt, Exception):
+            out[h] = tx if isinstance(tx, Exception) else rcpt
+        elif not isinstance(tx, dict):
+            out[h] = RuntimeError(f"tx: invalid result -> {tx}")
+        elif not isinstance(rcpt, dict):
+            out[h] = RuntimeError(f"receipt: invalid result -> {rcpt}")
+        else:
+            found[h] = (tx, rcpt)
+
+    # --- Batch 2: header block unik yang belum ada di cache header ---
+    block_key = chainid if chainid is not None else network_key
+    numbers = sorted({_hex_to_int(tx.get("blockNumber"), 0) for tx, _ in found.values()})
+    blocks = BLOCK_HEADERS.get_many(block_key, numbers)
+    missing = [n for n in numbers if n not in blocks]
+    if missing:
+        res = rpc_batch(rpc_url, [("eth_getBlockByNumber", [hex(n), False]) for n in missing], timeout=timeout)
+        fetched = dict(zip(missing, res))
+        BLOCK_HEADERS.put_many(block_key, {n: b for n, b in fetched.items() if isinstance(b, dict)})
+        blocks.update(fetched)
+
+    if found and eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+
+    # decode semua selector unik sekali jalan (index lokal, remote hanya untuk miss)
+    selectors = {(tx.get("input") or "0x")[:10] for tx, _ in found.values()}
+    lookup_4byte_many([m for m in selectors if len(m) == 10])
+
+    for h, (tx, rcpt) in found.items():
+        blk = blocks.get(_hex_to_int(tx.get("blockNumber"), 0))
+        if isinstance(blk, Exception):
+            out[h] = blk
+        elif not isinstance(blk, dict):
+            out[h] = RuntimeError(f"block: invalid result -> {blk}")
+        else:
+            try:
+                out[h] = _build_payload(tx, rcpt, blk, network_key, h, eth_idr_rate, price_index)
+            except Exception as e:
+                out[h] = e
+    if cache is not None:
+        cache.put_many(chainid, [(h, out[h]) for h in found if isinstance(out[h], dict)])
+    return {h: out[h] for h in hashes}
+
+def fetch_tx_raw_rpc(
+    tx_hash: str,
+    rpc_url: str,
+    network: str = "sepolia",
+    eth_idr_rate: float | None = None,
+    price_index=None,
+) -> dict:
+    """Versi satu hash dari fetch_many_rpc; raise kalau gagal (seperti fetch_tx_raw_any)."""
+    res = fetch_many_rpc([tx_hash], rpc_url, network=network, eth_idr_rate=eth_idr_rate,
+                         price_index=price_index)
+    val = res.get(tx_hash.strip())
+    if isinstance(val, Exception):
+        raise val
+    return val
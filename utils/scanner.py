@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+
+from utils.fetchers import (
+    CHAINIDS, _build_payload, _hex_to_int, call_etherscan,
+    fetch_eth_idr_rate, lookup_4byte_many, to_standard_row,
+)
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Gas tracker inkremental per alamat (kontrak / wallet)
+# =========================
+# Tiap run hanya memindai block baru: high-water mark (block terakhir yang
+# sudah diproses) disimpan per (network, alamat). Baris hasil to_standard_row
+# ditambahkan ke file JSONL append-only per network.
+
+SCAN_DIR = os.getenv("GV_SCAN_DIR") or os.path.join(CACHE_DIR, "scans")
+
+class ScanStore:
+    """High-water mark per (network, alamat) di SQLite + baris JSONL append-only per network."""
+
+    def __init__(self, root: str = SCAN_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS hwm ("
+            " network TEXT NOT NULL, address TEXT NOT NULL, block INTEGER NOT NULL,"
+            " PRIMARY KEY (network, address)) WITHOUT ROWID"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, "state.sqlite3"), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def rows_path(self, network: str) -> str:
+        return os.path.join(self.root, f"{network}.jsonl")
+
+    def get_hwm(self, network: str, address: str) -> int | None:
+        row = self._conn().execute(
+            "SELECT block FROM hwm WHERE network=? AND address=?", (network, address.lower())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_hwm(self, network: str, addresses, block: int):
+        self._conn().executemany(
+            "INSERT INTO hwm VALUES (?, ?, ?) ON CONFLICT(network, address) "
+            "DO UPDATE SET block=MAX(block, excluded.block)",
+            [(network, a.lower(), int(block)) for a in addresses],
+        )
+
+    def append(self, network: str, rows: list):
+        """Tambah baris ke JSONL (fsync) sebelum high-water mark dimajukan."""
+        if not rows:
+            return
+        with open(self.rows_path(network), "a", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_rows(self, network: str):
+        path = self.rows_path(network)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def _start_blocks(store: ScanStore, network: str, addresses, start_block: int) -> dict:
+    """Block awal per alamat: hwm+1, atau `start_block` untuk alamat baru."""
+    out = {}
+    for a in addresses:
+        hwm = store.get_hwm(network, a)
+        out[a.lower()] = (hwm + 1) if hwm is not None else start_block
+    return out
+
+# --- Backend Etherscan account/txlist ---
+
+TXLIST_PAGE = 1000
+TXLIST_MAX = 10000  # Etherscan: page × offset maksimal per query
+
+def _etherscan_call(network_key: str, params: dict, api_key: str):
+    # limiter + retry/backoff (termasuk 429) sama dengan call_proxy
+    return call_etherscan(network_key, api_key, params)
+
+def _payload_from_txlist(t: dict, network_key: str, eth_idr_rate, price_index=None) -> dict:
+    status_ok = t.get("isError", "0") == "0" and t.get("txreceipt_status", "1") in ("1", "")
+    tx = {
+        "to": t.get("to") or t.get("contractAddress") or "",
+        "from": t.get("from") or "",
+        "blockNumber": hex(int(t["blockNumber"])),
+        "gasPrice": hex(int(t.get("gasPrice") or 0)),
+        "input": t.get("input") or "0x",
+    }
+    rcpt = {"gasUsed": hex(int(t.get("gasUsed") or 0)), "status": "0x1" if status_ok else "0x0"}
+    blk = {"timestamp": hex(int(t["timeStamp"]))}
+    return _build_payload(tx, rcpt, blk, network_key, t["hash"], eth_idr_rate, price_index,
+                          function_name=t.get("functionName") or None)
+
+def _txlist(address: str, network_key: str, api_key: str, start: int, end: int):
+    """
+    Semua tx alamat di [start, end], urut naik; paginasi geser startblock (batas 10k hasil Etherscan).
+    Halaman penuh yang seluruhnya di satu block dilanjutkan dengan `page` di block itu saja.
+    """
+    chainid = CHAINIDS[network_key]
+
+    def page_of(lo: int, hi: int, page: int = 1) -> list:
+        try:
+            resp = _etherscan_call(network_key, {
+                "module": "account", "action": "txlist", "chainid": chainid, "address": address,
+                "startblock": lo, "endblock": hi, "page": page, "offset": TXLIST_PAGE, "sort": "asc",
+            }, api_key)
+        except RuntimeError as e:
+            if "No transactions found" in str(e):
+                return []
+            raise
+        return resp.get("result") or []
+
+    seen = set()
+    cur = start
+    while cur <= end:
+        items = page_of(cur, end)
+        for t in items:
+            if t.get("hash") not in seen:
+                seen.add(t.get("hash"))
+                yield t
+        if len(items) < TXLIST_PAGE:
+            return
+        last = int(items[-1]["blockNumber"])
+        if last > cur:
+            cur = last  # block `last` bisa terpotong: ulang dari awalnya (duplikat dibuang lewat `seen`)
+            continue
+        # satu halaman penuh di dalam block `cur`: startblock tidak bisa digeser, pakai `page`
+        page = 2
+        while len(items) == TXLIST_PAGE:
+            if page * TXLIST_PAGE > TXLIST_MAX:
+                raise RuntimeError(f"txlist: lebih dari {TXLIST_MAX} tx {address} di block {cur}")
+            items = page_of(cur, cur, page)
+            for t in items:
+                if t.get("hash") not in seen:
+                    seen.add(t.get("hash"))
+                    yield t
+            page += 1
+        cur += 1
+
+def scan_etherscan(addresses, network: str, api_key: str, store: ScanStore | None = None,
+                   confirmations: int = 12, start_block: int = 0, eth_idr_rate: float | None = None,
+                   price_index=None) -> dict:
+    """Satu putaran scan lewat Etherscan `account/txlist`; hanya block setelah high-water mark."""
+    store = store or ScanStore()
+    network_key = network.lower().strip()
+    chainid = CHAINIDS[network_key]
+    head = _hex_to_int(_etherscan_call(
+        network_key, {"module": "proxy", "action": "eth_blockNumber", "chainid": chainid}, api_key
+    ).get("result"), 0)
+    end = head - confirmations
+    if eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+
+    stats = {"network": network_key, "to_block": end, "rows": 0}
+    seen = set()
+    for addr, start in _start_blocks(store, network_key, addresses, start_block).items():
+        if start > end:
+            continue
+        items = list(_txlist(addr, network_key, api_key, start, end))
+        lookup_4byte_many({(t.get("input") or "")[:10] for t in items
+                           if not t.get("functionName") and len(t.get("input") or "") >= 10})
+        rows = []
+        for t in items:
+            if t["hash"] in seen:
+                continue  # tx antar dua alamat yang sama-sama dilacak
+            seen.add(t["hash"])
+            rows.append(to_standard_row(_payload_from_txlist(t, network_key, eth_idr_rate, price_index)))
+        store.append(network_key, rows)
+        store.set_hwm(network_key, [addr], end)
+        stats["rows"] += len(rows)
+    return stats
+
+# --- Backend JSON-RPC (walk block range) ---
+
+def scan_rpc(addresses, rpc_url: str, network: str, store: ScanStore | None = None,
+             confirmations: int = 12, start_block: int | None = None, batch_blocks: int = 50,
+             max_blocks: int | None = None, eth_idr_rate: float | None = None, price_index=None) -> dict:
+    """
+    Satu putaran scan lewat JSON-RPC: block penuh diambil per batch, tx yang
+    from/to-nya alamat terlacak diambil receipt-nya (batch), lalu ditulis.
+    `start_block` default = head - confirmations (alamat baru mulai dari sekarang).
+    """
+    from utils.rpc import rpc_batch
+
+    store = store or ScanStore()
+    network_key = network.lower().strip()
+    head = _hex_to_int(rpc_batch(rpc_url, [("eth_blockNumber", [])])[0], 0)
+    end = head - confirmations
+    starts = _start_blocks(store, network_key, addresses, end if start_block is None else start_block)
+    begin = min(starts.values()) if starts else end + 1
+    if max_blocks is not None:
+        end = min(end, begin + max_blocks - 1)
+    if eth_idr_rate is None:
+        eth_idr_rate = fetch_eth_idr_rate()
+
+    stats = {"network": network_key, "from_block": begin, "to_block": end, "rows": 0, "blocks": 0}
+    for lo in range(begin, end + 1, batch_blocks):
+        hi = min(end, lo + batch_blocks - 1)
+        blocks = rpc_batch(rpc_url, [("eth_getBlockByNumber", [hex(n), True]) for n in range(lo, hi + 1)])
+        matched = []
+        for blk in blocks:
+            if not isinstance(blk, dict):
+                raise RuntimeError(f"block: invalid result -> {blk}")
+            num = _hex_to_int(blk.get("number"), 0)
+            for tx in blk.get("transactions") or []:
+                for party in ((tx.get("from") or "").lower(), (tx.get("to") or "").lower()):
+                    if party in starts and num >= starts[party]:
+                        matched.append((tx, blk))
+                        break
+
+        rows = []
+        if matched:
+            rcpts = rpc_batch(rpc_url, [("eth_getTransactionReceipt", [tx["hash"]]) for tx, _ in matched])
+            lookup_4byte_many({(tx.get("input") or "")[:10] for tx, _ in matched
+                               if len(tx.get("input") or "") >= 10})
+            for (tx, blk), rcpt in zip(matched, rcpts):
+                if not isinstance(rcpt, dict):
+                    raise RuntimeError(f"receipt: invalid result -> {rcpt}")
+                payload = _build_payload(tx, rcpt, blk, network_key, tx["hash"], eth_idr_rate, price_index)
+                rows.append(to_standard_row(payload))
+        store.append(network_key, rows)
+        store.set_hwm(network_key, list(starts), hi)
+        stats["rows"] += len(rows)
+        stats["blocks"] += hi - lo + 1
+    return stats
+
+if __name__ == "__main__":
+    # python -m utils.scanner -n sepolia -a 0xKontrak -a 0xWallet [--rpc-url URL]
+    ap = argparse.ArgumentParser(description="Scan inkremental gas per alamat → JSONL append-only")
+    ap.add_argument("-n", "--network", required=True)
+    ap.add_argument("-a", "--address", action="append", required=True)
+    ap.add_argument("--rpc-url", help="pakai JSON-RPC (default: Etherscan account/txlist)")
+    ap.add_argument("--api-key", default=os.getenv("ETHERSCAN_API_KEY"))
+    ap.add_argument("--confirmations", type=int, default=12)
+    ap.add_argument("--start-block", type=int, help="block awal untuk alamat yang belum pernah discan")
+    ap.add_argument("--max-blocks", type=int, help="batas block per run (backend RPC)")
+    args = ap.parse_args()
+
+    if args.rpc_url:
+        res = scan_rpc(args.address, args.rpc_url, args.network, confirmations=args.confirmations,
+                       start_block=args.start_block, max_blocks=args.max_blocks)
+    else:
+        if not args.api_key:
+            ap.error("ETHERSCAN_API_KEY belum diset (env atau --api-key)")
+        res = scan_etherscan(args.address, args.network, args.api_key, confirmations=args.confirmations,
+                             start_block=args.start_block or 0)
+    print(json.dumps(res), file=sys.stderr)
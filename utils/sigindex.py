@@ -0,0 +1,217 @@
+import os
+import re
+import sys
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.txcache import CACHE_DIR
+
+# =========================
+# Index signature 4-byte offline
+# =========================
+# Selector disimpan sebagai INTEGER (4 byte) → index kecil & lookup cepat.
+# Lapisan pertama dict in-memory (microseconds), lapisan kedua SQLite,
+# API 4byte.directory hanya dipanggil kalau miss, lalu hasilnya ditulis balik.
+
+SIG_INDEX_PATH = os.getenv("GV_SIG_INDEX_PATH") or os.path.join(CACHE_DIR, "signatures.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sig (
+    selector  INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+def _selector_int(method_id: str) -> int | None:
+    s = (method_id or "").strip().lower()
+    if s.startswith("0x"):
+        s = s[2:]
+    if len(s) < 8:
+        return None
+    try:
+        return int(s[:8], 16)
+    except ValueError:
+        return None
+
+def _name(signature: str) -> str:
+    return signature.split("(")[0] if signature else ""
+
+class SignatureIndex:
+    """Index selector → text signature (mis. 0xa9059cbb → transfer(address,uint256))."""
+
+    def __init__(self, path: str = SIG_INDEX_PATH):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._local = threading.local()
+        self._mem: dict[int, str] = {}
+        with self._conn() as c:
+            c.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sig").fetchone()[0]
+
+    def get(self, method_id: str) -> str | None:
+        """Text signature lengkap atau None kalau belum ada di index."""
+        key = _selector_int(method_id)
+        if key is None:
+            return None
+        sig = self._mem.get(key)
+        if sig is None:
+            row = self._conn().execute("SELECT signature FROM sig WHERE selector=?", (key,)).fetchone()
+            if row is None:
+                return None
+            sig = self._mem[key] = row[0]
+        return sig
+
+    def get_many(self, method_ids) -> dict:
+        """Return {method_id: signature} untuk yang ada di index, satu query per 500 selector."""
+        keys = {}
+        for m in method_ids:
+            k = _selector_int(m)
+            if k is not None:
+                keys.setdefault(k, []).append(m)
+        out, todo = {}, []
+        for k, ms in keys.items():
+            sig = self._mem.get(k)
+            if sig is None:
+                todo.append(k)
+            else:
+                out.update({m: sig for m in ms})
+        for start in range(0, len(todo), 500):
+            chunk = todo[start:start + 500]
+            q = "SELECT selector, signature FROM sig WHERE selector IN (%s)" % ",".join("?" * len(chunk))
+            for k, sig in self._conn().execute(q, chunk):
+                self._mem[k] = sig
+                out.update({m: sig for m in keys[k]})
+        return out
+
+    def put_many(self, items, overwrite: bool = False) -> int:
+        """Tulis banyak (method_id, signature). Default: signature yang sudah ada tidak ditimpa."""
+        rows = []
+        for m, sig in items:
+            k = _selector_int(m)
+            if k is not None and sig:
+                rows.append((k, sig.strip()))
+        if not rows:
+            return 0
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            before = c.total_changes
+            c.executemany(f"{verb} INTO sig VALUES (?, ?)", rows)
+            n = c.total_changes - before
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        if overwrite:
+            for k, _ in rows:
+                self._mem.pop(k, None)
+        return n
+
+    def bulk_import(self, path: str, overwrite: bool = False, batch: int = 50_000) -> int:
+        """
+        Import dump signature. Format yang dikenali:
+        - JSON: list of {"hex_signature", "text_signature"} (export 4byte.directory)
+          atau object {"0xa9059cbb": "transfer(address,uint256)"}
+        - teks per baris: `0xa9059cbb,transfer(...)` / `a9059cbb<TAB>transfer(...)` / `a9059cbb transfer(...)`
+        - folder ala ethereum-lists/4bytes: nama file = selector, isi = signature (pisah ';')
+        """
+        if os.path.isdir(path):
+            return self.put_many(self._iter_dir(path), overwrite=overwrite)
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("results", data)
+            items = (data.items() if isinstance(data, dict)
+                     else ((d.get("hex_signature"), d.get("text_signature")) for d in data))
+            return self.put_many(items, overwrite=overwrite)
+
+        total, buf = 0, []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                item = self._parse_line(line)
+                if item:
+                    buf.append(item)
+                if len(buf) >= batch:
+                    total += self.put_many(buf, overwrite=overwrite)
+                    buf = []
+        return total + self.put_many(buf, overwrite=overwrite)
+
+    @staticmethod
+    def _parse_line(line: str):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return None
+        parts = re.split(r"[,\t ]", line, maxsplit=1)  # selector tidak pernah berisi pemisah
+        if len(parts) != 2:
+            return None
+        sel, sig = parts[0].strip(), parts[1].strip().strip('"')
+        if sel.lower() in ("selector", "hex_signature", "id"):
+            return None  # header CSV
+        return sel, sig
+
+    @staticmethod
+    def _iter_dir(path: str):
+        for name in os.listdir(path):
+            if _selector_int(name) is None:
+                continue
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                sig = f.read().split(";")[0].strip()
+            yield name, sig
+
+    def lookup_many(self, method_ids, remote=None, max_workers: int = 4) -> dict:
+        """
+        Batch lookup {method_id: nama_fungsi}. Miss dicari ke `remote(method_id)`
+        (paralel) lalu ditulis balik; yang tetap tidak ketemu dikembalikan apa adanya.
+        """
+        ids = [m for m in dict.fromkeys(method_ids) if m]
+        hit = self.get_many(ids)
+        out = {m: _name(sig) for m, sig in hit.items()}
+        misses = [m for m in ids if m not in hit]
+        if misses and remote is not None:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as ex:
+                found = dict(zip(misses, ex.map(remote, misses)))
+            self.put_many([(m, v) for m, v in found.items() if v and v != m])
+            out.update({m: _name(v) if v else m for m, v in found.items()})
+        for m in ids:
+            out.setdefault(m, m)
+        return out
+
+_default: SignatureIndex | None = None
+_default_lock = threading.Lock()
+
+def get_sig_index() -> SignatureIndex | None:
+    """Index default per proses; None kalau tidak bisa dibuka (mis. disk read-only)."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = SignatureIndex()
+                except Exception:
+                    return None
+    return _default
+
+if __name__ == "__main__":
+    # python -m utils.sigindex dump1.csv [dump2.json ...]
+    idx = SignatureIndex()
+    for p in sys.argv[1:]:
+        n = idx.bulk_import(p)
+        print(f"{p}: {n} signature baru")
+    print(f"Total index: {len(idx)} selector → {idx.path}")
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+# =========================
+# Single-flight: gabungkan call identik yang sedang berjalan
+# =========================
+
+class _Call:
+    __slots__ = ("done", "value", "error", "waiters", "loop", "future")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+        self.loop = None     # event loop pemilik kalau call dijalankan lewat do_async
+        self.future = None   # sinyal selesai untuk penumpang di loop yang sama
+
+class SingleFlight:
+    """
+    `do(key, fn)`: kalau call dengan key sama sedang jalan, tunggu hasilnya
+    (atau error-nya) alih-alih memanggil `fn` lagi. Aman lintas thread.
+    `do_async(key, fn)`: sama, untuk coroutine; key dibagi dengan `do`, jadi
+    call sinkron & async yang identik tetap digabung.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+        self.calls = 0      # call yang benar-benar dieksekusi
+        self.coalesced = 0  # call yang menumpang hasil call lain
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                owner = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                owner = True
+
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """`fn()` mengembalikan coroutine; penumpang menunggu tanpa memblokir event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                owner = False
+            else:
+                call = self._calls[key] = _Call()
+                call.loop, call.future = loop, loop.create_future()
+                self.calls += 1
+                owner = True
+
+        if not owner:
+            if call.future is not None and call.loop is loop:
+                await asyncio.shield(call.future)
+            elif not call.done.is_set():
+                # pemilik di thread / loop lain
+                await asyncio.to_thread(call.done.wait)
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = await fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            call.future.set_result(None)
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
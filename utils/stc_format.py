@@ -0,0 +1,150 @@
+import sys
+import time
+import pandas as pd
+from datetime import datetime
+
+# =========================
+# Konversi CSV ke format STC Analytics
+# =========================
+
+COLUMNS_UPPER = [
+    'Timestamp','Network','Tx Hash','Contract','Function','Block',
+    'Gas Used','Gas Price (Gwei)','Estimated Fee (ETH)','Estimated Fee (Rp)','Status'
+]
+
+TEXT_COLUMNS = ['Timestamp','Network','Tx Hash','Contract','Function','Status']
+INT_COLUMNS = ['Block','Gas Used']
+FLOAT_COLUMNS = ['Gas Price (Gwei)','Estimated Fee (ETH)','Estimated Fee (Rp)']
+
+# Normalisasi nama kolom berbagai kemungkinan (urutan = prioritas kalau ada beberapa alias)
+RENAME_MAP = {
+    'timestamp':'Timestamp', 'Timestamp':'Timestamp',
+    'network':'Network', 'Network':'Network',
+    'tx_hash':'Tx Hash', 'Tx Hash':'Tx Hash', 'TxHash':'Tx Hash', 'Hash':'Tx Hash',
+    'contract':'Contract', 'Contract':'Contract', 'To':'Contract',
+    'function_name':'Function', 'Function':'Function',
+    'block_number':'Block', 'Block':'Block',
+    'gas_used':'Gas Used', 'Gas Used':'Gas Used',
+    'Gas Price (Gwei)':'Gas Price (Gwei)', 'gas_price_gwei':'Gas Price (Gwei)',
+    'gas_price_wei':'gas_price_wei',  # dikonversi ke Gwei kalau kolom Gwei tidak ada
+    'cost_eth':'Estimated Fee (ETH)', 'Estimated Fee (ETH)':'Estimated Fee (ETH)',
+    'cost_idr':'Estimated Fee (Rp)', 'Estimated Fee (Rp)':'Estimated Fee (Rp)',
+    'status':'Status', 'Status':'Status'
+}
+
+def _resolve_columns(columns) -> dict:
+    """{kolom_sumber: kolom_target}; satu sumber per target (alias pertama yang ada menang)."""
+    present = set(columns)
+    out, taken = {}, set()
+    for src, dst in RENAME_MAP.items():
+        if src in present and dst not in taken:
+            out[src] = dst
+            taken.add(dst)
+    return out
+
+def _source_dtypes(mapping: dict) -> dict:
+    """Dtype eksplisit saat baca CSV: kolom teks sebagai str, angka di-parse belakangan."""
+    return {src: str for src, dst in mapping.items() if dst in TEXT_COLUMNS}
+
+def _normalize(df: pd.DataFrame, mapping: dict, now_str: str) -> pd.DataFrame:
+    """Normalisasi satu frame/chunk yang kolomnya sudah dipilih lewat `mapping`."""
+    n = len(df)
+    out = {}
+    src_of = {dst: src for src, dst in mapping.items()}
+
+    for c in TEXT_COLUMNS:
+        if c in src_of:
+            out[c] = df[src_of[c]].fillna('').astype(str)
+        else:
+            default = {'Timestamp': now_str, 'Function': 'manual-entry', 'Status': 'Unknown'}.get(c, '')
+            out[c] = pd.Series([default] * n, index=df.index, dtype=object)
+
+    def numeric(col):
+        return pd.to_numeric(df[src_of[col]], errors='coerce').fillna(0)
+
+    for c in INT_COLUMNS:
+        out[c] = numeric(c).astype('int64') if c in src_of else pd.Series(0, index=df.index, dtype='int64')
+
+    # Gas Price: prioritas pakai kolom Gwei; kalau tidak ada tapi ada Wei -> konversi
+    if 'Gas Price (Gwei)' in src_of:
+        out['Gas Price (Gwei)'] = numeric('Gas Price (Gwei)').astype('float64')
+    elif 'gas_price_wei' in src_of:
+        out['Gas Price (Gwei)'] = numeric('gas_price_wei').astype('float64') / 1e9
+    else:
+        out['Gas Price (Gwei)'] = pd.Series(0.0, index=df.index)
+
+    for c in FLOAT_COLUMNS[1:]:
+        out[c] = numeric(c).astype('float64') if c in src_of else pd.Series(0.0, index=df.index)
+
+    return pd.DataFrame(out, index=df.index)[COLUMNS_UPPER]
+
+def convert_to_stc_format(df_raw: pd.DataFrame) -> pd.DataFrame:
+    mapping = _resolve_columns(df_raw.columns)
+    return _normalize(df_raw, mapping, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+def _parquet_writer(dst, df: pd.DataFrame):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    return pq.ParquetWriter(dst, schema, compression="zstd"), schema
+
+def convert_csv_to_stc(src, dst, chunksize: int = 200_000, on_progress=None, fmt: str = "csv") -> dict:
+    """
+    Konversi CSV besar ke format STC secara streaming (memori dibatasi `chunksize`).
+
+    `src`/`dst`: path atau file-like. Hanya kolom yang dikenali yang dibaca.
+    `fmt`: "csv" atau "parquet" (satu row group per chunk).
+    `on_progress(rows, rows_per_s)` dipanggil tiap chunk selesai.
+    Return {"rows", "seconds", "rows_per_s"}.
+    """
+    header = pd.read_csv(src, nrows=0).columns
+    if hasattr(src, "seek"):
+        src.seek(0)
+    mapping = _resolve_columns(header)
+    now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    t0 = time.perf_counter()
+    rows = 0
+    reader = pd.read_csv(
+        src,
+        usecols=list(mapping) or [header[0]],
+        dtype=_source_dtypes(mapping),
+        chunksize=chunksize,
+        low_memory=False,
+    )
+    writer = None
+    try:
+        for i, chunk in enumerate(reader):
+            out = _normalize(chunk, mapping, now_str)
+            if fmt == "parquet":
+                import pyarrow as pa
+                if writer is None:
+                    writer, schema = _parquet_writer(dst, out)
+                writer.write_table(pa.Table.from_pandas(out, schema=schema, preserve_index=False))
+            else:
+                out.to_csv(dst, index=False, header=(i == 0), mode="w" if i == 0 else "a")
+            rows += len(out)
+            if on_progress is not None:
+                dt = time.perf_counter() - t0
+                on_progress(rows, rows / dt if dt else 0.0)
+        if rows == 0:
+            empty = _normalize(pd.DataFrame(), {}, now_str)
+            if fmt == "parquet":
+                if writer is None:
+                    writer, _ = _parquet_writer(dst, empty)
+            else:
+                empty.to_csv(dst, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    dt = time.perf_counter() - t0
+    return {"rows": rows, "seconds": dt, "rows_per_s": rows / dt if dt else 0.0}
+
+if __name__ == "__main__":
+    # python -m utils.stc_format export_explorer.csv stc_ready.csv|stc_ready.parquet
+    stats = convert_csv_to_stc(
+        sys.argv[1], sys.argv[2], fmt="parquet" if sys.argv[2].endswith(".parquet") else "csv",
+        on_progress=lambda n, rps: print(f"{n:,} baris • {rps:,.0f} baris/s", file=sys.stderr),
+    )
+    print(f"Selesai: {stats['rows']:,} baris dalam {stats['seconds']:.2f}s ({stats['rows_per_s']:,.0f} baris/s)")
@@ -0,0 +1,196 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+# =========================
+# Cache transaksi persisten (SQLite)
+# =========================
+# Tx yang sudah mined tidak berubah, jadi payload fetch_tx_raw_any disimpan
+# permanen dengan key (chainid, tx_hash). SQLite mode WAL: banyak pembaca +
+# satu penulis sekaligus, aman dipakai beberapa proses worker.
+# Hash yang tidak ditemukan / masih pending TIDAK masuk tabel `tx`; statusnya
+# disimpan terpisah di `tx_miss` dengan waktu kedaluwarsa (lihat fetchers.MissCache).
+
+CACHE_DIR = os.getenv("GV_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "stc-gasvision")
+TX_CACHE_PATH = os.getenv("GV_TX_CACHE_PATH") or os.path.join(CACHE_DIR, "txcache.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tx (
+    chainid   INTEGER NOT NULL,
+    tx_hash   TEXT    NOT NULL,
+    payload   TEXT    NOT NULL,
+    stored_at INTEGER NOT NULL,
+    PRIMARY KEY (chainid, tx_hash)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS block_header (
+    chainid  INTEGER NOT NULL,
+    number   INTEGER NOT NULL,
+    header   TEXT    NOT NULL,
+    PRIMARY KEY (chainid, number)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tx_miss (
+    chainid  INTEGER NOT NULL,
+    tx_hash  TEXT    NOT NULL,
+    state    TEXT    NOT NULL,   -- not_found | pending
+    until    REAL    NOT NULL,   -- epoch detik; setelah ini wajib dicek ulang
+    PRIMARY KEY (chainid, tx_hash)
+) WITHOUT ROWID;
+"""
+
+class TxCache:
+    """Cache payload tx per (chainid, tx_hash); koneksi SQLite per thread."""
+
+    def __init__(self, path: str = TX_CACHE_PATH):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.miss_writes = 0
+        with self._conn() as c:
+            c.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(tx_hash: str) -> str:
+        return (tx_hash or "").strip().lower()
+
+    def _count(self, attr: str, n: int = 1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def get(self, chainid: int, tx_hash: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT payload FROM tx WHERE chainid=? AND tx_hash=?",
+            (int(chainid), self._key(tx_hash)),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def get_many(self, chainid: int, tx_hashes) -> dict:
+        """Return {tx_hash: payload} untuk yang ada di cache (lookup sekali jalan)."""
+        keys = {self._key(h): h for h in tx_hashes}
+        out = {}
+        items = list(keys)
+        for start in range(0, len(items), 500):  # batas parameter SQLite
+            chunk = items[start:start + 500]
+            q = "SELECT tx_hash, payload FROM tx WHERE chainid=? AND tx_hash IN (%s)" % ",".join("?" * len(chunk))
+            for k, payload in self._conn().execute(q, (int(chainid), *chunk)):
+                out[keys[k]] = json.loads(payload)
+        self._count("hits", len(out))
+        self._count("misses", len(keys) - len(out))
+        return out
+
+    def put(self, chainid: int, tx_hash: str, payload: dict):
+        self.put_many(chainid, [(tx_hash, payload)])
+
+    def put_many(self, chainid: int, items):
+        rows = [(int(chainid), self._key(h), json.dumps(p, separators=(",", ":")), int(time.time()))
+                for h, p in items]
+        if not rows:
+            return
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.executemany("INSERT OR REPLACE INTO tx VALUES (?, ?, ?, ?)", rows)
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        self._count("writes", len(rows))
+
+    def get_headers(self, chainid: int, numbers) -> dict:
+        """Header block yang tersimpan: {number: header}."""
+        nums = sorted({int(n) for n in numbers})
+        out = {}
+        for start in range(0, len(nums), 500):
+            chunk = nums[start:start + 500]
+            q = "SELECT number, header FROM block_header WHERE chainid=? AND number IN (%s)" % ",".join("?" * len(chunk))
+            for n, header in self._conn().execute(q, (int(chainid), *chunk)):
+                out[n] = json.loads(header)
+        return out
+
+    def put_headers(self, chainid: int, headers: dict):
+        rows = [(int(chainid), int(n), json.dumps(h, separators=(",", ":"))) for n, h in headers.items()]
+        if not rows:
+            return
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.executemany("INSERT OR REPLACE INTO block_header VALUES (?, ?, ?)", rows)
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+
+    def get_miss(self, chainid: int, tx_hash: str) -> tuple[str, float] | None:
+        """(state, until) hash yang terakhir tidak ditemukan / pending; bisa sudah kedaluwarsa."""
+        row = self._conn().execute(
+            "SELECT state, until FROM tx_miss WHERE chainid=? AND tx_hash=?",
+            (int(chainid), self._key(tx_hash)),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put_miss(self, chainid: int, tx_hash: str, state: str, until: float):
+        c = self._conn()
+        c.execute("INSERT OR REPLACE INTO tx_miss VALUES (?, ?, ?, ?)",
+                  (int(chainid), self._key(tx_hash), state, float(until)))
+        self._count("miss_writes")
+        if self.miss_writes % 256 == 0:
+            # bersih-bersih berkala; entri kedaluwarsa toh diabaikan saat dibaca
+            c.execute("DELETE FROM tx_miss WHERE until < ?", (time.time(),))
+
+    def drop_miss(self, chainid: int, tx_hash: str):
+        self._conn().execute("DELETE FROM tx_miss WHERE chainid=? AND tx_hash=?",
+                             (int(chainid), self._key(tx_hash)))
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM tx").fetchone()[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "entries": len(self),
+            "path": self.path,
+        }
+
+_default: TxCache | None = None
+_default_lock = threading.Lock()
+
+def get_tx_cache() -> TxCache | None:
+    """Cache default per proses; None kalau dimatikan (GV_TX_CACHE=0) atau gagal dibuka."""
+    global _default
+    if os.getenv("GV_TX_CACHE", "1") == "0":
+        return None
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = TxCache()
+                except Exception:
+                    return None
+    return _default
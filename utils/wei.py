@@ -0,0 +1,119 @@
+import numpy as np
+
+# =========================
+# Aritmetika fee integer (wei) — eksak dari fetch sampai agregasi
+# =========================
+# Fee disimpan sebagai integer wei. Untuk kolom NumPy, nilai wei dipecah
+# jadi dua int64: bagian Gwei (wei // 1e9) dan sisa (< 1e9 wei), sehingga
+# jumlah jutaan baris tetap eksak tanpa overflow:
+#   wei = gwei * 10**9 + rem
+# ETH / Gwei / Rupiah (float) hanya diturunkan saat ditampilkan.
+
+WEI_PER_GWEI = 10**9
+WEI_PER_ETH = 10**18
+
+def wei_to_eth(wei) -> float:
+    """Integer wei → float ETH (pembagian int Python: dibulatkan sekali, benar)."""
+    return int(wei) / WEI_PER_ETH
+
+def wei_to_gwei(wei) -> float:
+    return int(wei) / WEI_PER_GWEI
+
+def gwei_to_wei(gwei) -> int:
+    """Input Gwei (boleh pecahan, mis. dari user) → integer wei."""
+    return int(round(float(gwei) * WEI_PER_GWEI))
+
+def wei_to_idr(wei, eth_idr_rate: float) -> float:
+    return int(wei) * float(eth_idr_rate or 0) / WEI_PER_ETH
+
+def payload_fee_wei(raw: dict) -> int:
+    """fee_wei dari payload fetcher; payload lama di cache (tanpa fee_wei) diturunkan dari gas × harga."""
+    fee = raw.get("fee_wei")
+    if fee is not None:
+        return int(fee)
+    return int(raw.get("gas_used") or 0) * int(raw.get("gas_price_wei") or 0)
+
+# --- Kolom vectorized ---
+
+def split_wei(wei) -> tuple:
+    """Array int64 wei → (gwei, rem) int64 dengan 0 ≤ rem < 1e9."""
+    w = np.asarray(wei, dtype=np.int64)
+    return w // WEI_PER_GWEI, w % WEI_PER_GWEI
+
+def fee_parts(gas_used, gas_price_wei) -> tuple:
+    """
+    gas_used × gas_price_wei per baris tanpa overflow int64: return (gwei, rem).
+    gas_used (< 2^32) × bagian Gwei harga, plus carry dari gas_used × sisa.
+    """
+    g = np.asarray(gas_used, dtype=np.int64)
+    p_gwei, p_rem = split_wei(gas_price_wei)
+    low = g * p_rem                                   # < 2^32 · 1e9
+    return g * p_gwei + low // WEI_PER_GWEI, low % WEI_PER_GWEI
+
+def parts_to_eth(gwei, rem) -> np.ndarray:
+    return np.asarray(gwei, dtype=np.float64) / 1e9 + np.asarray(rem, dtype=np.float64) / 1e18
+
+def parts_to_wei(gwei, rem) -> np.ndarray:
+    """(gwei, rem) → array object berisi int Python eksak."""
+    return np.asarray(gwei).astype(object) * WEI_PER_GWEI + np.asarray(rem).astype(object)
+
+def fees_frame(payloads) -> "pd.DataFrame":
+    """
+    Payload fetcher → frame ringkas bertipe: kolom teks sebagai category, angka
+    int64 (gas_used, gas_price_wei, fee_gwei, fee_rem, block, ts). Sumber untuk agregasi.
+    """
+    import pandas as pd
+
+    payloads = list(payloads)
+    n = len(payloads)
+
+    def ints(key):
+        return np.fromiter((int(p.get(key) or 0) for p in payloads), dtype=np.int64, count=n)
+
+    def cat(key, default=""):
+        return pd.Categorical([p.get(key) or default for p in payloads])
+
+    gas_used, price = ints("gas_used"), ints("gas_price_wei")
+    fee_gwei, fee_rem = fee_parts(gas_used, price)
+    return pd.DataFrame({
+        "network": cat("network"),
+        "contract": cat("contract"),
+        "function": cat("function_name"),
+        "status": cat("status", "Unknown"),
+        "tx_hash": [p.get("tx_hash") or "" for p in payloads],
+        "block": ints("block_number"),
+        "ts": ints("timestamp_unix"),
+        "gas_used": gas_used,
+        "gas_price_wei": price,
+        "fee_gwei": fee_gwei,
+        "fee_rem": fee_rem,
+    })
+
+def aggregate_fees(frame, by=("network", "contract", "function"), eth_idr_rate: float | None = None):
+    """
+    Jumlah & rata-rata fee per grup, vectorized di atas kolom integer.
+    `fee_wei_sum` eksak (int Python); kolom ETH/Gwei/Rp diturunkan di akhir.
+    """
+    import pandas as pd
+
+    by = list(by)
+    price_gwei, price_rem = split_wei(frame["gas_price_wei"].to_numpy())
+    work = frame[by].assign(
+        _n=1, gas_used=frame["gas_used"], fee_gwei=frame["fee_gwei"], fee_rem=frame["fee_rem"],
+        _p_gwei=price_gwei, _p_rem=price_rem,
+    )
+    g = work.groupby(by, observed=True, sort=True).sum()
+
+    n = g["_n"].to_numpy()
+    fee_eth = parts_to_eth(g["fee_gwei"], g["fee_rem"])
+    out = pd.DataFrame({
+        "tx": n,
+        "gas_used_sum": g["gas_used"].to_numpy(),
+        "fee_wei_sum": parts_to_wei(g["fee_gwei"], g["fee_rem"]),
+        "fee_eth_sum": fee_eth,
+        "fee_eth_mean": fee_eth / n,
+        "gas_price_gwei_mean": parts_to_eth(g["_p_gwei"], g["_p_rem"]) * 1e9 / n,
+    }, index=g.index)
+    if eth_idr_rate:
+        out["fee_idr_sum"] = fee_eth * float(eth_idr_rate)
+    return out.reset_index()